@@ -1,6 +1,6 @@
 from fastapi import FastAPI
 
-from .routers import note, provider, model, config, history, folder
+from .routers import note, provider, provider_group, model, config, history, folder
 
 
 
@@ -8,6 +8,7 @@ def create_app(lifespan) -> FastAPI:
     app = FastAPI(title="BiliNote",lifespan=lifespan)
     app.include_router(note.router, prefix="/api")
     app.include_router(provider.router, prefix="/api")
+    app.include_router(provider_group.router, prefix="/api")
     app.include_router(model.router,prefix="/api")
     app.include_router(config.router,  prefix="/api")
     app.include_router(history.router, prefix="/api")
@@ -1,11 +1,41 @@
+from sqlalchemy import inspect, text
+
 from app.db.models.models import Model
+from app.db.models.model_catalogs import ModelCatalog
 from app.db.models.providers import Provider
+from app.db.models.provider_groups import ProviderGroup, ProviderGroupMember
 from app.db.models.video_tasks import VideoTask
 from app.db.models.history import History
 from app.db.models.folder import Folder
 from app.db.engine import get_engine, Base
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def add_missing_columns(engine) -> None:
+    """
+    create_all 不会修改已存在的表：为旧版本数据库中已有的表补上后来新增的可空列
+    （如 providers 的 rpm_limit / tpm_limit / max_concurrency）
+    """
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        missing = [column for column in table.columns if column.name not in existing and column.nullable]
+        if not missing:
+            continue
+        with engine.begin() as connection:
+            for column in missing:
+                column_type = column.type.compile(dialect=engine.dialect)
+                connection.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'))
+                logger.info(f"数据库迁移：{table.name} 表已添加 {column.name} 列")
+
 
 def init_db():
     engine = get_engine()
 
-    Base.metadata.create_all(bind=engine)
\ No newline at end of file
+    Base.metadata.create_all(bind=engine)
+    add_missing_columns(engine)
@@ -0,0 +1,60 @@
+from datetime import datetime
+from typing import Optional
+
+from app.db.engine import get_db
+from app.db.models.model_catalogs import ModelCatalog
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def _to_dict(catalog: ModelCatalog) -> dict:
+    return {
+        "provider_id": catalog.provider_id,
+        "models": catalog.models or [],
+        "fetched_at": catalog.fetched_at,
+        "checked_at": catalog.checked_at,
+        "error": catalog.error,
+    }
+
+
+def get_catalog(provider_id: str) -> Optional[dict]:
+    db = next(get_db())
+    try:
+        catalog = db.query(ModelCatalog).filter_by(provider_id=str(provider_id)).first()
+        return _to_dict(catalog) if catalog else None
+    finally:
+        db.close()
+
+
+def save_catalog(provider_id: str, models: Optional[list] = None, error: Optional[str] = None) -> None:
+    """
+    写入拉取结果：成功时替换模型列表；失败时只记录错误与尝试时间，保留上次成功的列表
+    """
+    db = next(get_db())
+    try:
+        catalog = db.query(ModelCatalog).filter_by(provider_id=str(provider_id)).first()
+        if not catalog:
+            catalog = ModelCatalog(provider_id=str(provider_id), models=[])
+            db.add(catalog)
+        now = datetime.now()
+        catalog.checked_at = now
+        catalog.error = error
+        if error is None:
+            catalog.models = models or []
+            catalog.fetched_at = now
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Failed to save model catalog: {e}")
+    finally:
+        db.close()
+
+
+def delete_catalog(provider_id: str) -> None:
+    db = next(get_db())
+    try:
+        db.query(ModelCatalog).filter_by(provider_id=str(provider_id)).delete()
+        db.commit()
+    finally:
+        db.close()
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, DateTime, JSON, String, Text
+
+from app.db.engine import Base
+
+
+class ModelCatalog(Base):
+    """
+    供应商远程模型列表（models.list()）的缓存，设置页直接读取，过期后在后台刷新
+    """
+    __tablename__ = "model_catalogs"
+
+    provider_id = Column(String, primary_key=True)
+    models = Column(JSON)                   # 模型列表（models.list() 返回的字典）
+    fetched_at = Column(DateTime)           # 最近一次成功拉取的时间
+    checked_at = Column(DateTime)           # 最近一次尝试拉取的时间（含失败）
+    error = Column(Text, nullable=True)     # 最近一次拉取失败的原因，成功后清空
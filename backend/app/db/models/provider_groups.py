@@ -0,0 +1,26 @@
+from sqlalchemy import Column, Integer, String, DateTime, func
+
+from app.db.engine import Base
+
+
+class ProviderGroup(Base):
+    """
+    供应商组：一个逻辑模型由多个供应商（如不同的 OpenAI 兼容网关）共同提供
+    """
+    __tablename__ = "provider_groups"
+
+    id = Column(String, primary_key=True)
+    name = Column(String, nullable=False)                          # 逻辑模型名，前端作为模型展示
+    strategy = Column(String, nullable=False, default="least_outstanding")  # least_outstanding / latency_ewma
+    enabled = Column(Integer, default=1)
+    created_at = Column(DateTime, server_default=func.now())
+
+
+class ProviderGroupMember(Base):
+    __tablename__ = "provider_group_members"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    group_id = Column(String, nullable=False, index=True)
+    provider_id = Column(String, nullable=False)
+    model_name = Column(String, nullable=False)  # 该供应商上的实际模型名
+    priority = Column(Integer, default=0)        # 负载相同时优先选择数值小的成员
@@ -14,4 +14,8 @@ class Provider(Base):
     api_key = Column(String, nullable=False)
     base_url = Column(String, nullable=False)
     enabled = Column(Integer, default=1)
+    # 限流配置，为空时使用 LLM_DEFAULT_* 环境变量
+    rpm_limit = Column(Integer, nullable=True)        # 每分钟请求数
+    tpm_limit = Column(Integer, nullable=True)        # 每分钟 token 数
+    max_concurrency = Column(Integer, nullable=True)  # 最大并发请求数
     created_at = Column(DateTime, server_default=func.now())
\ No newline at end of file
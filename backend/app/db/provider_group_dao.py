@@ -0,0 +1,110 @@
+from typing import List, Optional
+
+from app.db.engine import get_db
+from app.db.models.provider_groups import ProviderGroup, ProviderGroupMember
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def _group_to_dict(group: ProviderGroup, members: List[ProviderGroupMember]) -> dict:
+    return {
+        "id": group.id,
+        "name": group.name,
+        "strategy": group.strategy,
+        "enabled": group.enabled,
+        "created_at": group.created_at,
+        "members": [
+            {"provider_id": m.provider_id, "model_name": m.model_name, "priority": m.priority}
+            for m in sorted(members, key=lambda m: (m.priority or 0, m.id))
+        ],
+    }
+
+
+def _replace_members(db, group_id: str, members: List[dict]):
+    db.query(ProviderGroupMember).filter_by(group_id=group_id).delete()
+    for index, member in enumerate(members):
+        db.add(ProviderGroupMember(
+            group_id=group_id,
+            provider_id=member["provider_id"],
+            model_name=member["model_name"],
+            priority=member.get("priority", index),
+        ))
+
+
+def insert_group(id: str, name: str, strategy: str, members: List[dict], enabled: int = 1) -> Optional[str]:
+    db = next(get_db())
+    try:
+        db.add(ProviderGroup(id=id, name=name, strategy=strategy, enabled=enabled))
+        _replace_members(db, id, members)
+        db.commit()
+        logger.info(f"Provider group inserted successfully. id: {id}, name: {name}, members: {len(members)}")
+        return id
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Failed to insert provider group: {e}")
+        return None
+    finally:
+        db.close()
+
+
+def get_group_by_id(id: str) -> Optional[dict]:
+    db = next(get_db())
+    try:
+        group = db.query(ProviderGroup).filter_by(id=id).first()
+        if not group:
+            return None
+        members = db.query(ProviderGroupMember).filter_by(group_id=id).all()
+        return _group_to_dict(group, members)
+    finally:
+        db.close()
+
+
+def get_all_groups() -> List[dict]:
+    db = next(get_db())
+    try:
+        groups = db.query(ProviderGroup).all()
+        members = db.query(ProviderGroupMember).all()
+        return [_group_to_dict(g, [m for m in members if m.group_id == g.id]) for g in groups]
+    finally:
+        db.close()
+
+
+def update_group(id: str, members: Optional[List[dict]] = None, **kwargs):
+    db = next(get_db())
+    try:
+        group = db.query(ProviderGroup).filter_by(id=id).first()
+        if not group:
+            logger.warning(f"Provider group {id} not found for update.")
+            return None
+
+        for key, value in kwargs.items():
+            if hasattr(group, key) and value is not None:
+                setattr(group, key, value)
+        if members is not None:
+            _replace_members(db, id, members)
+
+        db.commit()
+        logger.info(f"Provider group updated successfully. id: {id}")
+        return id
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Failed to update provider group: {e}")
+        return None
+    finally:
+        db.close()
+
+
+def delete_group(id: str):
+    db = next(get_db())
+    try:
+        db.query(ProviderGroupMember).filter_by(group_id=id).delete()
+        db.query(ProviderGroup).filter_by(id=id).delete()
+        db.commit()
+        logger.info(f"Provider group deleted successfully. id: {id}")
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Failed to delete provider group: {e}")
+    finally:
+        db.close()
+
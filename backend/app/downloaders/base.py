@@ -1,11 +1,14 @@
 import enum
+import os
 
 from abc import ABC, abstractmethod
-from typing import Optional, Union
+from typing import Dict, Iterable, List, Optional, Tuple, Union
 
 from app.enums.note_enums import DownloadQuality
 from app.models.notes_model import AudioDownloadResult
+from app.models.transcriber_model import TranscriptResult
 from os import getenv
+# 各下载质量的目标音频码率（kbps）。语音识别只需要约 16kHz 单声道，32k 的 opus / aac 已足够
 QUALITY_MAP = {
     "fast": "32",
     "medium": "64",
@@ -13,10 +16,54 @@ QUALITY_MAP = {
 }
 
 
+def audio_format_options(quality: Union[DownloadQuality, str, None]) -> dict:
+    """
+    DownloadQuality → yt-dlp 的格式选择参数：只取纯音频流，优先 opus / aac，
+    码率取最接近目标值的一档，同等条件下取体积更小的
+
+    :param quality: fast | medium | slow
+    """
+    quality = getattr(quality, "value", quality) or "fast"
+    abr = QUALITY_MAP.get(quality, QUALITY_MAP["fast"])
+    return {
+        'format': 'bestaudio/best',
+        'format_sort': ['acodec:opus', f'abr~{abr}', '+size'],
+    }
+
+
+def _format_size(fmt: dict, duration: float) -> Optional[float]:
+    size = fmt.get("filesize") or fmt.get("filesize_approx")
+    if not size and fmt.get("abr") and duration:
+        size = fmt["abr"] * 1000 / 8 * duration
+    return size
+
+
+def audio_download_stats(info: dict, audio_path: str) -> dict:
+    """
+    统计本次下载的音频大小，以及相比下载最高音质音频流节省的字节数
+
+    :param info: yt-dlp 的 info 字典
+    :param audio_path: 实际下载的文件
+    """
+    duration = info.get("duration") or 0
+    downloaded = os.path.getsize(audio_path) if os.path.exists(audio_path) else _format_size(info, duration) or 0
+    audio_sizes = [
+        _format_size(f, duration) for f in info.get("formats") or []
+        if f.get("acodec") not in (None, "none") and f.get("vcodec") in (None, "none")
+    ]
+    best = max((s for s in audio_sizes if s), default=downloaded)
+    return {
+        "format_id": info.get("format_id"),
+        "abr": info.get("abr"),
+        "audio_codec": info.get("acodec"),
+        "downloaded_bytes": int(downloaded),
+        "best_audio_bytes": int(best),
+        "bytes_saved": max(0, int(best - downloaded)),
+    }
+
+
 class Downloader(ABC):
     def __init__(self):
-        #TODO 需要修改为可配置
-        self.quality = QUALITY_MAP.get('fast')
         self.cache_data=getenv('DATA_DIR')
 
     @abstractmethod
@@ -36,3 +83,26 @@ class Downloader(ABC):
     def download_video(self, video_url: str,
                        output_dir: Union[str, None] = None) -> str:
         pass
+
+    def download_subtitles(self, video_url: str,
+                           langs: Optional[List[str]] = None) -> Optional[Tuple[AudioDownloadResult, TranscriptResult]]:
+        '''
+        只拉取元信息与平台字幕（CC / 自动生成字幕），不下载音频
+
+        :param video_url: 资源链接
+        :param langs: 字幕语言优先级，默认读取 SUBTITLE_LANGS
+        :return: (音频元信息, 字幕转写结果)；平台不支持或没有可用字幕时返回 None
+        '''
+        return None
+
+    def download_clips(self, video_url: str, timestamps: Iterable[float],
+                       output_dir: str) -> Optional[Dict[float, Tuple[str, float]]]:
+        '''
+        只下载截图时间点附近的低分辨率片段，代替下载完整视频
+
+        :param video_url: 资源链接
+        :param timestamps: 截图时间点（秒）
+        :param output_dir: 片段输出目录
+        :return: {时间点: (片段路径, 时间点在片段内的偏移秒数)}；平台不支持时返回 None，调用方改为下载完整视频
+        '''
+        return None
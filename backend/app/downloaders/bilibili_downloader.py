@@ -1,12 +1,16 @@
 import os
 from abc import ABC
-from typing import Union, Optional
+from typing import Dict, Iterable, Union, Optional, List, Tuple
 
 import yt_dlp
 
-from app.downloaders.base import Downloader, DownloadQuality, QUALITY_MAP
+from app.downloaders.base import Downloader, DownloadQuality, audio_download_stats, audio_format_options
+from app.downloaders.common import fetch_clips
 from app.models.notes_model import AudioDownloadResult
+from app.models.transcriber_model import TranscriptResult
+from app.utils.audio_helper import probe_audio_codec
 from app.utils.path_helper import get_data_dir
+from app.utils.subtitle_helper import fetch_subtitle_transcript
 from app.utils.url_parser import extract_video_id
 
 
@@ -29,16 +33,10 @@ class BilibiliDownloader(Downloader, ABC):
 
         output_path = os.path.join(output_dir, "%(id)s.%(ext)s")
 
+        # 按下载质量选最小的够用音频流并保存原始编码（通常为 m4a / aac），转写模型可直接读取，无需转码为 mp3
         ydl_opts = {
-            'format': 'bestaudio[ext=m4a]/bestaudio/best',
+            **audio_format_options(quality),
             'outtmpl': output_path,
-            'postprocessors': [
-                {
-                    'key': 'FFmpegExtractAudio',
-                    'preferredcodec': 'mp3',
-                    'preferredquality': '64',
-                }
-            ],
             'noplaylist': True,
             'quiet': False,
         }
@@ -49,7 +47,7 @@ class BilibiliDownloader(Downloader, ABC):
             title = info.get("title")
             duration = info.get("duration", 0)
             cover_url = info.get("thumbnail")
-            audio_path = os.path.join(output_dir, f"{video_id}.mp3")
+            audio_path = ydl.prepare_filename(info)
 
         return AudioDownloadResult(
             file_path=audio_path,
@@ -59,9 +57,35 @@ class BilibiliDownloader(Downloader, ABC):
             platform="bilibili",
             video_id=video_id,
             raw_info=info,
-            video_path=None  # ❗音频下载不包含视频路径
+            video_path=None,  # ❗音频下载不包含视频路径
+            audio_codec=probe_audio_codec(audio_path) or info.get("acodec"),
+            download_stats=audio_download_stats(info, audio_path),
         )
 
+    def download_subtitles(
+        self,
+        video_url: str,
+        langs: Optional[List[str]] = None,
+    ) -> Optional[Tuple[AudioDownloadResult, TranscriptResult]]:
+        """
+        仅抓取元信息，存在 CC / AI 字幕时直接返回字幕转写结果
+        """
+        info, transcript = fetch_subtitle_transcript(video_url, langs)
+        if not transcript:
+            return None
+
+        audio = AudioDownloadResult(
+            file_path="",
+            title=info.get("title"),
+            duration=info.get("duration", 0),
+            cover_url=info.get("thumbnail"),
+            platform="bilibili",
+            video_id=info.get("id"),
+            raw_info={'tags': info.get('tags')},
+            video_path=None
+        )
+        return audio, transcript
+
     def download_video(
         self,
         video_url: str,
@@ -103,6 +127,17 @@ class BilibiliDownloader(Downloader, ABC):
 
         return video_path
 
+    def download_clips(
+        self,
+        video_url: str,
+        timestamps: Iterable[float],
+        output_dir: str,
+    ) -> Optional[Dict[float, Tuple[str, float]]]:
+        """
+        只下载截图时间点附近的低分辨率纯视频片段
+        """
+        return fetch_clips(video_url, timestamps, output_dir)
+
     def delete_video(self, video_path: str) -> str:
         """
         删除视频文件
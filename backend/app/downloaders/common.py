@@ -1 +1,89 @@
-# def download():
+import os
+from typing import Dict, Iterable, List, Tuple
+
+import yt_dlp
+from yt_dlp.utils import download_range_func
+
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 截图片段在目标时间前后各保留的秒数（时间吸附、关键帧误差留出余量）
+SCREENSHOT_CLIP_MARGIN = float(os.getenv("SCREENSHOT_CLIP_MARGIN", "1.5"))
+# 截图片段使用的视频流高度上限，选不超过该高度的最高分辨率纯视频流
+SCREENSHOT_MAX_HEIGHT = int(os.getenv("SCREENSHOT_MAX_HEIGHT", "720"))
+# 相邻片段间隔小于该秒数时合并为一段，减少请求与 ffmpeg 进程数；
+# 合并后的片段不超过 2 × margin + _MERGE_GAP，避免密集的截图连成覆盖大半个视频的长片段（切点处需重新编码）
+_MERGE_GAP = 10
+
+
+def merge_clip_ranges(timestamps: Iterable[float], margin: float = SCREENSHOT_CLIP_MARGIN
+                      ) -> List[Tuple[float, float, List[float]]]:
+    """
+    把截图时间点展开成 [ts - margin, ts + margin] 的区间，并合并相互重叠或相距很近的区间，
+    合并后的区间长度不超过 2 × margin + _MERGE_GAP
+
+    :param timestamps: 截图时间点（秒）
+    :param margin: 时间点前后保留的秒数
+    :return: [(开始, 结束, 落在该区间内的时间点), ...]，按开始时间升序
+    """
+    max_length = 2 * margin + _MERGE_GAP
+    ranges: List[Tuple[float, float, List[float]]] = []
+    for ts in sorted(set(max(0.0, float(t)) for t in timestamps)):
+        start, end = max(0.0, ts - margin), ts + margin
+        if ranges and start - ranges[-1][1] <= _MERGE_GAP and end - ranges[-1][0] <= max_length:
+            ranges[-1] = (ranges[-1][0], end, ranges[-1][2] + [ts])
+        else:
+            ranges.append((start, end, [ts]))
+    return ranges
+
+
+def fetch_clips(video_url: str, timestamps: Iterable[float], output_dir: str,
+                max_height: int = SCREENSHOT_MAX_HEIGHT) -> Dict[float, Tuple[str, float]]:
+    """
+    用 yt-dlp 的 download_ranges 只下载截图时间点附近的片段：选低分辨率的纯视频流，
+    由 ffmpeg 按区间从流地址中读取，不下载音频也不下载完整视频。
+
+    :param video_url: 视频链接
+    :param timestamps: 截图时间点（秒）
+    :param output_dir: 片段输出目录
+    :param max_height: 视频流高度上限
+    :return: {时间点: (片段路径, 时间点在片段内的偏移秒数)}，下载失败的区间不在其中
+    """
+    ranges = merge_clip_ranges(timestamps)
+    if not ranges:
+        return {}
+    os.makedirs(output_dir, exist_ok=True)
+    ydl_opts = {
+        # 优先不超过 max_height 的纯视频流，平台没有分离流时退回音视频合一的格式
+        'format': f'bv[height<={max_height}]/bv*[height<={max_height}]/b[height<={max_height}]/wv*/w',
+        'format_sort': [f'res:{max_height}', '+size'],
+        'download_ranges': download_range_func(None, [(start, end) for start, end, _ in ranges]),
+        # 在切点处重新编码出关键帧（片段很短、分辨率低，开销可以忽略），保证片段从区间开头精确开始
+        'force_keyframes_at_cuts': True,
+        'outtmpl': os.path.join(output_dir, 'clip_%(id)s_%(section_start)s.%(ext)s'),
+        'noplaylist': True,
+        'quiet': True,
+    }
+    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        info = ydl.extract_info(video_url, download=True)
+
+    # 按 section_start 把下载结果对应回区间，不依赖 requested_downloads 的顺序
+    downloads = {}
+    for download in info.get("requested_downloads") or []:
+        if download.get("section_start") is not None:
+            downloads[round(float(download["section_start"]), 3)] = download
+    results: Dict[float, Tuple[str, float]] = {}
+    fetched = total_bytes = 0
+    for start, _, points in ranges:
+        download = downloads.get(round(start, 3)) or {}
+        path = download.get("filepath")
+        if not path or not os.path.exists(path):
+            logger.warning(f"片段下载失败：{start:.1f}s 起的 {len(points)} 个截图时间点")
+            continue
+        fetched += 1
+        total_bytes += os.path.getsize(path)
+        for ts in points:
+            results[ts] = (path, ts - start)
+    logger.info(f"已下载 {fetched}/{len(ranges)} 个截图片段（{info.get('format_id')}），共 {total_bytes / 1024 / 1024:.2f} MB")
+    return results
@@ -14,6 +14,7 @@ from app.downloaders.douyin_helper.abogus import ABogus
 from app.enums.note_enums import DownloadQuality
 from app.models.audio_model import AudioDownloadResult
 from app.services.cookie_manager import CookieConfigManager
+from app.utils.audio_helper import probe_audio_codec
 from app.utils.path_helper import get_data_dir
 from dotenv import load_dotenv
 
@@ -253,7 +254,8 @@ class DouyinDownloader(Downloader):
                 raw_info={
                     'tags': video_data['aweme_detail']['caption'] + ''.join(tags),
                 },
-                video_path=None  # ❗音频下载不包含视频路径
+                video_path=None,  # ❗音频下载不包含视频路径
+                audio_codec=probe_audio_codec(output_path),
             )
         except Exception as e:
             raise e
@@ -1,5 +1,4 @@
 import os
-import subprocess
 from abc import ABC
 from typing import Union, Optional
 
@@ -9,6 +8,7 @@ from app.downloaders.base import Downloader
 from app.downloaders.kuaishou_helper.kuaishou import KuaiShou
 from app.enums.note_enums import DownloadQuality
 from app.models.audio_model import AudioDownloadResult
+from app.utils.audio_helper import extract_audio_stream, probe_audio_codec
 from app.utils.path_helper import get_data_dir
 
 
@@ -36,12 +36,12 @@ class KuaiShouDownloader(Downloader, ABC):
         video_id = photo_info['id']
         title = photo_info['caption'].strip().replace('\n', '').replace(' ', '_')[:50]
         mp4_path = os.path.join(output_dir, f"{video_id}.mp4")
-        mp3_path = os.path.join(output_dir, f"{video_id}.mp3")
+        audio_path = os.path.join(output_dir, f"{video_id}.m4a")
 
-        if os.path.exists(mp3_path):
-            print(f"[已存在] 跳过下载: {mp3_path}")
+        if os.path.exists(audio_path):
+            print(f"[已存在] 跳过下载: {audio_path}")
             return AudioDownloadResult(
-                file_path=mp3_path,
+                file_path=audio_path,
                 title=title,
                 duration=photo_info['duration'],
                 cover_url=photo_info['coverUrl'],
@@ -50,7 +50,8 @@ class KuaiShouDownloader(Downloader, ABC):
                 raw_info={
                     'tags': ','.join(tag['name'] for tag in video_raw_info.get('tags', []) if tag.get('name'))
                 },
-                video_path=mp4_path
+                video_path=mp4_path,
+                audio_codec=probe_audio_codec(audio_path),
             )
 
         # 下载 mp4 视频
@@ -62,16 +63,14 @@ class KuaiShouDownloader(Downloader, ABC):
         else:
             raise Exception(f"视频下载失败: {resp.status_code}")
 
-        # 使用 ffmpeg 转换为 mp3
+        # 从 mp4 中流复制取出音频（快手为 aac），不转码
         try:
-            subprocess.run([
-                "ffmpeg", "-y", "-i", mp4_path, "-vn", "-acodec", "libmp3lame", mp3_path
-            ], check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-        except subprocess.CalledProcessError:
-            raise Exception("ffmpeg 转换 MP3 失败")
+            audio_path, audio_codec = extract_audio_stream(mp4_path)
+        except Exception as e:
+            raise Exception(f"提取音频失败: {e}")
 
         return AudioDownloadResult(
-            file_path=mp3_path,
+            file_path=audio_path,
             title=photo_info['caption'],
             duration=photo_info['duration'],
             cover_url=photo_info['coverUrl'],
@@ -80,7 +79,8 @@ class KuaiShouDownloader(Downloader, ABC):
             raw_info={
                 'tags': ','.join(tag['name'] for tag in video_raw_info.get('tags', []) if tag.get('name'))
             },
-            video_path=mp4_path
+            video_path=mp4_path,
+            audio_codec=audio_codec,
         )
 
     def download_video(
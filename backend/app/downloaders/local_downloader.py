@@ -6,9 +6,7 @@ from typing import Optional
 from app.downloaders.base import Downloader
 from app.enums.note_enums import DownloadQuality
 from app.models.audio_model import AudioDownloadResult
-import os
-import subprocess
-
+from app.utils.audio_helper import extract_audio_stream
 from app.utils.video_helper import save_cover_to_static
 
 
@@ -53,38 +51,6 @@ class LocalDownloader(Downloader, ABC):
         except subprocess.CalledProcessError as e:
             raise RuntimeError(f"提取封面失败: {output_path}") from e
 
-    def convert_to_mp3(self,input_path: str, output_path: str = None) -> str:
-        """
-        将本地视频文件转为 MP3 音频文件
-        :param input_path: 输入文件路径（如 .mp4）
-        :param output_path: 输出文件路径（可选，默认同目录同名 .mp3）
-        :return: 生成的 mp3 文件路径
-        """
-        if not os.path.exists(input_path):
-            raise FileNotFoundError(f"输入文件不存在: {input_path}")
-
-        if output_path is None:
-            base, _ = os.path.splitext(input_path)
-            output_path = base + ".mp3"
-        try:
-        # 调用 ffmpeg 转换
-            command = [
-                'ffmpeg',
-                '-i', input_path,
-                '-vn',  # 不要视频流
-                '-acodec', 'libmp3lame',  # 使用mp3编码
-                '-y',  # 覆盖输出文件
-                output_path
-            ]
-
-            subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True)
-
-            if not os.path.exists(output_path):
-                raise RuntimeError(f"mp3 文件生成失败: {output_path}")
-
-            return output_path
-        except subprocess.CalledProcessError as e:
-            raise RuntimeError(f"mp3 文件生成失败: {output_path}") from e
     def download_video(self, video_url: str, output_dir: str = None) -> str:
         """
         处理本地文件路径，返回视频文件路径
@@ -118,7 +84,8 @@ class LocalDownloader(Downloader, ABC):
         file_name = os.path.basename(video_url)
         title, _ = os.path.splitext(file_name)
         print(title, file_name,video_url)
-        file_path=self.convert_to_mp3(video_url)
+        # 只做流复制取出原始音频，不再整段重新编码为 mp3
+        file_path, audio_codec = extract_audio_stream(video_url)
         cover_path = self.extract_cover(video_url)
         cover_url = save_cover_to_static(cover_path)
 
@@ -133,5 +100,6 @@ class LocalDownloader(Downloader, ABC):
             raw_info={
                 'path':  file_path
             },
-            video_path=None
+            video_path=None,
+            audio_codec=audio_codec,
         )
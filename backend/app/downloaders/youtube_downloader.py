@@ -1,12 +1,16 @@
 import os
 from abc import ABC
-from typing import Union, Optional
+from typing import Dict, Iterable, Union, Optional, List, Tuple
 
 import yt_dlp
 
-from app.downloaders.base import Downloader, DownloadQuality
+from app.downloaders.base import Downloader, DownloadQuality, audio_download_stats, audio_format_options
+from app.downloaders.common import fetch_clips
 from app.models.notes_model import AudioDownloadResult
+from app.models.transcriber_model import TranscriptResult
+from app.utils.audio_helper import probe_audio_codec
 from app.utils.path_helper import get_data_dir
+from app.utils.subtitle_helper import fetch_subtitle_transcript
 from app.utils.url_parser import extract_video_id
 
 
@@ -30,8 +34,9 @@ class YoutubeDownloader(Downloader, ABC):
 
         output_path = os.path.join(output_dir, "%(id)s.%(ext)s")
 
+        # 按下载质量选最小的够用音频流（优先 opus / aac）
         ydl_opts = {
-            'format': 'bestaudio[ext=m4a]/bestaudio/best',
+            **audio_format_options(quality),
             'outtmpl': output_path,
             'noplaylist': True,
             'quiet': False,
@@ -55,9 +60,35 @@ class YoutubeDownloader(Downloader, ABC):
             platform="youtube",
             video_id=video_id,
             raw_info={'tags':info.get('tags')}, #全部返回会报错
-            video_path=None  # ❗音频下载不包含视频路径
+            video_path=None,  # ❗音频下载不包含视频路径
+            audio_codec=probe_audio_codec(audio_path) or info.get("acodec"),
+            download_stats=audio_download_stats(info, audio_path),
         )
 
+    def download_subtitles(
+        self,
+        video_url: str,
+        langs: Optional[List[str]] = None,
+    ) -> Optional[Tuple[AudioDownloadResult, TranscriptResult]]:
+        """
+        仅抓取元信息，存在人工字幕或原语言自动字幕时直接返回字幕转写结果
+        """
+        info, transcript = fetch_subtitle_transcript(video_url, langs)
+        if not transcript:
+            return None
+
+        audio = AudioDownloadResult(
+            file_path="",
+            title=info.get("title"),
+            duration=info.get("duration", 0),
+            cover_url=info.get("thumbnail"),
+            platform="youtube",
+            video_id=info.get("id"),
+            raw_info={'tags': info.get('tags')},
+            video_path=None
+        )
+        return audio, transcript
+
     def download_video(
         self,
         video_url: str,
@@ -92,3 +123,14 @@ class YoutubeDownloader(Downloader, ABC):
             raise FileNotFoundError(f"视频文件未找到: {video_path}")
 
         return video_path
+
+    def download_clips(
+        self,
+        video_url: str,
+        timestamps: Iterable[float],
+        output_dir: str,
+    ) -> Optional[Dict[float, Tuple[str, float]]]:
+        """
+        只下载截图时间点附近的低分辨率纯视频片段
+        """
+        return fetch_clips(video_url, timestamps, output_dir)
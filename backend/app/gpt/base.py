@@ -1,3 +1,4 @@
+import asyncio
 from abc import ABC,abstractmethod
 
 from app.models.gpt_model import GPTSource
@@ -14,4 +15,16 @@ class GPT(ABC):
     def create_messages(self, segments:list,**kwargs)->list:
         pass
     def list_models(self):
-        pass
\ No newline at end of file
+        pass
+
+    async def acreate_messages(self, segments: list, **kwargs) -> list:
+        return self.create_messages(segments, **kwargs)
+
+    async def asummarize(self, source: GPTSource) -> str:
+        '''
+        异步总结，默认在线程中执行同步的 summarize，子类可用异步客户端覆盖
+
+        :param source:
+        :return:
+        '''
+        return await asyncio.to_thread(self.summarize, source)
@@ -1,7 +1,12 @@
+from functools import partial
+from typing import List
+
 from openai import OpenAI
 
 from app.gpt.base import GPT
+from app.gpt.provider import client_registry, rate_limiter
 from app.gpt.provider.OpenAI_compatible_provider import OpenAICompatibleProvider
+from app.gpt.routed_gpt import RoutedGPT
 from app.gpt.universal_gpt import UniversalGPT
 from app.models.model_config import ModelConfig
 
@@ -9,5 +14,33 @@ from app.models.model_config import ModelConfig
 class GPTFactory:
     @staticmethod
     def from_config(config: ModelConfig) -> GPT:
-        client = OpenAICompatibleProvider(api_key=config.api_key, base_url=config.base_url).get_client
-        return UniversalGPT(client=client, model=config.model_name)
\ No newline at end of file
+        client = OpenAICompatibleProvider(
+            api_key=config.api_key,
+            base_url=config.base_url,
+            provider_id=config.provider_id,
+        ).get_client
+        async_client = partial(client_registry.get_async_client, config.provider_id, config.base_url, config.api_key)
+        return UniversalGPT(
+            client=client,
+            model=config.model_name,
+            provider=f"{config.provider}:{config.base_url}",
+            async_client=async_client,
+            provider_id=config.provider_id,
+            limiter=rate_limiter.get_limiter(
+                config.provider_id,
+                rpm=config.rpm_limit,
+                tpm=config.tpm_limit,
+                max_concurrency=config.max_concurrency,
+            ),
+        )
+
+    @staticmethod
+    def from_group(group: dict, configs: List[ModelConfig]) -> GPT:
+        """
+        为供应商组构建 GPT，每个成员供应商复用各自的连接池与限流器
+
+        :param group: 供应商组信息（id / name / strategy）
+        :param configs: 组内各成员的 ModelConfig，按优先级排列
+        """
+        members = [(config.provider_id, GPTFactory.from_config(config)) for config in configs]
+        return RoutedGPT(group_id=group["id"], name=group["name"], members=members, strategy=group["strategy"])
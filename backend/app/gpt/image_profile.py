@@ -0,0 +1,88 @@
+import os
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+# 图片格式与压缩质量；WEBP 体积更小，但部分 OpenAI 兼容接口不支持
+VIDEO_IMAGE_FORMAT = os.getenv("VIDEO_IMAGE_FORMAT", "jpeg").lower()
+VIDEO_IMAGE_QUALITY = int(os.getenv("VIDEO_IMAGE_QUALITY", "80"))
+
+
+@dataclass(frozen=True)
+class ImageProfile:
+    """
+    模型的图片切片规则：超过 max_long / max_short 的部分会被服务端缩小，
+    按 tile 切块计费，因此发送更大的图片只会增加体积而不会增加信息量。
+    """
+    max_long: int
+    max_short: int
+    tile: int
+    webp: bool = True
+
+
+# OpenAI：长边 ≤ 2048、短边缩到 768，按 512px 切块
+_OPENAI = ImageProfile(max_long=2048, max_short=768, tile=512)
+# Claude：长边超过 1568 会被缩小
+_CLAUDE = ImageProfile(max_long=1568, max_short=1568, tile=1568)
+# Gemini：按 768px 切块
+_GEMINI = ImageProfile(max_long=1536, max_short=768, tile=768)
+# Qwen-VL：28px patch，默认像素上限约 1280 × 28 × 28
+_QWEN = ImageProfile(max_long=1344, max_short=756, tile=28, webp=False)
+# 未知模型：按较保守的 OpenAI 规则，并使用兼容性最好的 JPEG
+_DEFAULT = ImageProfile(max_long=2048, max_short=768, tile=512, webp=False)
+
+_PROFILES = (
+    (("gpt-", "o1", "o3", "o4", "chatgpt"), _OPENAI),
+    (("claude",), _CLAUDE),
+    (("gemini",), _GEMINI),
+    (("qwen", "qvq"), _QWEN),
+)
+
+
+def get_image_profile(model_name: Optional[str]) -> ImageProfile:
+    """根据模型名称匹配图片切片规则，未知模型返回默认规则"""
+    name = (model_name or "").lower().split("/")[-1]
+    for prefixes, profile in _PROFILES:
+        if name.startswith(prefixes):
+            return profile
+    return _DEFAULT
+
+
+def grid_cell_size(
+    profile: ImageProfile,
+    grid_size: Tuple[int, int],
+    aspect: float = 16 / 9,
+) -> Tuple[int, int]:
+    """
+    计算网格中每个单元格的尺寸，使整张拼图刚好落在模型不会再缩放的范围内，
+    并把拼图尺寸向下对齐到切块大小，避免为不完整的切块付费。
+
+    :param profile: 模型的图片切片规则
+    :param grid_size: (列数, 行数)
+    :param aspect: 单帧宽高比
+    :return: (单元格宽, 单元格高)
+    """
+    cols, rows = grid_size
+    width, height = cols * aspect, float(rows)
+    long_side, short_side = max(width, height), min(width, height)
+    scale = min(profile.max_long / long_side, profile.max_short / short_side)
+    width, height = width * scale, height * scale
+
+    # 切块大于 1/2 短边时对齐会损失过多分辨率，此时不对齐
+    if profile.tile * 2 <= min(width, height):
+        width = width // profile.tile * profile.tile
+        height = height // profile.tile * profile.tile
+    cell_width, cell_height = int(width // cols), int(height // rows)
+    # 保持单帧比例，以较紧的一边为准
+    if cell_width / cell_height > aspect:
+        cell_width = int(cell_height * aspect)
+    else:
+        cell_height = int(cell_width / aspect)
+    return max(cell_width, 16), max(cell_height, 9)
+
+
+def image_encoding(profile: ImageProfile) -> Tuple[str, int]:
+    """返回 (格式, 质量)；模型不支持 WEBP 时退回 JPEG"""
+    image_format = VIDEO_IMAGE_FORMAT if VIDEO_IMAGE_FORMAT in ("jpeg", "webp") else "jpeg"
+    if image_format == "webp" and not profile.webp:
+        image_format = "jpeg"
+    return image_format, VIDEO_IMAGE_QUALITY
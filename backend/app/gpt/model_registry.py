@@ -0,0 +1,147 @@
+import json
+import os
+import sys
+import threading
+from dataclasses import asdict, dataclass, replace
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple, Union
+
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# MODEL_CAPABILITIES_FILE 指向与 model_capabilities.json 同格式的文件时，覆盖 / 补充内置条目
+MODEL_CAPABILITIES_FILE = os.getenv("MODEL_CAPABILITIES_FILE", "")
+# 估算时每张图片（已按模型切片规则缩放的网格图）占用的 token 数
+IMAGE_TOKENS = int(os.getenv("IMAGE_TOKEN_ESTIMATE", "1100"))
+
+
+@dataclass(frozen=True)
+class ModelCapabilities:
+    context_tokens: int                      # 上下文窗口（输入 + 输出）
+    max_output_tokens: Optional[int] = None  # 单次输出上限，未知时不设置 max_tokens
+    vision: bool = True                      # 是否支持图片输入
+    prompt_caching: bool = False             # 供应商是否对相同前缀做缓存
+    reasoning: bool = False                  # 推理模型（o 系列、gpt-5）：输出上限用 max_completion_tokens，不接受 temperature
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+_default: Optional[ModelCapabilities] = None
+_by_prefix: Dict[str, ModelCapabilities] = {}
+# 从供应商 list_models 接口发现的能力，按 (provider_id, model_name) 记录，优先级最高
+_discovered: Dict[Tuple[str, str], ModelCapabilities] = {}
+_lock = threading.Lock()
+
+
+def get_builtin_capabilities_path() -> Path:
+    if getattr(sys, 'frozen', False):
+        return Path(sys._MEIPASS) / "model_capabilities.json"
+    return Path(__file__).with_name("model_capabilities.json")
+
+
+def _load_file(path: Path) -> None:
+    global _default
+    data = json.loads(path.read_text(encoding="utf-8"))
+    if data.get("default"):
+        _default = ModelCapabilities(**data["default"])
+    for prefix, caps in (data.get("models") or {}).items():
+        _by_prefix[prefix.lower()] = ModelCapabilities(**caps)
+
+
+def _ensure_loaded() -> None:
+    if _default is not None:
+        return
+    with _lock:
+        if _default is not None:
+            return
+        _load_file(get_builtin_capabilities_path())
+        if MODEL_CAPABILITIES_FILE:
+            try:
+                _load_file(Path(MODEL_CAPABILITIES_FILE))
+            except Exception as e:
+                logger.warning(f"读取模型能力配置失败 ({MODEL_CAPABILITIES_FILE})：{e}")
+
+
+def _from_config(model_name: str) -> ModelCapabilities:
+    name = (model_name or "").lower().split("/")[-1]
+    match = max((prefix for prefix in _by_prefix if name.startswith(prefix)), key=len, default=None)
+    return _by_prefix[match] if match else _default
+
+
+def get_capabilities(model_name: str, provider_id: Optional[Union[str, int]] = None) -> ModelCapabilities:
+    """
+    查询模型能力：优先使用供应商接口返回的信息，其次按模型名最长前缀匹配配置，最后使用默认值
+
+    :param model_name: 请求用的模型名称
+    :param provider_id: 供应商 ID
+    """
+    _ensure_loaded()
+    discovered = _discovered.get((str(provider_id), model_name))
+    return discovered or _from_config(model_name)
+
+
+def _first(data: dict, *keys):
+    for key in keys:
+        value = data.get(key)
+        if value:
+            return value
+    return None
+
+
+def register_models(provider_id: Union[str, int], models: Iterable) -> int:
+    """
+    从 list_models 的返回中提取能力信息（OpenRouter / Groq / vLLM / Gemini 等会附带上下文长度），
+    没有提供的字段沿用配置中的值
+
+    :param provider_id: 供应商 ID
+    :param models: list_models 返回的模型对象或字典
+    :return: 更新的模型数量
+    """
+    _ensure_loaded()
+    count = 0
+    for model in models or []:
+        data = model.model_dump() if hasattr(model, "model_dump") else dict(model)
+        model_name = data.get("id")
+        if not model_name:
+            continue
+        top_provider = data.get("top_provider") or {}
+        architecture = data.get("architecture") or {}
+        context = _first(data, "context_length", "context_window", "max_model_len",
+                         "max_context_length", "input_token_limit", "inputTokenLimit") \
+            or top_provider.get("context_length")
+        max_output = _first(data, "max_completion_tokens", "max_output_tokens",
+                            "output_token_limit", "outputTokenLimit") \
+            or top_provider.get("max_completion_tokens")
+        modalities = architecture.get("input_modalities") or architecture.get("modality")
+        if not (context or max_output or modalities):
+            continue
+
+        caps = _from_config(model_name)
+        updates = {}
+        if context:
+            updates["context_tokens"] = int(context)
+        if max_output:
+            updates["max_output_tokens"] = int(max_output)
+        if modalities:
+            updates["vision"] = "image" in (modalities if isinstance(modalities, list) else str(modalities).split("->")[0])
+        with _lock:
+            _discovered[(str(provider_id), model_name)] = replace(caps, **updates)
+        count += 1
+    if count:
+        logger.info(f"从供应商 {provider_id} 的模型列表更新了 {count} 个模型的能力信息")
+    return count
+
+
+def merge(capabilities: Iterable[ModelCapabilities]) -> ModelCapabilities:
+    """多个模型（如供应商组成员）共同可用的能力：取最小的上下文与输出上限"""
+    caps = list(capabilities)
+    outputs = [c.max_output_tokens for c in caps if c.max_output_tokens]
+    return ModelCapabilities(
+        context_tokens=min(c.context_tokens for c in caps),
+        max_output_tokens=min(outputs) if outputs else None,
+        vision=all(c.vision for c in caps),
+        prompt_caching=all(c.prompt_caching for c in caps),
+        reasoning=any(c.reasoning for c in caps),
+    )
@@ -1,4 +1,7 @@
-from app.gpt.prompt import BASE_PROMPT
+from app.gpt.prompt import (
+    BASE_PROMPT, SYSTEM_PROMPT, USER_PROMPT,
+    CHUNK_SYSTEM_PROMPT, CHUNK_USER_PROMPT, REDUCE_SYSTEM_PROMPT, REDUCE_USER_PROMPT,
+)
 
 note_formats = [
     {'label': '目录', 'value': 'toc'},
@@ -29,10 +32,66 @@ def generate_base_prompt(title, segment_text, tags, _format=None, style=None, ex
         segment_text=segment_text,
         tags=tags
     )
+    return _append_requirements(prompt, _format, style, extras)
 
+
+# 固定说明部分（system 消息）：只由格式与风格决定，相同选项的请求得到逐字节相同的前缀
+def generate_system_prompt(_format=None, style=None):
+    return _append_requirements(SYSTEM_PROMPT, _format, style)
+
+
+# 视频相关部分（user 消息）：标题、标签、转写与用户的额外要求
+def generate_user_prompt(title, segment_text, tags, extras=None):
+    prompt = USER_PROMPT.format(
+        video_title=title,
+        segment_text=segment_text,
+        tags=tags
+    )
+    return _append_requirements(prompt, extras=extras)
+
+
+# 分段总结（map 阶段）：只要求保留时间标记，风格与总结留到合并阶段
+def generate_chunk_system_prompt(_format=None):
+    marker_formats = [f for f in _ordered_formats(_format) if f in ('link', 'screenshot')]
+    return _append_requirements(CHUNK_SYSTEM_PROMPT, marker_formats)
+
+
+def generate_chunk_prompt(title, segment_text, tags, index, total, time_range):
+    return CHUNK_USER_PROMPT.format(
+        video_title=title,
+        segment_text=segment_text,
+        tags=tags,
+        index=index,
+        total=total,
+        time_range=time_range,
+    )
+
+
+# 合并分段笔记（reduce 阶段）
+def generate_reduce_system_prompt(_format=None, style=None):
+    return _append_requirements(REDUCE_SYSTEM_PROMPT, _format, style)
+
+
+def generate_reduce_prompt(title, chunk_notes, tags, extras=None):
+    prompt = REDUCE_USER_PROMPT.format(
+        video_title=title,
+        chunk_notes=chunk_notes,
+        tags=tags
+    )
+    return _append_requirements(prompt, extras=extras)
+
+
+def _ordered_formats(_format=None):
+    """按 note_formats 的固定顺序去重排列，避免前端勾选顺序不同导致前缀不一致"""
+    selected = set(_format or [])
+    known = [item['value'] for item in note_formats]
+    return [f for f in known if f in selected] + sorted(selected - set(known))
+
+
+def _append_requirements(prompt, _format=None, style=None, extras=None):
     # 添加用户选择的格式
     if _format:
-        prompt += "\n" + "\n".join([get_format_function(f, style) for f in _format])
+        prompt += "\n" + "\n".join([get_format_function(f, style) for f in _ordered_formats(_format)])
 
     # 根据用户选择的笔记风格添加描述
     if style:
@@ -2,12 +2,15 @@ from typing import Optional, Union
 
 from openai import OpenAI
 
+from app.gpt.provider import client_registry
 from app.utils.logger import get_logger
 
 logging= get_logger(__name__)
 class OpenAICompatibleProvider:
-    def __init__(self, api_key: str, base_url: str, model: Union[str, None]=None):
-        self.client = OpenAI(api_key=api_key, base_url=base_url)
+    def __init__(self, api_key: str, base_url: str, model: Union[str, None]=None,
+                 provider_id: Optional[Union[str, int]] = None):
+        # 复用该供应商的长连接客户端
+        self.client = client_registry.get_client(provider_id, base_url, api_key)
         self.model = model
 
     @property
@@ -17,8 +20,9 @@ class OpenAICompatibleProvider:
     @staticmethod
     def test_connection(api_key: str, base_url: str) -> bool:
         try:
-            client = OpenAI(api_key=api_key, base_url=base_url)
-            model = client.models.list()
+            # 测试的可能是尚未保存的配置，用一次性客户端（保留 SDK 默认重试），用完即关闭，不进入连接池缓存
+            with OpenAI(api_key=api_key, base_url=base_url, timeout=client_registry.test_timeout()) as client:
+                model = client.models.list()
             # for segment in model:
             #     print(segment)
             # print(model)
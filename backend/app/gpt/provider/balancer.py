@@ -0,0 +1,132 @@
+import os
+import threading
+import time
+from typing import Dict, List, Sequence, Union
+
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 连续失败多少次后熔断，熔断多久（秒）后放行一次试探请求
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("LLM_CIRCUIT_FAILURE_THRESHOLD", "3"))
+CIRCUIT_RESET_SECONDS = float(os.getenv("LLM_CIRCUIT_RESET_SECONDS", "30"))
+# 延迟 EWMA 的平滑系数，越大越看重最近的请求
+LATENCY_EWMA_ALPHA = float(os.getenv("LLM_LATENCY_EWMA_ALPHA", "0.3"))
+
+STRATEGY_LEAST_OUTSTANDING = "least_outstanding"
+STRATEGY_LATENCY_EWMA = "latency_ewma"
+
+
+class ProviderStats:
+    """
+    单个供应商的运行状态：在途请求数、延迟 EWMA 与熔断器。
+    所有任务共享同一份状态，路由时可以看到其它任务的负载。
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, provider_id: str):
+        self.provider_id = provider_id
+        self.outstanding = 0
+        self.latency_ewma = None
+        self.failures = 0
+        self.state = self.CLOSED
+        self.opened_at = 0.0
+        self.probe_started = None  # 半开状态下在途试探请求的开始时间
+        self._lock = threading.Lock()
+
+    def _can_probe(self, now: float) -> bool:
+        if self.state == self.OPEN:
+            return now - self.opened_at >= CIRCUIT_RESET_SECONDS
+        # 半开：没有在途的试探请求，或试探超过 CIRCUIT_RESET_SECONDS 仍未结束时再放行一次
+        return self.probe_started is None or now - self.probe_started >= CIRCUIT_RESET_SECONDS
+
+    def available(self) -> bool:
+        """只读判断，不改变熔断状态；路由排序时会对每个候选调用"""
+        with self._lock:
+            return self.state == self.CLOSED or self._can_probe(time.monotonic())
+
+    def start(self) -> float:
+        now = time.monotonic()
+        with self._lock:
+            self.outstanding += 1
+            if self.state != self.CLOSED and self._can_probe(now):
+                # 请求真正发往该供应商时才转为半开，作为试探请求
+                self.state = self.HALF_OPEN
+                self.probe_started = now
+        return now
+
+    def succeed(self, started: float) -> None:
+        latency = time.monotonic() - started
+        with self._lock:
+            self.outstanding -= 1
+            self.failures = 0
+            self.state = self.CLOSED
+            self.probe_started = None
+            self.latency_ewma = latency if self.latency_ewma is None else \
+                LATENCY_EWMA_ALPHA * latency + (1 - LATENCY_EWMA_ALPHA) * self.latency_ewma
+
+    def release(self) -> None:
+        """请求因客户端错误（4xx、代码异常）结束：供应商本身正常，不计入失败"""
+        with self._lock:
+            self.outstanding -= 1
+            if self.state == self.HALF_OPEN:
+                # 试探请求没有得出结论，下次路由时重新试探
+                self.probe_started = None
+
+    def fail(self) -> None:
+        with self._lock:
+            self.outstanding -= 1
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= CIRCUIT_FAILURE_THRESHOLD:
+                if self.state != self.OPEN:
+                    logger.warning(f"供应商 {self.provider_id} 连续失败 {self.failures} 次，熔断 {CIRCUIT_RESET_SECONDS:.0f}s")
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+                self.probe_started = None
+
+    def to_dict(self) -> dict:
+        return {
+            "provider_id": self.provider_id,
+            "outstanding": self.outstanding,
+            "latency_ewma": self.latency_ewma,
+            "failures": self.failures,
+            "state": self.state,
+        }
+
+
+_stats: Dict[str, ProviderStats] = {}
+_lock = threading.Lock()
+
+
+def get_stats(provider_id: Union[str, int]) -> ProviderStats:
+    key = str(provider_id)
+    with _lock:
+        if key not in _stats:
+            _stats[key] = ProviderStats(key)
+        return _stats[key]
+
+
+def rank(provider_ids: Sequence[str], strategy: str = STRATEGY_LEAST_OUTSTANDING) -> List[str]:
+    """
+    按路由策略对组内供应商排序，返回依次尝试的顺序。
+    熔断中的供应商排在最后，全部熔断时仍会依次尝试，避免任务直接失败。
+
+    :param provider_ids: 按优先级排列的供应商 ID
+    :param strategy: least_outstanding（在途请求最少）或 latency_ewma（期望等待最短）
+    """
+    def score(item):
+        priority, stats = item
+        if strategy == STRATEGY_LATENCY_EWMA:
+            # 未测过延迟的供应商优先试探；期望等待 ≈ 延迟 × (在途 + 1)
+            latency = stats.latency_ewma if stats.latency_ewma is not None else 0.0
+            return latency * (stats.outstanding + 1), priority
+        return stats.outstanding, priority
+
+    candidates = [(i, get_stats(pid)) for i, pid in enumerate(provider_ids)]
+    healthy = [c for c in candidates if c[1].available()]
+    tripped = [c for c in candidates if c not in healthy]
+    ordered = sorted(healthy, key=score) + sorted(tripped, key=lambda c: c[1].opened_at)
+    return [provider_ids[i] for i, _ in ordered]
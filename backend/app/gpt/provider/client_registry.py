@@ -0,0 +1,140 @@
+import asyncio
+import os
+import threading
+import weakref
+from typing import Awaitable, Dict, Optional, Tuple, TypeVar, Union
+
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient, DefaultHttpxClient, OpenAI
+
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 每个供应商连接池的上限与超时（秒）
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "20"))
+LLM_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("LLM_MAX_KEEPALIVE_CONNECTIONS", "10"))
+LLM_KEEPALIVE_EXPIRY = float(os.getenv("LLM_KEEPALIVE_EXPIRY", "60"))
+LLM_CONNECT_TIMEOUT = float(os.getenv("LLM_CONNECT_TIMEOUT", "10"))
+LLM_READ_TIMEOUT = float(os.getenv("LLM_READ_TIMEOUT", "600"))
+
+ClientKey = Tuple[Optional[str], str, str]
+
+_clients: Dict[ClientKey, OpenAI] = {}
+# 异步客户端的连接池绑定在事件循环上，按事件循环分别缓存
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[ClientKey, AsyncOpenAI]]" = \
+    weakref.WeakKeyDictionary()
+_lock = threading.Lock()
+
+_shared_loop: Optional[asyncio.AbstractEventLoop] = None
+
+T = TypeVar("T")
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=LLM_MAX_CONNECTIONS,
+        max_keepalive_connections=LLM_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=LLM_KEEPALIVE_EXPIRY,
+    )
+
+
+def _timeout() -> httpx.Timeout:
+    return httpx.Timeout(LLM_READ_TIMEOUT, connect=LLM_CONNECT_TIMEOUT)
+
+
+def test_timeout() -> httpx.Timeout:
+    """连通性测试用的超时：连接超时与连接池一致，读取超时不必等满 LLM_READ_TIMEOUT"""
+    return httpx.Timeout(30, connect=LLM_CONNECT_TIMEOUT)
+
+
+def _key(provider_id: Optional[Union[str, int]], base_url: str, api_key: str) -> ClientKey:
+    return (str(provider_id) if provider_id is not None else None, base_url or "", api_key or "")
+
+
+def get_client(provider_id: Optional[Union[str, int]], base_url: str, api_key: str) -> OpenAI:
+    """
+    获取 (provider_id, base_url, api_key) 对应的长连接客户端，不存在时创建。
+    同一供应商的所有任务共享一个 httpx 连接池，避免每次重新握手。
+
+    :param provider_id: 供应商 ID（未入库的临时配置可为 None）
+    :param base_url: OpenAI 兼容接口地址
+    :param api_key: API Key
+    """
+    key = _key(provider_id, base_url, api_key)
+    client = _clients.get(key)
+    if client is not None:
+        return client
+
+    with _lock:
+        client = _clients.get(key)
+        if client is None:
+            client = OpenAI(
+                api_key=api_key,
+                base_url=base_url,
+                timeout=_timeout(),
+                max_retries=0,  # 由 rate_limiter 统一重试（带抖动并遵循 Retry-After）
+                http_client=DefaultHttpxClient(limits=_limits(), timeout=_timeout()),
+            )
+            _clients[key] = client
+            logger.info(f"创建供应商客户端连接池 (provider_id={provider_id}, base_url={base_url})")
+    return client
+
+
+def get_async_client(provider_id: Optional[Union[str, int]], base_url: str, api_key: str) -> AsyncOpenAI:
+    """
+    获取当前事件循环上 (provider_id, base_url, api_key) 对应的 AsyncOpenAI 客户端，需在协程中调用
+    """
+    loop = asyncio.get_running_loop()
+    key = _key(provider_id, base_url, api_key)
+    with _lock:
+        clients = _async_clients.setdefault(loop, {})
+        client = clients.get(key)
+        if client is None:
+            client = AsyncOpenAI(
+                api_key=api_key,
+                base_url=base_url,
+                timeout=_timeout(),
+                max_retries=0,  # 由 rate_limiter 统一重试（带抖动并遵循 Retry-After）
+                http_client=DefaultAsyncHttpxClient(limits=_limits(), timeout=_timeout()),
+            )
+            clients[key] = client
+            logger.info(f"创建供应商异步客户端 (provider_id={provider_id}, base_url={base_url})")
+    return client
+
+
+def _get_shared_loop() -> asyncio.AbstractEventLoop:
+    global _shared_loop
+    with _lock:
+        if _shared_loop is None:
+            _shared_loop = asyncio.new_event_loop()
+            threading.Thread(target=_shared_loop.run_forever, name="llm-async-loop", daemon=True).start()
+    return _shared_loop
+
+
+def run_async(coro: Awaitable[T]) -> T:
+    """
+    在进程共享的后台事件循环上执行协程并等待结果，供同步代码（后台任务线程）调用。
+    所有任务的异步请求共用这一个事件循环及其上的连接池。
+    """
+    return asyncio.run_coroutine_threadsafe(coro, _get_shared_loop()).result()
+
+
+def invalidate(provider_id: Union[str, int]) -> int:
+    """
+    移除某个供应商的所有客户端（供应商配置更新或删除时调用）。
+    正在使用旧客户端的任务持有自己的引用，不受影响；旧连接池在引用释放后回收。
+
+    :return: 移除的客户端数量
+    """
+    provider_id = str(provider_id)
+    with _lock:
+        stale = [key for key in _clients if key[0] == provider_id]
+        for key in stale:
+            _clients.pop(key, None)
+        for clients in _async_clients.values():
+            for key in [key for key in clients if key[0] == provider_id]:
+                clients.pop(key, None)
+    if stale:
+        logger.info(f"已移除供应商客户端 (provider_id={provider_id}, count={len(stale)})")
+    return len(stale)
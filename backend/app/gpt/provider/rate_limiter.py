@@ -0,0 +1,261 @@
+import asyncio
+import email.utils
+import os
+import random
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Awaitable, Callable, Dict, Optional, TypeVar, Union
+
+import httpx
+import openai
+from tenacity import AsyncRetrying, Retrying, retry_if_exception, stop_after_attempt, wait_random_exponential
+
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 供应商未单独配置时的默认限制，0 表示不限制
+LLM_DEFAULT_RPM = int(os.getenv("LLM_DEFAULT_RPM", "0"))
+LLM_DEFAULT_TPM = int(os.getenv("LLM_DEFAULT_TPM", "0"))
+LLM_DEFAULT_MAX_CONCURRENCY = int(os.getenv("LLM_DEFAULT_MAX_CONCURRENCY", "0"))
+# 429 / 5xx / 网络错误的重试次数；退避的单次最长等待（秒），Retry-After 更长时以其为准
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "5"))
+LLM_RETRY_MAX_WAIT = float(os.getenv("LLM_RETRY_MAX_WAIT", "60"))
+
+T = TypeVar("T")
+
+
+class TokenBucket:
+    """
+    每分钟补满的令牌桶。采用预约方式：先扣减令牌，余额为负时返回需要等待的秒数，
+    同步与异步调用方各自 sleep，互不阻塞。
+    """
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float = 1) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            # 单次请求超过整桶容量时按整桶计，避免永远等不到
+            self.tokens -= min(amount, self.capacity)
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+
+class ProviderLimiter:
+    """
+    单个供应商的限流器：请求数/分钟、token 数/分钟两个令牌桶，加上并发上限。
+    并发上限用线程信号量实现，同步调用与异步调用共享同一个计数；
+    异步调用方不阻塞线程等待，而是挂起在 future 上，由释放许可的一方唤醒。
+    """
+
+    def __init__(self, rpm: int = 0, tpm: int = 0, max_concurrency: int = 0):
+        self.rpm = TokenBucket(rpm) if rpm else None
+        self.tpm = TokenBucket(tpm) if tpm else None
+        self.semaphore = threading.BoundedSemaphore(max_concurrency) if max_concurrency else None
+        self._waiters = deque()  # 等待许可的异步调用方 (事件循环, future)
+        self._waiters_lock = threading.Lock()
+
+    def _reserve(self, tokens: int) -> float:
+        wait = 0.0
+        if self.rpm:
+            wait = max(wait, self.rpm.reserve(1))
+        if self.tpm:
+            wait = max(wait, self.tpm.reserve(tokens))
+        return wait
+
+    @contextmanager
+    def limit(self, tokens: int = 0):
+        wait = self._reserve(tokens)
+        if wait > 0:
+            logger.info(f"触发供应商限流，等待 {wait:.1f}s")
+            time.sleep(wait)
+        if self.semaphore:
+            self.semaphore.acquire()
+        try:
+            yield
+        finally:
+            if self.semaphore:
+                self._release()
+
+    @asynccontextmanager
+    async def alimit(self, tokens: int = 0):
+        wait = self._reserve(tokens)
+        if wait > 0:
+            logger.info(f"触发供应商限流，等待 {wait:.1f}s")
+            await asyncio.sleep(wait)
+        if self.semaphore:
+            await self._aacquire()
+        try:
+            yield
+        finally:
+            if self.semaphore:
+                self._release()
+
+    def _release(self) -> None:
+        self.semaphore.release()
+        self._wake_one()
+
+    def _wake_one(self) -> None:
+        with self._waiters_lock:
+            while self._waiters:
+                loop, future = self._waiters.popleft()
+                try:
+                    loop.call_soon_threadsafe(_resolve, future)
+                    return
+                except RuntimeError:
+                    # 事件循环已关闭
+                    continue
+
+    def _dequeue(self, waiter: tuple) -> bool:
+        """从等待队列移除，返回 False 表示已被唤醒（出队）过"""
+        with self._waiters_lock:
+            try:
+                self._waiters.remove(waiter)
+                return True
+            except ValueError:
+                return False
+
+    async def _aacquire(self) -> None:
+        loop = asyncio.get_running_loop()
+        while not self.semaphore.acquire(blocking=False):
+            waiter = (loop, loop.create_future())
+            with self._waiters_lock:
+                self._waiters.append(waiter)
+            # 入队前刚释放的许可没有唤醒任何人，入队后再试一次
+            if self.semaphore.acquire(blocking=False):
+                if not self._dequeue(waiter):
+                    self._wake_one()
+                return
+            try:
+                await waiter[1]
+            except asyncio.CancelledError:
+                # 已被唤醒却取消了，把这次唤醒转交给下一个等待者，许可不会泄漏
+                if not self._dequeue(waiter):
+                    self._wake_one()
+                raise
+
+
+def _resolve(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+_limiters: Dict[str, tuple] = {}
+_lock = threading.Lock()
+
+
+def get_limiter(
+    provider_id: Optional[Union[str, int]],
+    rpm: Optional[int] = None,
+    tpm: Optional[int] = None,
+    max_concurrency: Optional[int] = None,
+) -> ProviderLimiter:
+    """
+    获取供应商的共享限流器，同一供应商的所有任务共用配额；配置变化时重新创建
+
+    :param provider_id: 供应商 ID
+    :param rpm: 每分钟请求数上限，None 时使用 LLM_DEFAULT_RPM
+    :param tpm: 每分钟 token 数上限，None 时使用 LLM_DEFAULT_TPM
+    :param max_concurrency: 并发请求上限，None 时使用 LLM_DEFAULT_MAX_CONCURRENCY
+    """
+    settings = (
+        rpm if rpm is not None else LLM_DEFAULT_RPM,
+        tpm if tpm is not None else LLM_DEFAULT_TPM,
+        max_concurrency if max_concurrency is not None else LLM_DEFAULT_MAX_CONCURRENCY,
+    )
+    key = str(provider_id)
+    with _lock:
+        cached = _limiters.get(key)
+        if cached is None or cached[0] != settings:
+            cached = (settings, ProviderLimiter(*settings))
+            _limiters[key] = cached
+    return cached[1]
+
+
+def invalidate(provider_id: Union[str, int]) -> None:
+    with _lock:
+        _limiters.pop(str(provider_id), None)
+
+
+# ---------------- 重试 ----------------
+
+def is_retryable(exc: BaseException) -> bool:
+    """
+    限流、5xx、连接与超时错误可以重试或切换供应商；其余 4xx 是请求本身的问题。
+    流式响应读到一半断开时，SDK 不做包装，直接抛出 httpx 的传输层异常（RemoteProtocolError、ReadTimeout 等）
+    """
+    if isinstance(exc, (openai.RateLimitError, openai.APIConnectionError, openai.APITimeoutError,
+                        httpx.TransportError)):
+        return True
+    if isinstance(exc, openai.APIStatusError):
+        return exc.status_code == 429 or exc.status_code >= 500
+    return False
+
+
+def _retry_after(exc: Optional[BaseException]) -> Optional[float]:
+    """解析响应头中的 retry-after-ms / retry-after（秒数或 HTTP 日期）"""
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        value = headers.get("retry-after")
+        if not value:
+            return None
+        try:
+            return float(value)
+        except ValueError:
+            parsed = email.utils.parsedate_to_datetime(value)
+            return max(0.0, parsed.timestamp() - time.time())
+    except Exception:
+        return None
+
+
+_backoff = wait_random_exponential(multiplier=1, max=LLM_RETRY_MAX_WAIT)
+
+
+def _wait(retry_state) -> float:
+    """带抖动的指数退避；服务端给出 Retry-After 时至少等待该时长"""
+    backoff = _backoff(retry_state)
+    retry_after = _retry_after(retry_state.outcome.exception())
+    if retry_after is not None:
+        return max(backoff, retry_after + random.uniform(0, 1))
+    return backoff
+
+
+def _before_sleep(retry_state) -> None:
+    exc = retry_state.outcome.exception()
+    logger.warning(
+        f"LLM 请求失败，{retry_state.next_action.sleep:.1f}s 后第 {retry_state.attempt_number} 次重试：{exc}"
+    )
+
+
+def _retry_kwargs() -> dict:
+    return dict(
+        retry=retry_if_exception(is_retryable),
+        wait=_wait,
+        stop=stop_after_attempt(LLM_MAX_RETRIES + 1),
+        before_sleep=_before_sleep,
+        reraise=True,
+    )
+
+
+def call_with_retry(fn: Callable[[], T]) -> T:
+    """在 429 / 5xx / 网络错误时重试 fn"""
+    return Retrying(**_retry_kwargs())(fn)
+
+
+async def acall_with_retry(fn: Callable[[], Awaitable[T]]) -> T:
+    """call_with_retry 的异步版本"""
+    return await AsyncRetrying(**_retry_kwargs())(fn)
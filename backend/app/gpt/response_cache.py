@@ -0,0 +1,152 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+LLM_CACHE_DIR = Path(os.getenv("LLM_CACHE_DIR", "note_results/llm_cache"))
+# 缓存有效期（秒），默认 7 天
+LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600)))
+# 缓存目录总大小上限（MB），超出后按最近使用时间淘汰
+LLM_CACHE_MAX_MB = int(os.getenv("LLM_CACHE_MAX_MB", "200"))
+
+
+def _digest(data: str) -> str:
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+def _normalize_messages(messages: list) -> list:
+    """把图片（通常是很长的 base64 data URL）替换为摘要，避免把整张图拼进 key"""
+    normalized = []
+    for message in messages:
+        content = message.get("content")
+        if isinstance(content, list):
+            items = []
+            for item in content:
+                if item.get("type") == "image_url":
+                    image = item.get("image_url") or {}
+                    items.append({
+                        "type": "image_url",
+                        "digest": _digest(image.get("url", "")),
+                        "detail": image.get("detail"),
+                    })
+                else:
+                    items.append(item)
+            content = items
+        normalized.append({**message, "content": content})
+    return normalized
+
+
+def make_cache_key(messages: list, model: str, provider: Optional[str], temperature: float) -> str:
+    """
+    计算确定性的缓存 key：消息（图片取摘要）、模型、供应商和温度的 sha256
+
+    :param messages: 发送给模型的完整消息
+    :param model: 模型名称
+    :param provider: 供应商标识
+    :param temperature: 采样温度
+    """
+    payload = json.dumps(
+        {
+            "messages": _normalize_messages(messages),
+            "model": model,
+            "provider": provider,
+            "temperature": temperature,
+        },
+        ensure_ascii=False,
+        sort_keys=True,
+    )
+    return _digest(payload)
+
+
+class LLMResponseCache:
+    """
+    磁盘 LLM 响应缓存：每个 key 一个 JSON 文件，读取时检查 TTL，
+    写入后按最近使用时间（文件 mtime）淘汰，直到总大小低于上限。
+    """
+
+    def __init__(self, cache_dir: Path = LLM_CACHE_DIR, ttl: int = LLM_CACHE_TTL, max_mb: int = LLM_CACHE_MAX_MB):
+        self.cache_dir = Path(cache_dir)
+        self.ttl = ttl
+        self.max_bytes = max_mb * 1024 * 1024
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def get(self, key: str) -> Optional[str]:
+        path = self._path(key)
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except Exception as e:
+            logger.warning(f"读取 LLM 缓存失败，忽略该条目: {path.name} {e}")
+            path.unlink(missing_ok=True)
+            return None
+
+        if self.ttl and time.time() - data.get("created_at", stat.st_mtime) > self.ttl:
+            path.unlink(missing_ok=True)
+            return None
+
+        os.utime(path)  # 记录最近使用时间，供淘汰使用
+        logger.info(f"命中 LLM 缓存: {key[:12]}")
+        return data.get("content")
+
+    def set(self, key: str, content: str, model: Optional[str] = None) -> None:
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        path = self._path(key)
+        temp_file = path.with_suffix(".tmp")
+        temp_file.write_text(
+            json.dumps({"created_at": time.time(), "model": model, "content": content}, ensure_ascii=False),
+            encoding="utf-8",
+        )
+        temp_file.replace(path)
+        self._evict()
+
+    def _evict(self) -> None:
+        with self._lock:
+            entries = []
+            total = 0
+            now = time.time()
+            for path in self.cache_dir.glob("*.json"):
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                if self.ttl and now - stat.st_mtime > self.ttl:
+                    path.unlink(missing_ok=True)
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+
+            if total <= self.max_bytes:
+                return
+            for _, size, path in sorted(entries):
+                path.unlink(missing_ok=True)
+                total -= size
+                if total <= self.max_bytes:
+                    break
+
+
+_cache: Optional[LLMResponseCache] = None
+
+
+def get_response_cache() -> Optional[LLMResponseCache]:
+    """返回全局缓存实例，LLM_CACHE_ENABLED=false 时返回 None"""
+    global _cache
+    if not LLM_CACHE_ENABLED:
+        return None
+    if _cache is None:
+        _cache = LLMResponseCache()
+    return _cache
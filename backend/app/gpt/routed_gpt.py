@@ -0,0 +1,122 @@
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.gpt import model_registry
+from app.gpt.model_registry import ModelCapabilities
+from app.gpt.provider import balancer
+from app.gpt.provider.rate_limiter import is_retryable
+from app.gpt.universal_gpt import UniversalGPT
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class RoutedGPT(UniversalGPT):
+    """
+    供应商组对应的 GPT：每次模型调用都按路由策略选择组内的一个供应商，
+    可重试的错误（限流、5xx、连接 / 超时，且已用尽该供应商自身的重试）记入熔断器并切换到下一个供应商，
+    其它错误直接抛出。
+    分段总结的每个分段、流式输出的续写都会单独路由，因此中途也能切换供应商。
+    """
+
+    def __init__(self, group_id: str, name: str, members: List[Tuple[str, UniversalGPT]],
+                 strategy: str = balancer.STRATEGY_LEAST_OUTSTANDING, temperature: float = 0.7):
+        """
+        :param group_id: 供应商组 ID
+        :param name: 逻辑模型名
+        :param members: [(provider_id, 该供应商的 UniversalGPT)]，按优先级排列
+        :param strategy: 路由策略 least_outstanding / latency_ewma
+        """
+        # 缓存 key 使用组标识，同一逻辑模型无论路由到哪个供应商都能命中
+        super().__init__(client=None, model=name, temperature=temperature, provider=f"group:{group_id}")
+        self.group_id = group_id
+        self.strategy = strategy
+        self.members: Dict[str, UniversalGPT] = {}
+        for provider_id, gpt in members:
+            gpt.temperature = temperature
+            gpt.usage = self.usage  # 成员的用量累计到组上
+            self.members.setdefault(str(provider_id), gpt)
+        if not self.members:
+            raise ValueError(f"供应商组 {group_id} 没有可用的成员")
+
+    @property
+    def supports_async(self) -> bool:
+        return all(gpt.supports_async for gpt in self.members.values())
+
+    @property
+    def capabilities(self) -> ModelCapabilities:
+        # 请求可能路由到任一成员，按所有成员共同支持的能力构建提示词
+        return model_registry.merge(gpt.capabilities for gpt in self.members.values())
+
+    def list_models(self):
+        return next(iter(self.members.values())).list_models()
+
+    def _candidates(self) -> List[str]:
+        return balancer.rank(list(self.members), self.strategy)
+
+    def _route(self, call: Callable[[UniversalGPT], str]) -> str:
+        last_exc: Optional[Exception] = None
+        for provider_id in self._candidates():
+            stats = balancer.get_stats(provider_id)
+            started = stats.start()
+            try:
+                result = call(self.members[provider_id])
+            except Exception as exc:
+                if not is_retryable(exc):
+                    # 请求本身有问题（参数错误、超出上下文、鉴权失败等），换供应商也不会成功
+                    stats.release()
+                    raise
+                stats.fail()
+                last_exc = exc
+                logger.warning(f"供应商组 {self.group_id} 中的供应商 {provider_id} 调用失败，尝试下一个：{exc}")
+                continue
+            stats.succeed(started)
+            return result
+        raise last_exc
+
+    async def _aroute(self, call) -> str:
+        last_exc: Optional[Exception] = None
+        for provider_id in self._candidates():
+            stats = balancer.get_stats(provider_id)
+            started = stats.start()
+            try:
+                result = await call(self.members[provider_id])
+            except Exception as exc:
+                if not is_retryable(exc):
+                    # 请求本身有问题（参数错误、超出上下文、鉴权失败等），换供应商也不会成功
+                    stats.release()
+                    raise
+                stats.fail()
+                last_exc = exc
+                logger.warning(f"供应商组 {self.group_id} 中的供应商 {provider_id} 调用失败，尝试下一个：{exc}")
+                continue
+            stats.succeed(started)
+            return result
+        raise last_exc
+
+    def _chat(self, messages: list) -> str:
+        return self._route(lambda gpt: gpt._chat(messages))
+
+    def _chat_stream(self, messages: list, on_delta: Optional[Callable[[str], None]] = None, partial: str = "") -> str:
+        # 记录已输出的内容，切换供应商后从断点续写
+        text = [partial or ""]
+
+        def track(delta: str):
+            text[0] += delta
+            if on_delta:
+                on_delta(delta)
+
+        return self._route(lambda gpt: gpt._chat_stream(messages, track, text[0]))
+
+    async def _achat(self, messages: list) -> str:
+        return await self._aroute(lambda gpt: gpt._achat(messages))
+
+    async def _achat_stream(self, messages: list, on_delta: Optional[Callable[[str], None]] = None,
+                            partial: str = "") -> str:
+        text = [partial or ""]
+
+        def track(delta: str):
+            text[0] += delta
+            if on_delta:
+                on_delta(delta)
+
+        return await self._aroute(lambda gpt: gpt._achat_stream(messages, track, text[0]))
@@ -0,0 +1,137 @@
+import os
+import re
+from dataclasses import dataclass
+from difflib import SequenceMatcher
+from typing import List, Optional
+
+from app.gpt.utils import estimate_tokens
+from app.models.transcriber_model import SegmentStore
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 压缩力度：0 关闭，1 轻度（合并短分段、去掉连续重复行），2 标准（再去近似重复与语气词），3 激进（更大的分块）
+TRANSCRIPT_COMPACTION_LEVEL = int(os.getenv("TRANSCRIPT_COMPACTION_LEVEL", "1"))
+
+# 各级别的分块参数：(块最少 token 数, 块最长秒数, 块最多 token 数)
+_LEVEL_PARAMS = {
+    1: (20, 15.0, 120),
+    2: (40, 30.0, 200),
+    3: (80, 60.0, 320),
+}
+# 需要插入原片跳转 / 截图时，块的时长上限，保证时间标记的粒度
+MARKER_MAX_BLOCK_SECONDS = 30.0
+# 相邻分段间隔超过该秒数（停顿 / 换场）时另起一块
+BLOCK_GAP_SECONDS = 5.0
+
+_SENTENCE_END = re.compile(r"[。！？!?.…；;]$")
+_FILLERS = re.compile(
+    r"(?:(?<=^)|(?<=[\s，,。.！!？?]))(?:嗯+|呃+|额+|啊+|唔+|um+|uh+|erm|you know)(?=$|[\s，,。.！!？?])[，,]?\s*",
+    re.IGNORECASE,
+)
+_AGGRESSIVE_FILLERS = re.compile(r"(?:那个|就是说|然后呢|对吧|you see|I mean)[，,]?\s*", re.IGNORECASE)
+# Whisper 的幻觉循环，如 "谢谢观看谢谢观看谢谢观看"
+_REPEATED_PHRASE = re.compile(r"(.{2,30}?)(?:\s*\1){2,}")
+
+
+@dataclass
+class CompactionStats:
+    level: int
+    segments_before: int
+    segments_after: int
+    tokens_before: int
+    tokens_after: int
+
+
+def _is_cjk(ch: str) -> bool:
+    return "\u3000" <= ch <= "\u9fff" or "\uff00" <= ch <= "\uffef"
+
+
+def _join(left: str, right: str) -> str:
+    if not left:
+        return right
+    if _is_cjk(left[-1]) or _is_cjk(right[0]):
+        return left + right
+    return f"{left} {right}"
+
+
+def _clean(text: str, level: int) -> str:
+    text = text.strip()
+    if level >= 2:
+        text = _REPEATED_PHRASE.sub(r"\1", text)
+        text = _FILLERS.sub("", text)
+    if level >= 3:
+        text = _AGGRESSIVE_FILLERS.sub("", text)
+    return text.strip(" ，,")
+
+
+def _is_repeat(text: str, recent: List[str], level: int) -> bool:
+    if text in recent:
+        return True
+    if level >= 2:
+        for prev in recent:
+            if abs(len(prev) - len(text)) <= max(len(text), len(prev)) * 0.2 \
+                    and SequenceMatcher(None, prev, text).ratio() >= 0.9:
+                return True
+    return False
+
+
+def compact_segments(
+    segments: SegmentStore,
+    level: Optional[int] = None,
+    keep_markers: bool = False,
+) -> tuple[SegmentStore, CompactionStats]:
+    """
+    压缩转写分段：清理语气词和重复行，并把相邻的短分段合并成以句子为单位的块，
+    每块只保留一个开始时间。块的开始时间始终是某个原始分段的开始时间，不会产生新的时间点。
+
+    :param segments: 原始分段
+    :param level: 压缩力度 0-3，默认读取 TRANSCRIPT_COMPACTION_LEVEL
+    :param keep_markers: 是否需要生成 Content / Screenshot 时间标记，需要时限制块的时长
+    :return: (压缩后的分段, 统计信息)
+    """
+    level = TRANSCRIPT_COMPACTION_LEVEL if level is None else level
+    tokens_before = sum(estimate_tokens(text) + 4 for _, _, text in segments.rows())
+    if level <= 0 or not segments:
+        return segments, CompactionStats(level, len(segments), len(segments), tokens_before, tokens_before)
+
+    min_tokens, max_seconds, max_tokens = _LEVEL_PARAMS[min(level, 3)]
+    if keep_markers:
+        max_seconds = min(max_seconds, MARKER_MAX_BLOCK_SECONDS)
+
+    compacted = SegmentStore()
+    recent: List[str] = []
+    block_start = block_end = None
+    block_text = ""
+
+    def flush():
+        nonlocal block_start, block_text
+        if block_text:
+            compacted.append(block_start, block_end, block_text)
+        block_start, block_text = None, ""
+
+    for start, end, text in segments.rows():
+        text = _clean(text, level)
+        if not text or _is_repeat(text, recent, level):
+            continue
+        recent = (recent + [text])[-3:]
+
+        if block_start is not None and (start - block_start >= max_seconds or start - block_end > BLOCK_GAP_SECONDS):
+            flush()
+        if block_start is None:
+            block_start = start
+        block_text = _join(block_text, text)
+        block_end = end
+
+        tokens = estimate_tokens(block_text)
+        if tokens >= max_tokens or (tokens >= min_tokens and _SENTENCE_END.search(block_text)):
+            flush()
+    flush()
+
+    tokens_after = sum(estimate_tokens(text) + 4 for _, _, text in compacted.rows())
+    stats = CompactionStats(level, len(segments), len(compacted), tokens_before, tokens_after)
+    logger.info(
+        f"转写压缩 (level={level})：{stats.segments_before} → {stats.segments_after} 段，"
+        f"约 {stats.tokens_before} → {stats.tokens_after} tokens"
+    )
+    return compacted, stats
@@ -1,47 +1,111 @@
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager, nullcontext
+from concurrent.futures import ThreadPoolExecutor
+
+from openai import DEFAULT_MAX_RETRIES
+
+from app.gpt import model_registry
 from app.gpt.base import GPT
-from app.gpt.prompt_builder import generate_base_prompt
-from app.models.gpt_model import GPTSource
-from app.gpt.prompt import BASE_PROMPT, AI_SUM, SCREENSHOT, LINK
-from app.gpt.utils import fix_markdown
-from app.models.transcriber_model import TranscriptSegment
+from app.gpt.model_registry import ModelCapabilities
+from app.gpt.provider.client_registry import run_async
+from app.gpt.provider.rate_limiter import ProviderLimiter, acall_with_retry, call_with_retry
+from app.gpt.transcript_compactor import compact_segments
+from app.gpt.response_cache import get_response_cache, make_cache_key
+from app.gpt.prompt_builder import (
+    generate_system_prompt, generate_user_prompt,
+    generate_chunk_system_prompt, generate_chunk_prompt,
+    generate_reduce_system_prompt, generate_reduce_prompt,
+)
+from app.models.gpt_model import GPTSource, LLMUsage
+from app.gpt.prompt import BASE_PROMPT, AI_SUM, SCREENSHOT, LINK, CONTINUE_PROMPT
+from app.gpt.utils import fix_markdown, estimate_tokens
+from app.models.transcriber_model import SegmentStore
+from app.utils.logger import get_logger
 from datetime import timedelta
-from typing import List
+from typing import Callable, List, Optional, Union
+
+logger = get_logger(__name__)
+
+# 转写文本超过该 token 数时自动切换为分段总结（map-reduce）
+MAP_REDUCE_TOKEN_THRESHOLD = int(os.getenv("MAP_REDUCE_TOKEN_THRESHOLD", "24000"))
+# 每个分段的转写文本 token 预算
+MAP_REDUCE_CHUNK_TOKENS = int(os.getenv("MAP_REDUCE_CHUNK_TOKENS", "8000"))
+# 分段总结的最大并发请求数
+MAP_REDUCE_CONCURRENCY = int(os.getenv("MAP_REDUCE_CONCURRENCY", "4"))
+# 流式输出中断后，基于已输出内容续写的最大次数
+STREAM_RESUME_ATTEMPTS = int(os.getenv("LLM_STREAM_RESUME_ATTEMPTS", "2"))
+# token 数为粗略估算，只使用上下文窗口的这一比例作为预算
+CONTEXT_SAFETY_RATIO = 0.9
+# 模型输出上限未知时，为输出预留的 token 数
+DEFAULT_OUTPUT_RESERVE = 4096
+
+SUMMARY_MODE_AUTO = "auto"
+SUMMARY_MODE_SINGLE = "single"
+SUMMARY_MODE_MAP_REDUCE = "map_reduce"
 
 
 class UniversalGPT(GPT):
-    def __init__(self, client, model: str, temperature: float = 0.7):
+    def __init__(self, client, model: str, temperature: float = 0.7, provider: Optional[str] = None,
+                 async_client: Union[Callable, object, None] = None,
+                 limiter: Optional[ProviderLimiter] = None,
+                 provider_id: Optional[str] = None):
+        """
+        :param client: 同步 OpenAI 客户端
+        :param async_client: AsyncOpenAI 客户端，或返回当前事件循环可用客户端的无参函数
+        :param limiter: 供应商限流器（请求数 / token 数 / 并发），同一供应商的任务共享
+        :param provider_id: 供应商 ID，用于查询模型能力（上下文长度、输出上限等）
+        """
         self.client = client
         self.model = model
         self.temperature = temperature
+        self.provider = provider  # 供应商标识，参与响应缓存 key 的计算
+        self._async_client = async_client
+        self.limiter = limiter
+        self.provider_id = provider_id
+        self.usage = LLMUsage()  # 本实例（一个任务）的累计用量，含前缀缓存命中的 token 数
         self.screenshot = False
         self.link = False
 
+    @property
+    def capabilities(self) -> ModelCapabilities:
+        return model_registry.get_capabilities(self.model, self.provider_id)
+
+    @property
+    def aclient(self):
+        if self._async_client is None:
+            raise RuntimeError("未配置异步客户端")
+        return self._async_client() if callable(self._async_client) else self._async_client
+
     def _format_time(self, seconds: float) -> str:
         return str(timedelta(seconds=int(seconds)))[2:]
 
-    def _build_segment_text(self, segments: List[TranscriptSegment]) -> str:
+    def _build_segment_text(self, segments: SegmentStore) -> str:
         return "\n".join(
-            f"{self._format_time(seg.start)} - {seg.text.strip()}"
-            for seg in segments
+            f"{self._format_time(start)} - {text.strip()}"
+            for start, _, text in segments.rows()
         )
 
-    def ensure_segments_type(self, segments) -> List[TranscriptSegment]:
-        return [TranscriptSegment(**seg) if isinstance(seg, dict) else seg for seg in segments]
-
-    def create_messages(self, segments: List[TranscriptSegment], **kwargs):
+    def ensure_segments_type(self, segments) -> SegmentStore:
+        return SegmentStore.from_segments(segments)
 
-        content_text = generate_base_prompt(
+    def create_messages(self, segments: SegmentStore, **kwargs):
+        # 固定的风格 / 格式说明放在 system 消息中作为稳定前缀，视频相关内容放在其后，便于命中前缀缓存
+        system_text = generate_system_prompt(
+            _format=kwargs.get('_format'),
+            style=kwargs.get('style'),
+        )
+        content_text = generate_user_prompt(
             title=kwargs.get('title'),
             segment_text=self._build_segment_text(segments),
             tags=kwargs.get('tags'),
-            _format=kwargs.get('_format'),
-            style=kwargs.get('style'),
             extras=kwargs.get('extras'),
         )
 
         # ⛳ 组装 content 数组，支持 text + image_url 混合
         content = [{"type": "text", "text": content_text}]
-        video_img_urls = kwargs.get('video_img_urls', [])
+        video_img_urls = kwargs.get('video_img_urls') or []
 
         for url in video_img_urls:
             content.append({
@@ -52,34 +116,452 @@ class UniversalGPT(GPT):
                 }
             })
 
-        #  正确格式：整体包在一个 message 里，role + content array
-        messages = [{
-            "role": "user",
-            "content": content
-        }]
+        messages = [
+            {"role": "system", "content": system_text},
+            {"role": "user", "content": content},
+        ]
 
         return messages
 
     def list_models(self):
-        return self.client.models.list()
+        # 共享客户端关闭了 SDK 重试（由 rate_limiter 负责对话请求），非对话请求恢复 SDK 默认重试
+        return self.client.with_options(max_retries=DEFAULT_MAX_RETRIES).models.list()
 
-    def summarize(self, source: GPTSource) -> str:
+    @property
+    def supports_async(self) -> bool:
+        return self._async_client is not None
+
+    @staticmethod
+    def _estimate_messages_tokens(messages: list) -> int:
+        tokens = 0
+        for message in messages:
+            content = message.get("content")
+            if isinstance(content, str):
+                tokens += estimate_tokens(content)
+            else:
+                for item in content or []:
+                    if item.get("type") == "image_url":
+                        tokens += model_registry.IMAGE_TOKENS
+                    else:
+                        tokens += estimate_tokens(item.get("text", ""))
+        return tokens
+
+    def _completion_kwargs(self, messages: list, **kwargs) -> dict:
+        """
+        组装请求参数；已知模型输出上限时设置 max_tokens，并保证输入 + 输出不超过上下文窗口。
+        推理模型不接受 max_tokens 与 temperature，改用 max_completion_tokens 且不传 temperature
+        """
+        caps = self.capabilities
+        params = dict(model=self.model, messages=messages, **kwargs)
+        if not caps.reasoning:
+            params["temperature"] = self.temperature
+        if caps.max_output_tokens:
+            room = caps.context_tokens - self._estimate_messages_tokens(messages)
+            token_param = "max_completion_tokens" if caps.reasoning else "max_tokens"
+            params[token_param] = max(256, min(caps.max_output_tokens, room))
+        if kwargs.get("stream") and caps.prompt_caching:
+            # 流式响应默认不带 usage；支持前缀缓存的供应商均支持在最后一个分片中返回
+            params["stream_options"] = {"include_usage": True}
+        return params
+
+    def _record_usage(self, usage, first_token_seconds: Optional[float] = None,
+                      messages: Optional[list] = None, output: str = "") -> None:
+        """
+        记录一次请求的用量。命中前缀缓存的 token 数：OpenAI / Qwen 为 prompt_tokens_details.cached_tokens，
+        DeepSeek 为 prompt_cache_hit_tokens。
+        响应不带 usage 时（多数供应商的流式响应）仍计入请求数，token 数按请求与输出文本估算
+
+        :param messages: 本次请求的消息，用于估算输入 token 数
+        :param output: 本次请求输出的文本，用于估算输出 token 数
+        """
+        if usage is None:
+            prompt_tokens = self._estimate_messages_tokens(messages or [])
+            completion_tokens = estimate_tokens(output)
+            self.usage.add(prompt_tokens, 0, completion_tokens, first_token_seconds, estimated=True)
+            logger.info(f"LLM 用量（响应未返回，估算）：输入约 {prompt_tokens}，输出约 {completion_tokens}")
+            return
+        details = getattr(usage, "prompt_tokens_details", None)
+        cached = getattr(details, "cached_tokens", None) or getattr(usage, "prompt_cache_hit_tokens", None) or 0
+        prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+        completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+        self.usage.add(prompt_tokens, cached, completion_tokens, first_token_seconds)
+        ttft = f"，首字 {first_token_seconds:.2f}s" if first_token_seconds is not None else ""
+        logger.info(f"LLM 用量：输入 {prompt_tokens}（前缀缓存命中 {cached}），输出 {completion_tokens}{ttft}")
+
+    def _limit(self, messages: list):
+        return self.limiter.limit(self._estimate_messages_tokens(messages)) if self.limiter else nullcontext()
+
+    @asynccontextmanager
+    async def _alimit(self, messages: list):
+        if self.limiter:
+            async with self.limiter.alimit(self._estimate_messages_tokens(messages)):
+                yield
+        else:
+            yield
+
+    def _chat(self, messages: list) -> str:
+        def call():
+            with self._limit(messages):
+                return self.client.chat.completions.create(**self._completion_kwargs(messages))
+
+        response = call_with_retry(call)
+        content = response.choices[0].message.content
+        self._record_usage(getattr(response, "usage", None), messages=messages, output=content)
+        return content.strip()
+
+    def _chat_stream(
+        self,
+        messages: list,
+        on_delta: Optional[Callable[[str], None]] = None,
+        partial: str = "",
+    ) -> str:
+        """
+        流式生成，每收到一段增量就回调 on_delta。
+        连接中断时带上已输出的内容发送续写提示，从断点继续而不是从头生成。
+
+        :param messages: 原始消息
+        :param on_delta: 增量回调，用于写入文件 / 更新进度
+        :param partial: 之前已生成的内容（如任务重试时的未完成笔记）
+        """
+        text = partial or ""
+        resumes = 0
+        while True:
+            request = messages
+            if text:
+                request = messages + [
+                    {"role": "assistant", "content": text},
+                    {"role": "user", "content": CONTINUE_PROMPT},
+                ]
+            try:
+                # 并发名额覆盖整个流式输出过程；建立连接阶段的 429 / 5xx 自动重试
+                with self._limit(request):
+                    started, first_token, usage = time.monotonic(), None, None
+                    resumed_from = len(text)
+                    stream = call_with_retry(lambda: self.client.chat.completions.create(
+                        **self._completion_kwargs(request, stream=True)
+                    ))
+                    for chunk in stream:
+                        usage = getattr(chunk, "usage", None) or usage
+                        if not chunk.choices:
+                            continue
+                        delta = chunk.choices[0].delta.content
+                        if delta:
+                            if first_token is None:
+                                first_token = time.monotonic() - started
+                            text += delta
+                            if on_delta:
+                                on_delta(delta)
+                self._record_usage(usage, first_token, messages=request, output=text[resumed_from:])
+                return text.strip()
+            except Exception as exc:
+                if not text or resumes >= STREAM_RESUME_ATTEMPTS:
+                    raise
+                resumes += 1
+                logger.warning(f"流式输出中断（已生成 {len(text)} 字），第 {resumes} 次续写：{exc}")
+
+    def _cached_chat(self, messages: list, source: GPTSource, final: bool = False) -> str:
+        """
+        带响应缓存的调用：相同的消息 / 模型 / 供应商 / 温度直接复用上次结果。
+        source.bypass_cache 为 True 时跳过读取，但仍用新结果刷新缓存。
+
+        :param final: 是否为生成最终笔记的调用（支持流式输出与续写）
+        """
+        cache = get_response_cache()
+        key = make_cache_key(messages, self.model, self.provider, self.temperature) if cache else None
+        if cache and not source.bypass_cache:
+            content = cache.get(key)
+            if content is not None:
+                self.usage.add_cache_hit()
+                if final and source.stream_callback and not source.partial_markdown:
+                    source.stream_callback(content)
+                return content
+
+        if final and (source.stream_callback or source.partial_markdown):
+            content = self._chat_stream(messages, source.stream_callback, source.partial_markdown or "")
+        else:
+            content = self._chat(messages)
+
+        if cache and content:
+            try:
+                cache.set(key, content, model=self.model)
+            except Exception as e:
+                logger.warning(f"写入 LLM 缓存失败：{e}")
+        return content
+
+    @staticmethod
+    def _keep_markers(source: GPTSource) -> bool:
+        return bool({'link', 'screenshot'} & set(source._format or []))
+
+    def _prepare_source(self, source: GPTSource) -> None:
         self.screenshot = source.screenshot
         self.link = source.link
         source.segment = self.ensure_segments_type(source.segment)
+        # 压缩转写文本（合并短分段、去重复与语气词），块开始时间均来自原始分段
+        source.segment, _ = compact_segments(source.segment, source.compaction_level,
+                                             keep_markers=self._keep_markers(source))
+        if source.video_img_urls and not self.capabilities.vision:
+            logger.warning(f"模型 {self.model} 不支持图片输入，忽略 {len(source.video_img_urls)} 张视频截图")
+            source.video_img_urls = []
 
-        messages = self.create_messages(
+    def _single_messages(self, source: GPTSource) -> list:
+        return self.create_messages(
             source.segment,
             title=source.title,
             tags=source.tags,
-            video_img_urls=source.video_img_urls,
+            video_img_urls=source.video_img_urls or [],
             _format=source._format,
             style=source.style,
             extras=source.extras
         )
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=messages,
-            temperature=0.7
+
+    def _input_budget(self) -> int:
+        """单次请求可用的输入 token 数：上下文窗口扣除输出预留与估算误差"""
+        caps = self.capabilities
+        reserve = min(caps.max_output_tokens or DEFAULT_OUTPUT_RESERVE, caps.context_tokens // 4)
+        return int(caps.context_tokens * CONTEXT_SAFETY_RATIO) - reserve
+
+    def resolve_summary_mode(self, source: GPTSource) -> str:
+        """
+        按模型上下文窗口选择总结方式，依次尝试：
+        1. 完整转写一次性总结（full）；
+        2. 提高压缩力度后一次性总结（compacted），压缩结果写回 source.segment；
+        3. 分段总结（map-reduce）。
+        auto 模式下转写超过 MAP_REDUCE_TOKEN_THRESHOLD 时同样不使用一次性总结；
+        显式指定 single 但放不进上下文窗口时改用分段总结，避免上传后才被拒绝。
+        """
+        mode = source.summary_mode or SUMMARY_MODE_AUTO
+        if mode == SUMMARY_MODE_MAP_REDUCE:
+            return mode
+        if len(source.segment) <= 1:
+            return SUMMARY_MODE_SINGLE
+
+        budget = self._input_budget()
+        image_tokens = len(source.video_img_urls or []) * model_registry.IMAGE_TOKENS
+
+        def fits(tokens: int) -> bool:
+            if tokens > budget:
+                return False
+            return mode == SUMMARY_MODE_SINGLE or tokens - image_tokens <= MAP_REDUCE_TOKEN_THRESHOLD
+
+        tokens = self._estimate_messages_tokens(self._single_messages(source))
+        if fits(tokens):
+            logger.info(f"一次性总结（full）：约 {tokens} tokens，输入预算 {budget}")
+            return SUMMARY_MODE_SINGLE
+
+        original = source.segment
+        for level in range(max(source.compaction_level or 0, 1) + 1, 4):
+            source.segment, _ = compact_segments(original, level, keep_markers=self._keep_markers(source))
+            tokens = self._estimate_messages_tokens(self._single_messages(source))
+            if fits(tokens):
+                logger.info(f"一次性总结（compacted, level={level}）：约 {tokens} tokens，输入预算 {budget}")
+                return SUMMARY_MODE_SINGLE
+        source.segment = original
+
+        if mode == SUMMARY_MODE_SINGLE:
+            logger.warning(f"约 {tokens} tokens 超出模型 {self.model} 的输入预算 {budget}，改用分段总结")
+        else:
+            logger.info(f"转写约 {tokens - image_tokens} tokens，超过阈值或输入预算，使用分段总结")
+        return SUMMARY_MODE_MAP_REDUCE
+
+    def _chunk_token_budget(self, source: GPTSource) -> int:
+        """分段总结时每段转写的 token 预算，不超过模型输入预算扣除提示词本身后的余量"""
+        sample, _ = self._chunk_messages(source, source.segment[:1], 1, 1)
+        overhead = self._estimate_messages_tokens(sample)
+        return max(512, min(MAP_REDUCE_CHUNK_TOKENS, self._input_budget() - overhead))
+
+    def split_segments(self, segments: SegmentStore, max_tokens: int = MAP_REDUCE_CHUNK_TOKENS) -> List[SegmentStore]:
+        """
+        按 token 预算把分段切成若干连续的时间区间，切分点总在分段边界上
+        """
+        chunks = []
+        lo, budget = 0, 0
+        for i, (_, _, text) in enumerate(segments.rows()):
+            cost = estimate_tokens(text) + 4  # 时间前缀与换行
+            if budget and budget + cost > max_tokens:
+                chunks.append(segments[lo:i])
+                lo, budget = i, 0
+            budget += cost
+        if lo < len(segments):
+            chunks.append(segments[lo:])
+        return chunks
+
+    def _chunk_messages(self, source: GPTSource, chunk: SegmentStore, index: int, total: int):
+        time_range = f"{self._format_time(chunk.starts[0])} - {self._format_time(chunk.ends[-1])}"
+        prompt = generate_chunk_prompt(
+            title=source.title,
+            segment_text=self._build_segment_text(chunk),
+            tags=source.tags,
+            index=index,
+            total=total,
+            time_range=time_range,
+        )
+        messages = [
+            {"role": "system", "content": generate_chunk_system_prompt(_format=source._format)},
+            {"role": "user", "content": prompt},
+        ]
+        return messages, time_range
+
+    def _summarize_chunk(self, source: GPTSource, chunk: SegmentStore, index: int, total: int) -> str:
+        messages, time_range = self._chunk_messages(source, chunk, index, total)
+        notes = self._cached_chat(messages, source)
+        logger.info(f"分段 {index}/{total} ({time_range}) 总结完成")
+        return f"==== 第 {index} 部分（{time_range}）====\n{notes}"
+
+    def _reduce_messages(self, source: GPTSource, notes: List[str]) -> list:
+        content_text = generate_reduce_prompt(
+            title=source.title,
+            chunk_notes="\n\n".join(notes),
+            tags=source.tags,
+            extras=source.extras,
+        )
+        content = [{"type": "text", "text": content_text}]
+        for url in source.video_img_urls or []:
+            content.append({"type": "image_url", "image_url": {"url": url, "detail": "auto"}})
+        return [
+            {"role": "system", "content": generate_reduce_system_prompt(_format=source._format, style=source.style)},
+            {"role": "user", "content": content},
+        ]
+
+    def summarize_map_reduce(self, source: GPTSource) -> str:
+        """
+        分段总结：按时间区间切分转写，并发生成各段中间笔记，再合并为最终笔记。
+        视频截图只在合并阶段发送一次。配置了异步客户端时分段请求在共享事件循环上并发，
+        否则使用线程池。
+        """
+        chunks = self.split_segments(source.segment, self._chunk_token_budget(source))
+        total = len(chunks)
+        logger.info(f"分段总结：共 {total} 段，并发 {MAP_REDUCE_CONCURRENCY}")
+        if self.supports_async:
+            notes = run_async(self._amap_chunks(source, chunks))
+        else:
+            with ThreadPoolExecutor(max_workers=max(1, min(MAP_REDUCE_CONCURRENCY, total))) as pool:
+                notes = list(pool.map(
+                    lambda args: self._summarize_chunk(source, args[1], args[0] + 1, total),
+                    enumerate(chunks),
+                ))
+        return self._cached_chat(self._reduce_messages(source, notes), source, final=True)
+
+    def summarize(self, source: GPTSource) -> str:
+        self._prepare_source(source)
+
+        if self.resolve_summary_mode(source) == SUMMARY_MODE_MAP_REDUCE:
+            return self.summarize_map_reduce(source)
+
+        return self._cached_chat(self._single_messages(source), source, final=True)
+
+    # ---------------- 异步接口 ----------------
+
+    async def acreate_messages(self, segments: SegmentStore, **kwargs):
+        return self.create_messages(segments, **kwargs)
+
+    async def _achat(self, messages: list) -> str:
+        async def call():
+            async with self._alimit(messages):
+                return await self.aclient.chat.completions.create(**self._completion_kwargs(messages))
+
+        response = await acall_with_retry(call)
+        content = response.choices[0].message.content
+        self._record_usage(getattr(response, "usage", None), messages=messages, output=content)
+        return content.strip()
+
+    async def _achat_stream(
+        self,
+        messages: list,
+        on_delta: Optional[Callable[[str], None]] = None,
+        partial: str = "",
+    ) -> str:
+        """_chat_stream 的异步版本，中断后同样基于已输出内容续写"""
+        text = partial or ""
+        resumes = 0
+        while True:
+            request = messages
+            if text:
+                request = messages + [
+                    {"role": "assistant", "content": text},
+                    {"role": "user", "content": CONTINUE_PROMPT},
+                ]
+            try:
+                async with self._alimit(request):
+                    started, first_token, usage = time.monotonic(), None, None
+                    resumed_from = len(text)
+                    stream = await acall_with_retry(lambda: self.aclient.chat.completions.create(
+                        **self._completion_kwargs(request, stream=True)
+                    ))
+                    async for chunk in stream:
+                        usage = getattr(chunk, "usage", None) or usage
+                        if not chunk.choices:
+                            continue
+                        delta = chunk.choices[0].delta.content
+                        if delta:
+                            if first_token is None:
+                                first_token = time.monotonic() - started
+                            text += delta
+                            if on_delta:
+                                on_delta(delta)
+                self._record_usage(usage, first_token, messages=request, output=text[resumed_from:])
+                return text.strip()
+            except Exception as exc:
+                if not text or resumes >= STREAM_RESUME_ATTEMPTS:
+                    raise
+                resumes += 1
+                logger.warning(f"流式输出中断（已生成 {len(text)} 字），第 {resumes} 次续写：{exc}")
+
+    async def _acached_chat(self, messages: list, source: GPTSource, final: bool = False) -> str:
+        """_cached_chat 的异步版本"""
+        cache = get_response_cache()
+        key = make_cache_key(messages, self.model, self.provider, self.temperature) if cache else None
+        if cache and not source.bypass_cache:
+            content = cache.get(key)
+            if content is not None:
+                self.usage.add_cache_hit()
+                if final and source.stream_callback and not source.partial_markdown:
+                    source.stream_callback(content)
+                return content
+
+        if final and (source.stream_callback or source.partial_markdown):
+            content = await self._achat_stream(messages, source.stream_callback, source.partial_markdown or "")
+        else:
+            content = await self._achat(messages)
+
+        if cache and content:
+            try:
+                cache.set(key, content, model=self.model)
+            except Exception as e:
+                logger.warning(f"写入 LLM 缓存失败：{e}")
+        return content
+
+    async def _amap_chunks(self, source: GPTSource, chunks: List[SegmentStore]) -> List[str]:
+        semaphore = asyncio.Semaphore(max(1, MAP_REDUCE_CONCURRENCY))
+        total = len(chunks)
+
+        async def run(index: int, chunk: SegmentStore) -> str:
+            messages, time_range = self._chunk_messages(source, chunk, index, total)
+            async with semaphore:
+                notes = await self._acached_chat(messages, source)
+            logger.info(f"分段 {index}/{total} ({time_range}) 总结完成")
+            return f"==== 第 {index} 部分（{time_range}）====\n{notes}"
+
+        return list(await asyncio.gather(*(run(i + 1, chunk) for i, chunk in enumerate(chunks))))
+
+    async def asummarize(self, source: GPTSource) -> str:
+        """
+        summarize 的异步版本：所有请求跑在当前事件循环上，不占用额外线程
+        """
+        self._prepare_source(source)
+
+        if self.resolve_summary_mode(source) == SUMMARY_MODE_MAP_REDUCE:
+            chunks = self.split_segments(source.segment, self._chunk_token_budget(source))
+            logger.info(f"分段总结：共 {len(chunks)} 段，并发 {MAP_REDUCE_CONCURRENCY}")
+            notes = await self._amap_chunks(source, chunks)
+            return await self._acached_chat(self._reduce_messages(source, notes), source, final=True)
+
+        messages = await self.acreate_messages(
+            source.segment,
+            title=source.title,
+            tags=source.tags,
+            video_img_urls=source.video_img_urls or [],
+            _format=source._format,
+            style=source.style,
+            extras=source.extras
         )
-        return response.choices[0].message.content.strip()
+        return await self._acached_chat(messages, source, final=True)
@@ -1,4 +1,14 @@
 import codecs
 
 def fix_markdown(markdown: str) -> str:
-    return codecs.decode(markdown, 'unicode_escape')
\ No newline at end of file
+    return codecs.decode(markdown, 'unicode_escape')
+
+def estimate_tokens(text: str) -> int:
+    """
+    粗略估算 token 数：中日韩字符约 1 token/字，其余约 4 字符/token。
+    只用于预算判断，不追求与具体分词器一致。
+    """
+    if not text:
+        return 0
+    cjk = sum(1 for ch in text if '\u3000' <= ch <= '\u9fff' or '\uac00' <= ch <= '\ud7af' or '\uff00' <= ch <= '\uffef')
+    return cjk + (len(text) - cjk + 3) // 4
@@ -12,4 +12,6 @@ class AudioDownloadResult:
     video_id: str                # 唯一视频ID
     raw_info: dict               # yt-dlp 的原始 info 字典
     video_path: Optional[str] = None  #  新增字段：可选视频文件路径
+    audio_codec: Optional[str] = None  # 音频编码（aac / opus / mp3 等），下载时保留原始编码不转码
+    download_stats: Optional[dict] = None  # 下载字节数与相比最高音质节省的字节数，写入任务指标
 
@@ -1,12 +1,13 @@
-from dataclasses import dataclass
-from typing import List, Union, Optional
+import threading
+from dataclasses import dataclass, field
+from typing import Callable, List, Union, Optional
 
-from app.models.transcriber_model import TranscriptSegment
+from app.models.transcriber_model import SegmentStore, TranscriptSegment
 
 
 @dataclass
 class GPTSource:
-    segment: Union[List[TranscriptSegment], List]
+    segment: Union[SegmentStore, List[TranscriptSegment], List]
     title: str
     tags:str
     screenshot: Optional[bool] = False
@@ -15,4 +16,50 @@ class GPTSource:
     extras: Optional[str] = None
     _format: Optional[list] = None
     video_img_urls:  Optional[list] = None
+    summary_mode: Optional[str] = None  # auto / single / map_reduce
+    stream_callback: Optional[Callable[[str], None]] = None  # 流式输出的增量回调
+    partial_markdown: Optional[str] = None  # 上次中断时已生成的内容，从此处续写
+    bypass_cache: bool = False  # 跳过 LLM 响应缓存，强制重新生成
+    compaction_level: Optional[int] = None  # 转写压缩力度 0-3，None 时读取 TRANSCRIPT_COMPACTION_LEVEL
 
+
+
+@dataclass
+class LLMUsage:
+    """一个任务内所有 LLM 请求的累计用量，cached_tokens 为命中供应商前缀缓存的输入 token 数"""
+    requests: int = 0
+    prompt_tokens: int = 0
+    cached_tokens: int = 0
+    completion_tokens: int = 0
+    response_cache_hits: int = 0  # 命中本地 LLM 响应缓存、未发出请求的次数
+    estimated_requests: int = 0  # 响应未返回 usage、token 数为估算值的请求数
+    first_token_seconds: List[float] = field(default_factory=list)  # 流式请求的首字延迟
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def add(self, prompt_tokens: int = 0, cached_tokens: int = 0, completion_tokens: int = 0,
+            first_token_seconds: Optional[float] = None, estimated: bool = False) -> None:
+        with self._lock:
+            self.requests += 1
+            if estimated:
+                self.estimated_requests += 1
+            self.prompt_tokens += prompt_tokens
+            self.cached_tokens += cached_tokens
+            self.completion_tokens += completion_tokens
+            if first_token_seconds is not None:
+                self.first_token_seconds.append(round(first_token_seconds, 3))
+
+    def add_cache_hit(self) -> None:
+        with self._lock:
+            self.response_cache_hits += 1
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "prompt_tokens": self.prompt_tokens,
+                "cached_tokens": self.cached_tokens,
+                "completion_tokens": self.completion_tokens,
+                "response_cache_hits": self.response_cache_hits,
+                "estimated_requests": self.estimated_requests,
+                "first_token_seconds": list(self.first_token_seconds),
+            }
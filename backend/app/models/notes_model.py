@@ -1,5 +1,5 @@
-from dataclasses import dataclass
-from typing import Optional
+from dataclasses import dataclass, asdict
+from typing import List, Optional
 
 from app.models.audio_model import AudioDownloadResult
 from app.models.transcriber_model import TranscriptResult
@@ -9,4 +9,13 @@ from app.models.transcriber_model import TranscriptResult
 class NoteResult:
     markdown: str                  # GPT 总结的 Markdown 内容
     transcript: TranscriptResult                # Whisper 转写结果
-    audio_meta: AudioDownloadResult  # 音频下载的元信息（title、duration、封面等）
\ No newline at end of file
+    audio_meta: AudioDownloadResult  # 音频下载的元信息（title、duration、封面等）
+    markdown_versions: Optional[List[dict]] = None  # 同一任务生成的所有版本（多风格 / 多模型）
+
+    def to_dict(self) -> dict:
+        return {
+            "markdown": self.markdown,
+            "markdown_versions": self.markdown_versions or [],
+            "transcript": self.transcript.to_dict(),
+            "audio_meta": asdict(self.audio_meta),
+        }
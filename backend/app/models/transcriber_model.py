@@ -1,16 +1,199 @@
 
-from dataclasses import dataclass
-from typing import List, Optional
+from array import array
+from bisect import bisect_left, bisect_right
+from dataclasses import asdict, dataclass, is_dataclass
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
 
-@dataclass
+
+@dataclass(slots=True)
 class TranscriptSegment:
     start: float               # 开始时间（秒）
     end: float                 # 结束时间（秒）
     text: str                  # 该段文字
 
+
+class SegmentStore:
+    """
+    紧凑的分段存储：start / end 为连续的 float 数组，所有文字拼接为一个字符串并记录偏移。
+    按下标访问时才构造 TranscriptSegment 视图，适合上万段的长录音。
+    """
+    __slots__ = ("starts", "ends", "offsets", "_buffer", "_pending")
+
+    def __init__(self):
+        self.starts = array("d")
+        self.ends = array("d")
+        self.offsets = array("Q", [0])  # 第 i 段文字为 buffer[offsets[i]:offsets[i + 1]]
+        self._buffer = ""
+        self._pending: List[str] = []
+
+    # ---------------- 构建 ----------------
+
+    def append(self, start: float, end: float, text: str) -> None:
+        self.starts.append(float(start))
+        self.ends.append(float(end))
+        self._pending.append(text)
+        self.offsets.append(self.offsets[-1] + len(text))
+
+    @classmethod
+    def from_segments(cls, segments: Iterable[Union[TranscriptSegment, dict]]) -> "SegmentStore":
+        if isinstance(segments, SegmentStore):
+            return segments
+        store = cls()
+        for seg in segments:
+            if isinstance(seg, dict):
+                store.append(seg.get("start") or 0, seg.get("end") or 0, str(seg.get("text", "")))
+            else:
+                store.append(seg.start, seg.end, seg.text)
+        return store
+
+    @property
+    def buffer(self) -> str:
+        if self._pending:
+            self._buffer += "".join(self._pending)
+            self._pending = []
+        return self._buffer
+
+    # ---------------- 访问 ----------------
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __bool__(self) -> bool:
+        return len(self.starts) > 0
+
+    def __repr__(self) -> str:
+        span = f"{self.starts[0]:.1f}-{self.ends[-1]:.1f}s" if self else "empty"
+        return f"SegmentStore(n={len(self)}, {span})"
+
+    def text_at(self, index: int) -> str:
+        return self.buffer[self.offsets[index]:self.offsets[index + 1]]
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[TranscriptSegment, "SegmentStore"]:
+        if isinstance(index, slice):
+            lo, hi, step = index.indices(len(self))
+            if step != 1:
+                raise ValueError("SegmentStore 仅支持连续切片")
+            return self._slice(lo, hi)
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("segment index out of range")
+        return TranscriptSegment(start=self.starts[index], end=self.ends[index], text=self.text_at(index))
+
+    def __iter__(self) -> Iterator[TranscriptSegment]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def rows(self) -> Iterator[Tuple[float, float, str]]:
+        """按 (start, end, text) 元组遍历，不构造 TranscriptSegment"""
+        buffer = self.buffer
+        offsets = self.offsets
+        for i in range(len(self)):
+            yield self.starts[i], self.ends[i], buffer[offsets[i]:offsets[i + 1]]
+
+    def joined_text(self, sep: str = " ") -> str:
+        return sep.join(text.strip() for _, _, text in self.rows()).strip()
+
+    # ---------------- 时间检索 ----------------
+
+    def index_at(self, seconds: float) -> int:
+        """返回开始时间不晚于 seconds 的最后一段的下标（早于首段时返回 0）"""
+        return max(bisect_right(self.starts, seconds) - 1, 0)
+
+    def slice_by_time(self, start: float, end: float) -> "SegmentStore":
+        """截取与 [start, end) 有重叠的分段，要求分段按开始时间有序"""
+        if not self:
+            return SegmentStore()
+        lo = self.index_at(start)
+        if self.ends[lo] <= start:
+            lo += 1
+        hi = bisect_left(self.starts, end)
+        return self._slice(lo, max(lo, hi))
+
+    def _slice(self, lo: int, hi: int) -> "SegmentStore":
+        store = SegmentStore()
+        store.starts = self.starts[lo:hi]
+        store.ends = self.ends[lo:hi]
+        base, top = self.offsets[lo], self.offsets[hi]
+        store._buffer = self.buffer[base:top]
+        store.offsets = array("Q", (off - base for off in self.offsets[lo:hi + 1]))
+        return store
+
+    # ---------------- 序列化 ----------------
+
+    def to_dict(self) -> dict:
+        """紧凑格式，用于缓存文件"""
+        return {
+            "start": self.starts.tolist(),
+            "end": self.ends.tolist(),
+            "text": self.buffer,
+            "offsets": self.offsets.tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "SegmentStore":
+        store = cls()
+        store.starts = array("d", data["start"])
+        store.ends = array("d", data["end"])
+        store._buffer = data["text"]
+        store.offsets = array("Q", data["offsets"])
+        return store
+
+    def to_list(self) -> List[dict]:
+        """[{start, end, text}] 格式，用于接口返回与数据库存储"""
+        return [{"start": s, "end": e, "text": t} for s, e, t in self.rows()]
+
+
+def _raw_to_json(raw):
+    """原始响应转为可 JSON 序列化的结构（如 faster-whisper 的 TranscriptionInfo 数据类）"""
+    if is_dataclass(raw) and not isinstance(raw, type):
+        return asdict(raw)
+    if isinstance(raw, tuple) and hasattr(raw, "_asdict"):
+        return raw._asdict()
+    return raw
+
+
 @dataclass
 class TranscriptResult:
     language: Optional[str]         # 检测语言（如 "zh"、"en"）
     full_text: str                  # 完整合并后的文本（用于摘要）
-    segments: List[TranscriptSegment]  # 分段结构，适合前端显示时间轴字幕等
-    raw: Optional[dict] = None      # 原始响应数据，便于调试或平台特性处理
\ No newline at end of file
+    segments: SegmentStore          # 分段结构，适合前端显示时间轴字幕等
+    raw: Optional[dict] = None      # 原始响应数据，便于调试或平台特性处理
+    words: Optional[SegmentStore] = None  # 词级时间戳索引（转写器支持时才有）
+
+    def __post_init__(self):
+        if not isinstance(self.segments, SegmentStore):
+            self.segments = SegmentStore.from_segments(self.segments or [])
+        if self.words is not None and not isinstance(self.words, SegmentStore):
+            self.words = SegmentStore.from_segments(self.words)
+
+    def to_dict(self, compact: bool = False) -> dict:
+        """
+        :param compact: True 时分段使用 SegmentStore 紧凑格式并附带词级索引（缓存文件），
+                        否则为分段字典列表
+        """
+        data = {
+            "language": self.language,
+            "full_text": self.full_text,
+            "segments": self.segments.to_dict() if compact else self.segments.to_list(),
+            "raw": _raw_to_json(self.raw),
+        }
+        if compact and self.words:
+            data["words"] = self.words.to_dict()
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "TranscriptResult":
+        segments = data.get("segments") or []
+        if isinstance(segments, dict):
+            segments = SegmentStore.from_dict(segments)
+        words = data.get("words")
+        if isinstance(words, dict):
+            words = SegmentStore.from_dict(words)
+        return cls(
+            language=data.get("language"),
+            full_text=data.get("full_text", ""),
+            segments=segments,
+            raw=data.get("raw"),
+            words=words,
+        )
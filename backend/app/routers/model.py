@@ -31,8 +31,18 @@ def delete_model(model_id: int):
         return R.error(f"删除模型失败: {e}")
 @router.get("/model_list/{provider_id}")
 def model_list(provider_id):
+    try:
+        return R.success(modelService.get_all_models_by_id(provider_id))
+    except Exception as e:
+        return R.error(f"获取模型列表失败: {e}")
+
 
-    return R.success(modelService.get_all_models_by_id(provider_id))
+@router.post("/model_list/{provider_id}/refresh")
+def refresh_model_list(provider_id: str):
+    try:
+        return R.success(modelService.refresh_catalog(provider_id), msg="刷新模型列表成功")
+    except Exception as e:
+        return R.error(f"刷新模型列表失败: {e}")
 
 
 @router.post("/models")
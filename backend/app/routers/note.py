@@ -3,7 +3,7 @@ import json
 import os
 import uuid
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 from urllib.parse import urlparse
 
 from fastapi import APIRouter, HTTPException, BackgroundTasks, UploadFile, File
@@ -34,6 +34,11 @@ class RecordRequest(BaseModel):
     platform: str
 
 
+class NoteModelOption(BaseModel):
+    model_name: str
+    provider_id: str
+
+
 class VideoRequest(BaseModel):
     video_url: str
     platform: str
@@ -49,6 +54,13 @@ class VideoRequest(BaseModel):
     video_understanding: Optional[bool] = False
     video_interval: Optional[int] = 0
     grid_size: Optional[list] = []
+    summary_mode: Optional[str] = "auto"  # auto / single / map_reduce
+    bypass_cache: Optional[bool] = False  # 跳过笔记 / LLM 响应缓存，强制重新生成
+    image_mode: Optional[str] = None  # 视频理解图片发送方式 base64 / url，默认读取 VIDEO_IMAGE_MODE
+    max_image_bytes: Optional[int] = None  # 单次请求图片总字节上限，默认读取 VIDEO_IMAGE_MAX_BYTES
+    styles: Optional[List[str]] = None  # 同时生成多个风格，如 ["minimal", "detailed"]
+    models: Optional[List[NoteModelOption]] = None  # 同时使用多个模型，如 [{"model_name": "...", "provider_id": "..."}]
+    video_sampling: Optional[str] = None  # 视频理解取帧方式 fixed / adaptive，默认读取 VIDEO_SAMPLING
 
     @field_validator("video_url")
     def validate_supported_url(cls, v):
@@ -70,15 +82,19 @@ UPLOAD_DIR = "uploads"
 def save_note_to_file(task_id: str, note):
     os.makedirs(NOTE_OUTPUT_DIR, exist_ok=True)
     with open(os.path.join(NOTE_OUTPUT_DIR, f"{task_id}.json"), "w", encoding="utf-8") as f:
-        json.dump(asdict(note), f, ensure_ascii=False, indent=2)
+        json.dump(note.to_dict(), f, ensure_ascii=False, indent=2)
 
 
 def run_note_task(task_id: str, video_url: str, platform: str, quality: DownloadQuality,
                   link: bool = False, screenshot: bool = False, model_name: str = None, provider_id: str = None,
                   _format: list = None, style: str = None, extras: str = None, video_understanding: bool = False,
-                  video_interval=0, grid_size=[]
+                  video_interval=0, grid_size=[], summary_mode: str = "auto",
+                  bypass_cache: bool = False, image_mode: str = None, max_image_bytes: int = None,
+                  styles: list = None, models: list = None, video_sampling: str = None
                   ):
 
+    if models and not (model_name and provider_id):
+        model_name, provider_id = models[0].get("model_name"), models[0].get("provider_id")
     if not model_name or not provider_id:
         raise HTTPException(status_code=400, detail="请选择模型和提供者")
 
@@ -96,7 +112,14 @@ def run_note_task(task_id: str, video_url: str, platform: str, quality: Download
         screenshot=screenshot
         , video_understanding=video_understanding,
         video_interval=video_interval,
-        grid_size=grid_size
+        grid_size=grid_size,
+        summary_mode=summary_mode,
+        bypass_cache=bypass_cache,
+        image_mode=image_mode,
+        max_image_bytes=max_image_bytes,
+        styles=styles,
+        models=models,
+        video_sampling=video_sampling,
     )
     logger.info(f"Note generated: {task_id}")
     if not note or not note.markdown:
@@ -153,7 +176,11 @@ def generate_note(data: VideoRequest, background_tasks: BackgroundTasks):
 
         background_tasks.add_task(run_note_task, task_id, data.video_url, data.platform, data.quality, data.link,
                                   data.screenshot, data.model_name, data.provider_id, data.format, data.style,
-                                  data.extras, data.video_understanding, data.video_interval, data.grid_size)
+                                  data.extras, data.video_understanding, data.video_interval, data.grid_size,
+                                  data.summary_mode, data.bypass_cache, data.image_mode,
+                                  data.max_image_bytes, data.styles,
+                                  [m.model_dump() for m in data.models] if data.models else None,
+                                  data.video_sampling)
         return R.success({"task_id": task_id})
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -177,12 +204,17 @@ def get_task_status(task_id: str):
             if os.path.exists(result_path):
                 with open(result_path, "r", encoding="utf-8") as rf:
                     result_content = json.load(rf)
-                return R.success({
+                data = {
                     "status": status,
                     "result": result_content,
                     "message": message,
                     "task_id": task_id
-                })
+                }
+                metrics_path = os.path.join(NOTE_OUTPUT_DIR, f"{task_id}_metrics.json")
+                if os.path.exists(metrics_path):
+                    with open(metrics_path, "r", encoding="utf-8") as mf:
+                        data["metrics"] = json.load(mf)
+                return R.success(data)
             else:
                 # 理论上不会出现，保险处理
                 return R.success({
@@ -194,12 +226,17 @@ def get_task_status(task_id: str):
         if status == TaskStatus.FAILED.value:
             return R.error(message or "任务失败", code=500)
 
-        # 处理中状态
-        return R.success({
+        # 处理中状态，总结阶段附带已流式生成的部分笔记
+        data = {
             "status": status,
             "message": message,
             "task_id": task_id
-        })
+        }
+        partial_path = os.path.join(NOTE_OUTPUT_DIR, f"{task_id}_markdown.partial")
+        if status == TaskStatus.SUMMARIZING.value and os.path.exists(partial_path):
+            with open(partial_path, "r", encoding="utf-8") as pf:
+                data["partial_markdown"] = pf.read()
+        return R.success(data)
 
     # 没有状态文件，但有结果
     if os.path.exists(result_path):
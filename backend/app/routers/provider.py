@@ -17,6 +17,9 @@ class ProviderRequest(BaseModel):
     base_url: str
     logo: Optional[str] = None
     type: str
+    rpm_limit: Optional[int] = None
+    tpm_limit: Optional[int] = None
+    max_concurrency: Optional[int] = None
 
 class TestRequest(BaseModel):
     id: str
@@ -28,6 +31,9 @@ class ProviderUpdateRequest(BaseModel):
     logo: Optional[str] = None
     type: Optional[str] = None
     enabled:Optional[int] = None
+    rpm_limit: Optional[int] = None
+    tpm_limit: Optional[int] = None
+    max_concurrency: Optional[int] = None
 
 @router.post("/add_provider")
 def add_provider(data: ProviderRequest):
@@ -37,7 +43,10 @@ def add_provider(data: ProviderRequest):
             api_key=data.api_key,
             base_url=data.base_url,
             logo=data.logo,
-            type_=data.type
+            type_=data.type,
+            rpm_limit=data.rpm_limit,
+            tpm_limit=data.tpm_limit,
+            max_concurrency=data.max_concurrency,
         )
         return R.success(msg='添加模型供应商成功',data=res)
     except Exception as e:
@@ -71,15 +80,17 @@ def get_provider_by_id(id: str):
 @router.post("/update_provider")
 def update_provider(data: ProviderUpdateRequest):
     try:
+        # 只取请求中出现的字段：限流字段显式传 null 表示清除该限制
+        fields = data.model_dump(exclude_unset=True)
         if all(
-            field is None
-            for field in [data.name, data.api_key, data.base_url, data.logo, data.type,data.enabled]
+            fields.get(key) is None and key not in ProviderService.LIMIT_FIELDS
+            for key in fields if key != 'id'
         ):
             return R.error(msg='请至少填写一个参数')
 
         provider_id =ProviderService.update_provider(
             id=data.id,
-            data=dict(data)
+            data=fields
         )
         return R.success(msg='更新模型供应商成功',data={'id': provider_id})
     except Exception as e:
@@ -0,0 +1,84 @@
+from typing import List, Optional
+
+from fastapi import APIRouter
+from pydantic import BaseModel
+
+from app.services.provider_group import ProviderGroupService
+from app.utils.response import ResponseWrapper as R
+
+router = APIRouter()
+
+
+class GroupMember(BaseModel):
+    provider_id: str
+    model_name: str
+    priority: Optional[int] = None
+
+
+class ProviderGroupRequest(BaseModel):
+    name: str
+    members: List[GroupMember]
+    strategy: Optional[str] = "least_outstanding"
+
+
+class ProviderGroupUpdateRequest(BaseModel):
+    id: str
+    name: Optional[str] = None
+    members: Optional[List[GroupMember]] = None
+    strategy: Optional[str] = None
+    enabled: Optional[int] = None
+
+
+def _members(members: Optional[List[GroupMember]]):
+    if members is None:
+        return None
+    return [m.model_dump(exclude_none=True) for m in members]
+
+
+@router.post("/add_provider_group")
+def add_provider_group(data: ProviderGroupRequest):
+    try:
+        group_id = ProviderGroupService.add_group(data.name, _members(data.members), data.strategy)
+        if not group_id:
+            return R.error(msg='添加供应商组失败')
+        return R.success(msg='添加供应商组成功', data={'id': group_id})
+    except Exception as e:
+        return R.error(msg=str(e))
+
+
+@router.get("/get_all_provider_groups")
+def get_all_provider_groups():
+    try:
+        return R.success(ProviderGroupService.get_all_groups())
+    except Exception as e:
+        return R.error(msg=str(e))
+
+
+@router.get("/get_provider_group/{id}")
+def get_provider_group(id: str):
+    group = ProviderGroupService.get_group_by_id(id)
+    if not group:
+        return R.error(msg='供应商组不存在')
+    return R.success(group)
+
+
+@router.post("/update_provider_group")
+def update_provider_group(data: ProviderGroupUpdateRequest):
+    try:
+        payload = data.model_dump(exclude={'members'})
+        payload['members'] = _members(data.members)
+        group_id = ProviderGroupService.update_group(id=data.id, data=payload)
+        if not group_id:
+            return R.error(msg='供应商组不存在或更新失败')
+        return R.success(msg='更新供应商组成功', data={'id': group_id})
+    except Exception as e:
+        return R.error(msg=str(e))
+
+
+@router.get("/delete_provider_group/{id}")
+def delete_provider_group(id: str):
+    try:
+        ProviderGroupService.delete_group(id)
+        return R.success(msg='删除供应商组成功')
+    except Exception as e:
+        return R.error(msg=str(e))
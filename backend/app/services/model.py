@@ -1,9 +1,19 @@
 
 
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from fastapi.encoders import jsonable_encoder
+
+from app.db.model_catalog_dao import get_catalog, save_catalog
 from app.db.model_dao import insert_model, get_all_models, get_model_by_provider_and_name, delete_model
 from app.db.provider_dao import get_enabled_providers
+from app.db.provider_group_dao import get_all_groups
 from app.enums.exception import ProviderErrorEnum
 from app.exceptions.provider import ProviderError
+from app.gpt import model_registry
 from app.gpt.gpt_factory import GPTFactory
 from app.gpt.provider.OpenAI_compatible_provider import OpenAICompatibleProvider
 from app.models.model_config import ModelConfig
@@ -11,6 +21,17 @@ from app.services.provider import ProviderService
 from app.utils.logger import get_logger
 
 logger=get_logger(__name__)
+
+# 供应商模型列表缓存的有效期（秒），过期后先返回旧列表并在后台刷新
+MODEL_CATALOG_TTL = int(os.getenv("MODEL_CATALOG_TTL", str(6 * 3600)))
+# 拉取失败后，至少间隔多少秒再重试，避免反复请求故障或限流中的网关
+MODEL_CATALOG_RETRY_SECONDS = int(os.getenv("MODEL_CATALOG_RETRY_SECONDS", "60"))
+
+_catalog_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="model-catalog")
+_catalog_refreshing: set = set()
+_catalog_lock = threading.Lock()
+
+
 class ModelService:
 
     @staticmethod
@@ -21,6 +42,7 @@ class ModelService:
             provider=provider["name"],
             model_name='',
             name=provider["name"],
+            provider_id=provider["id"],
         )
 
     @staticmethod
@@ -33,6 +55,8 @@ class ModelService:
             config = ModelService._build_model_config(provider)
             gpt = GPTFactory().from_config(config)
             models = gpt.list_models()
+            # 部分供应商在模型列表中附带上下文长度等信息，记入模型能力表
+            model_registry.register_models(provider_id, getattr(models, "data", models))
             if verbose:
                 print(f"[{provider['name']}] 模型列表: {models}")
             return models
@@ -46,7 +70,7 @@ class ModelService:
             raw_models = get_all_models()
             if verbose:
                 print(f"所有模型列表: {raw_models}")
-            return ModelService._format_models(raw_models)
+            return ModelService._format_models(raw_models) + ModelService._group_models()
         except Exception as e:
             print(f"获取所有模型失败: {e}")
             return []
@@ -61,6 +85,16 @@ class ModelService:
             print(f"获取所有模型失败: {e}")
             return []
     @staticmethod
+    def _group_models() -> list:
+        """
+        供应商组作为逻辑模型出现在模型列表中，provider_id 为组 ID
+        """
+        return [
+            {"id": None, "provider_id": group["id"], "model_name": group["name"], "created_at": None, "group": True}
+            for group in get_all_groups() if group.get("enabled")
+        ]
+
+    @staticmethod
     def _format_models(raw_models: list) -> list:
         """
         格式化模型列表
@@ -72,6 +106,9 @@ class ModelService:
                 "provider_id": model.get("provider_id"),
                 "model_name": model.get("model_name"),
                 "created_at": model.get("created_at", None),  # 如果有created_at字段
+                "capabilities": model_registry.get_capabilities(
+                    model.get("model_name"), model.get("provider_id")
+                ).to_dict(),
             })
         return formatted
     @staticmethod
@@ -83,22 +120,81 @@ class ModelService:
         return enabled_models
     @staticmethod
     def get_all_models_by_id(provider_id: str, verbose: bool = False):
-        try:
-            provider = ProviderService.get_provider_by_id(provider_id)
+        """
+        读取供应商的远程模型列表缓存（stale-while-revalidate）：缓存过期时提交后台刷新并先返回已有的列表；
+        还没有缓存（新增供应商、修改了 api_key / base_url）时同步拉取一次，避免返回空列表
+        """
+        catalog = get_catalog(provider_id)
+        if not catalog:
+            ModelService._fetch_catalog(provider_id)
+            catalog = get_catalog(provider_id)
+        now = datetime.now()
+        fetched_at = catalog and catalog["fetched_at"]
+        checked_at = catalog and catalog["checked_at"]
+        stale = not fetched_at or (now - fetched_at).total_seconds() > MODEL_CATALOG_TTL
+        retry_due = not checked_at or (now - checked_at).total_seconds() > MODEL_CATALOG_RETRY_SECONDS
+
+        refreshing = provider_id in _catalog_refreshing
+        if stale and (retry_due or not catalog):
+            refreshing = ModelService.refresh_catalog_in_background(provider_id) or refreshing
+        if verbose:
+            logger.info(f"[{provider_id}] 读取模型列表缓存 (stale={stale}, refreshing={refreshing})")
+        return {
+            "models": catalog["models"] if catalog else [],
+            "fetched_at": jsonable_encoder(fetched_at),
+            "stale": stale,
+            "refreshing": refreshing,
+            "error": catalog["error"] if catalog else None,
+        }
 
-            models = ModelService.get_model_list(provider["id"], verbose=verbose)
-            print(type(models))
-            serializable_models = [m.dict() for m in models.data]
-            model_list = {
-                "models": serializable_models
-            }
+    @staticmethod
+    def refresh_catalog(provider_id: str) -> dict:
+        """
+        立即拉取供应商的远程模型列表并写入缓存，失败时保留上次成功的列表并记录错误
+        """
+        ModelService._fetch_catalog(provider_id)
+        return ModelService.get_all_models_by_id(provider_id)
 
-            logger.info(f"[{provider['name']}] 获取模型成功")
-            return model_list
+    @staticmethod
+    def _fetch_catalog(provider_id: str) -> None:
+        provider = ProviderService.get_provider_by_id(provider_id)
+        if not provider:
+            raise ProviderError(code=ProviderErrorEnum.NOT_FOUND.code, message=ProviderErrorEnum.NOT_FOUND.message)
+        try:
+            config = ModelService._build_model_config(provider)
+            models = GPTFactory().from_config(config).list_models()
+            items = getattr(models, "data", models) or []
+            model_registry.register_models(provider_id, items)
+            serializable_models = [m.model_dump() if hasattr(m, "model_dump") else dict(m) for m in items]
+            save_catalog(provider_id, serializable_models)
+            logger.info(f"[{provider['name']}] 模型列表已刷新，共 {len(serializable_models)} 个")
         except Exception as e:
-            # print(f"[{provider_id}] 获取模型失败: {e}")
             logger.error(f"[{provider_id}] 获取模型失败: {e}")
-            return []
+            save_catalog(provider_id, error=str(e))
+
+    @staticmethod
+    def refresh_catalog_in_background(provider_id: str) -> bool:
+        """
+        提交后台刷新，同一供应商同时只有一个刷新任务
+
+        :return: 是否提交了新的刷新任务
+        """
+        with _catalog_lock:
+            if provider_id in _catalog_refreshing:
+                return False
+            _catalog_refreshing.add(provider_id)
+
+        def run():
+            try:
+                ModelService._fetch_catalog(provider_id)
+            except Exception as e:
+                logger.error(f"[{provider_id}] 后台刷新模型列表失败: {e}")
+            finally:
+                with _catalog_lock:
+                    _catalog_refreshing.discard(provider_id)
+
+        _catalog_executor.submit(run)
+        return True
     @staticmethod
     def connect_test(id: str) -> bool:
 
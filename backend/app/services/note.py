@@ -1,8 +1,12 @@
+import hashlib
 import json
 import logging
 import os
 import re
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import asdict
+from datetime import datetime
 from pathlib import Path
 from typing import List, Optional, Tuple, Union, Any
 
@@ -24,18 +28,23 @@ from app.exceptions.note import NoteError
 from app.exceptions.provider import ProviderError
 from app.gpt.base import GPT
 from app.gpt.gpt_factory import GPTFactory
+from app.gpt.image_profile import get_image_profile, grid_cell_size, image_encoding
 from app.models.audio_model import AudioDownloadResult
 from app.models.gpt_model import GPTSource
 from app.models.model_config import ModelConfig
 from app.models.notes_model import AudioDownloadResult, NoteResult
-from app.models.transcriber_model import TranscriptResult, TranscriptSegment
+from app.models.transcriber_model import SegmentStore, TranscriptResult
 from app.services.constant import SUPPORT_PLATFORM_MAP
 from app.services.provider import ProviderService
+from app.services.provider_group import ProviderGroupService
 from app.transcriber.base import Transcriber
 from app.transcriber.transcriber_provider import get_transcriber, _transcribers
 from app.utils.note_helper import replace_content_markers
+from app.utils.path_helper import get_data_dir
 from app.utils.status_code import StatusCode
-from app.utils.video_helper import generate_screenshot
+from app.utils.video_helper import generate_clip_screenshots, generate_screenshots
+from app.utils.workspace import create_workspace, remove_workspace
+from app.utils.timestamp_index import TimestampIndex
 from app.utils.video_reader import VideoReader
 
 # ------------------ 环境变量与全局配置 ------------------
@@ -54,6 +63,22 @@ NOTE_OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 IMAGE_OUTPUT_DIR = os.getenv("OUT_DIR", "./static/screenshots")
 # 图片基础 URL（用于生成 Markdown 中的图片链接，需前端静态目录对应）
 IMAGE_BASE_URL = os.getenv("IMAGE_BASE_URL", "/static/screenshots")
+# 视频理解图片的发送方式：base64 内联，或 url（模型服务需能访问 VIDEO_IMAGE_BASE_URL）
+VIDEO_IMAGE_MODE = os.getenv("VIDEO_IMAGE_MODE", "base64").lower()
+# 视频理解取帧方式：fixed 按 video_interval 等间隔 / adaptive 按画面变化自适应
+VIDEO_SAMPLING = os.getenv("VIDEO_SAMPLING", "fixed").lower()
+VIDEO_IMAGE_BASE_URL = os.getenv("VIDEO_IMAGE_BASE_URL", f"{BACKEND_BASE_URL}/static/grids")
+# 单次请求图片总字节上限，0 表示不限制
+VIDEO_IMAGE_MAX_BYTES = int(os.getenv("VIDEO_IMAGE_MAX_BYTES", str(8 * 1024 * 1024)))
+# 平台字幕快速通道：视频自带可用字幕时跳过音频下载与转写
+SUBTITLE_FAST_PATH = os.getenv("SUBTITLE_FAST_PATH", "true").lower() == "true"
+# 流式生成笔记，边生成边写入 {task_id}_markdown.partial 供前端展示进度
+LLM_STREAM = os.getenv("LLM_STREAM", "true").lower() == "true"
+# 一个任务中多风格 / 多模型笔记的数量上限与并发数
+NOTE_MAX_VARIANTS = int(os.getenv("NOTE_MAX_VARIANTS", "6"))
+NOTE_VARIANT_CONCURRENCY = int(os.getenv("NOTE_VARIANT_CONCURRENCY", "3"))
+# 只需要截图（不做视频理解）时不下载完整视频，笔记生成后只拉取截图时间点附近的低分辨率片段
+VIDEO_PARTIAL_SCREENSHOT = os.getenv("VIDEO_PARTIAL_SCREENSHOT", "true").lower() == "true"
 
 # 日志配置
 logger = logging.getLogger(__name__)
@@ -73,6 +98,9 @@ class NoteGenerator:
         self.transcriber: Transcriber = self._init_transcriber()
         self.video_path: Optional[Path] = None
         self.video_img_urls=[]
+        self.workspace: Optional[str] = None
+        # 按片段截图时的 (下载器, 视频链接)，截图时间点要等笔记生成后才知道
+        self.clip_source: Optional[Tuple[Downloader, str]] = None
         logger.info("NoteGenerator 初始化完成")
 
 
@@ -95,6 +123,13 @@ class NoteGenerator:
         video_understanding: bool = False,
         video_interval: int = 0,
         grid_size: Optional[List[int]] = None,
+        summary_mode: Optional[str] = None,
+        bypass_cache: bool = False,
+        image_mode: Optional[str] = None,
+        max_image_bytes: Optional[int] = None,
+        styles: Optional[List[str]] = None,
+        video_sampling: Optional[str] = None,
+        models: Optional[List[dict]] = None,
     ) -> NoteResult | None:
         """
         主流程：按步骤依次下载、转写、GPT 总结、截图/链接处理、存库、返回 NoteResult。
@@ -114,11 +149,20 @@ class NoteGenerator:
         :param video_understanding: 是否需要视频拼图理解（生成缩略图）
         :param video_interval: 视频帧截取间隔（秒），仅在 video_understanding 为 True 时生效
         :param grid_size: 生成缩略图时的网格大小，如 [3, 3]
+        :param summary_mode: 总结方式 auto / single / map_reduce，auto 时按转写长度自动选择
+        :param bypass_cache: 跳过笔记缓存与 LLM 响应缓存，强制重新生成
+        :param image_mode: 视频理解图片发送方式 base64 / url，默认读取 VIDEO_IMAGE_MODE
+        :param max_image_bytes: 单次请求图片总字节上限，默认读取 VIDEO_IMAGE_MAX_BYTES
+        :param styles: 同时生成的多个笔记风格，与 models 组合后每种组合生成一个版本
+        :param models: 同时使用的多个模型，元素为 {"model_name", "provider_id"}
+        :param video_sampling: 视频理解取帧方式 fixed / adaptive，默认读取 VIDEO_SAMPLING
         :return: NoteResult 对象，包含 markdown 文本、转写结果和音频元信息
         """
         if grid_size is None:
             grid_size = []
 
+        # 本任务的中间文件（网格图、截图）都写在独立的工作目录中，任务结束后删除
+        self.workspace = create_workspace(task_id)
         try:
             logger.info(f"开始生成笔记 (task_id={task_id})")
             self._update_status(task_id, TaskStatus.PARSING)
@@ -138,13 +182,20 @@ class NoteGenerator:
                 "video_understanding": video_understanding,
                 "video_interval": video_interval,
                 "grid_size": grid_size,
+                "summary_mode": summary_mode,
+                "styles": styles,
+                "models": models,
+                "video_sampling": video_sampling,
             }
             self._save_history_record(task_id, "PARSING", platform, form_data=form_data)
 
-            # 获取下载器与 GPT 实例
+            # 获取下载器与 GPT 实例（每个风格 / 模型组合一个，第一个为主版本）
+            variants = self._build_variants(style, model_name, provider_id, styles, models)
+            style, model_name, provider_id = variants[0]["style"], variants[0]["model_name"], variants[0]["provider_id"]
 
             downloader = self._get_downloader(platform)
-            gpt = self._get_gpt(model_name, provider_id)
+            gpts = [self._get_gpt(v["model_name"], v["provider_id"]) for v in variants]
+            gpt = gpts[0]
 
             # 缓存文件路径
             audio_cache_file = NOTE_OUTPUT_DIR / f"{task_id}_audio.json"
@@ -157,6 +208,7 @@ class NoteGenerator:
                 video_url=video_url,
                 quality=quality,
                 audio_cache_file=audio_cache_file,
+                transcript_cache_file=transcript_cache_file,
                 status_phase=TaskStatus.DOWNLOADING,
                 platform=platform,
                 output_path=output_path,
@@ -164,6 +216,10 @@ class NoteGenerator:
                 video_understanding=video_understanding,
                 video_interval=video_interval,
                 grid_size=grid_size,
+                model_name=getattr(gpt, "model", model_name),
+                image_mode=image_mode,
+                max_image_bytes=max_image_bytes,
+                video_sampling=video_sampling,
             )
 
             # 2. 转写文字
@@ -173,29 +229,50 @@ class NoteGenerator:
                 status_phase=TaskStatus.TRANSCRIBING,
             )
 
-            # 3. GPT 总结
-            markdown = self._summarize_text(
+            # 3. GPT 总结（多个版本时共享同一份转写并发生成）
+            summary_kwargs = dict(
                 audio_meta=audio_meta,
                 transcript=transcript,
-                gpt=gpt,
-                markdown_cache_file=markdown_cache_file,
                 link=link,
                 screenshot=screenshot,
                 formats=_format or [],
-                style=style,
                 extras=extras,
                 video_img_urls=self.video_img_urls,
+                summary_mode=summary_mode,
+                bypass_cache=bypass_cache,
             )
+            if len(variants) == 1:
+                markdowns = [self._summarize_text(
+                    gpt=gpt, markdown_cache_file=markdown_cache_file, style=style, **summary_kwargs
+                )]
+            else:
+                markdowns = self._summarize_variants(task_id, variants, gpts, **summary_kwargs)
+            self._save_usage_metrics(task_id, variants, gpts, markdowns)
 
             # 4. 截图 & 链接替换
             if _format:
-                markdown = self._post_process_markdown(
-                    markdown=markdown,
-                    video_path=self.video_path,
-                    formats=_format,
-                    audio_meta=audio_meta,
-                    platform=platform,
-                )
+                markdowns = [
+                    self._post_process_markdown(
+                        markdown=item,
+                        video_path=self.video_path,
+                        formats=_format,
+                        audio_meta=audio_meta,
+                        platform=platform,
+                        transcript=transcript,
+                    ) if item is not None else None
+                    for item in markdowns
+                ]
+            markdown = next(item for item in markdowns if item is not None)
+            markdown_versions = [
+                {
+                    "ver_id": str(uuid.uuid4()),
+                    "content": item,
+                    "style": variant["style"] or 'default',
+                    "model_name": variant["model_name"],
+                    "created_at": datetime.now().isoformat(),
+                }
+                for variant, item in zip(variants, markdowns) if item is not None
+            ]
 
             # 5. 保存记录到数据库
             self._update_status(task_id, TaskStatus.SAVING)
@@ -214,19 +291,17 @@ class NoteGenerator:
                 transcript_full_text=transcript.full_text,
                 transcript_language=transcript.language,
                 transcript_raw=transcript.raw,
-                transcript_segments=[{
-                    "start": seg.start,
-                    "end": seg.end,
-                    "text": seg.text
-                } for seg in transcript.segments] if transcript.segments else [],
+                transcript_segments=transcript.segments,
                 markdown_content=markdown,
+                markdown_versions=markdown_versions,
                 form_data=form_data  # 传递form_data用于创建markdown版本
             )
 
             # 7. 完成
             self._update_status(task_id, TaskStatus.SUCCESS)
             logger.info(f"笔记生成成功 (task_id={task_id})")
-            return NoteResult(markdown=markdown, transcript=transcript, audio_meta=audio_meta)
+            return NoteResult(markdown=markdown, transcript=transcript, audio_meta=audio_meta,
+                              markdown_versions=markdown_versions)
 
         except Exception as exc:
             logger.error(f"生成笔记流程异常 (task_id={task_id})：{exc}", exc_info=True)
@@ -235,6 +310,10 @@ class NoteGenerator:
             if task_id:
                 self._update_history_record(task_id=task_id, status="FAILED")
             return None
+        finally:
+            remove_workspace(self.workspace)
+            self.workspace = None
+            self.clip_source = None
 
     @staticmethod
     def delete_note(video_id: str, platform: str) -> int:
@@ -265,11 +344,16 @@ class NoteGenerator:
         """
         根据 provider_id 获取对应的 GPT 实例
         :param model_name: GPT 模型名称
-        :param provider_id: 供应商 ID
+        :param provider_id: 供应商 ID 或供应商组 ID
         :return: GPT 实例
         """
         provider = ProviderService.get_provider_by_id(provider_id)
         if not provider:
+            # provider_id 也可以是供应商组 ID，由组内多个供应商共同提供该模型
+            group = ProviderGroupService.get_group_by_id(provider_id)
+            if group and group.get("enabled"):
+                logger.info(f"创建供应商组 GPT 实例 {provider_id} ({group['name']})")
+                return ProviderGroupService.build_gpt(group)
             logger.error(f"[get_gpt] 未找到模型供应商: provider_id={provider_id}")
             raise ProviderError(code=ProviderErrorEnum.NOT_FOUND,message=ProviderErrorEnum.NOT_FOUND.message)
         logger.info(f"创建 GPT 实例 {provider_id}")
@@ -279,6 +363,10 @@ class NoteGenerator:
             model_name=model_name,
             provider=provider["type"],
             name=provider["name"],
+            provider_id=provider["id"],
+            rpm_limit=provider.get("rpm_limit"),
+            tpm_limit=provider.get("tpm_limit"),
+            max_concurrency=provider.get("max_concurrency"),
         )
         return GPTFactory().from_config(config)
 
@@ -344,6 +432,26 @@ class NoteGenerator:
             except:
                 logger.error(f"写入错误  {e}")
 
+    @staticmethod
+    def _save_metrics(task_id: Optional[str], **metrics) -> None:
+        """
+        合并写入 {task_id}_metrics.json，记录任务的运行指标（LLM 用量等），任务状态接口随结果返回
+
+        :param task_id: 任务唯一 ID
+        :param metrics: 要写入 / 覆盖的指标
+        """
+        if not task_id:
+            return
+        metrics_file = NOTE_OUTPUT_DIR / f"{task_id}_metrics.json"
+        try:
+            data = json.loads(metrics_file.read_text(encoding="utf-8")) if metrics_file.exists() else {}
+            data.update(metrics)
+            temp_file = metrics_file.with_suffix(".tmp")
+            temp_file.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+            temp_file.replace(metrics_file)
+        except Exception as e:
+            logger.warning(f"写入任务指标失败 (task_id={task_id})：{e}")
+
     def _handle_exception(self, task_id, exc):
         logger.error(f"任务异常 (task_id={task_id})", exc_info=True)
         error_message = getattr(exc, 'detail', str(exc))
@@ -367,11 +475,17 @@ class NoteGenerator:
         video_understanding: bool,
         video_interval: int,
         grid_size: List[int],
+        transcript_cache_file: Optional[Path] = None,
+        model_name: Optional[str] = None,
+        image_mode: Optional[str] = None,
+        max_image_bytes: Optional[int] = None,
+        video_sampling: Optional[str] = None,
     ) -> AudioDownloadResult | None:
         """
         1. 检查音频缓存；若不存在，则根据需要下载音频或视频（若需截图/可视化）。
         2. 如果需要视频，则先下载视频并生成缩略图集，再下载音频。
-        3. 返回 AudioDownloadResult
+        3. 平台提供可用字幕时直接写入转写缓存，跳过音频下载。
+        4. 返回 AudioDownloadResult
 
         :param downloader: Downloader 实例
         :param video_url: 视频/音频链接
@@ -384,6 +498,11 @@ class NoteGenerator:
         :param video_understanding: 是否需要生成缩略图
         :param video_interval: 视频截帧间隔
         :param grid_size: 缩略图网格尺寸
+        :param transcript_cache_file: 转写结果缓存路径，字幕快速通道命中时写入
+        :param model_name: 总结所用模型，决定缩略图的分辨率与编码格式
+        :param image_mode: 缩略图发送方式 base64 / url
+        :param max_image_bytes: 单次请求图片总字节上限
+        :param video_sampling: 取帧方式 fixed / adaptive
         :return: AudioDownloadResult 对象
         """
         task_id = audio_cache_file.stem.split("_")[0]
@@ -393,7 +512,10 @@ class NoteGenerator:
 
         # 判断是否需要下载视频
         need_video = screenshot or video_understanding
-        if need_video:
+        if need_video and not video_understanding and VIDEO_PARTIAL_SCREENSHOT:
+            logger.info("仅需截图，暂不下载视频，插入截图时再按时间点下载片段")
+            self.clip_source = (downloader, str(video_url))
+        elif need_video:
             try:
                 logger.info("开始下载视频")
                 video_path_str = downloader.download_video(video_url)
@@ -402,13 +524,23 @@ class NoteGenerator:
 
                 # 若指定了 grid_size，则生成缩略图
                 if grid_size:
+                    # 按模型的图片切片规则确定单元格尺寸，超过模型处理上限的像素只会浪费体积
+                    profile = get_image_profile(model_name)
+                    unit_width, unit_height = grid_cell_size(profile, tuple(grid_size))
+                    image_format, image_quality = image_encoding(profile)
+                    use_url = (image_mode or VIDEO_IMAGE_MODE) == "url"
                     self.video_img_urls=VideoReader(
                         video_path=str(self.video_path),
                         grid_size=tuple(grid_size),
                         frame_interval=video_interval,
-                        unit_width=1280,
-                        unit_height=720,
-                        save_quality=90,
+                        work_dir=self.workspace,
+                        sampling=(video_sampling or VIDEO_SAMPLING).lower(),
+                        unit_width=unit_width,
+                        unit_height=unit_height,
+                        save_quality=image_quality,
+                        image_format=image_format,
+                        max_total_bytes=VIDEO_IMAGE_MAX_BYTES if max_image_bytes is None else max_image_bytes,
+                        image_base_url=VIDEO_IMAGE_BASE_URL if use_url else None,
                     ).run()
                 else:
                     logger.info("未指定 grid_size，跳过缩略图生成")
@@ -425,6 +557,11 @@ class NoteGenerator:
                 return AudioDownloadResult(**data)
             except Exception as e:
                 logger.warning(f"读取音频缓存失败，将重新下载：{e}")
+        # 平台字幕快速通道
+        if SUBTITLE_FAST_PATH and transcript_cache_file is not None:
+            audio = self._download_subtitles(downloader, video_url, audio_cache_file, transcript_cache_file)
+            if audio:
+                return audio
         # 下载音频
         try:
             logger.info("开始下载音频")
@@ -437,12 +574,44 @@ class NoteGenerator:
             # 缓存 audio 元信息到本地 JSON
             audio_cache_file.write_text(json.dumps(asdict(audio), ensure_ascii=False, indent=2), encoding="utf-8")
             logger.info(f"音频下载并缓存成功 ({audio_cache_file})")
+            if audio.download_stats:
+                self._save_metrics(task_id, download=audio.download_stats)
             return audio
         except Exception as exc:
             logger.error(f"音频下载失败：{exc}")
             self._handle_exception(task_id, exc)
             raise
 
+    def _download_subtitles(
+        self,
+        downloader: Downloader,
+        video_url: Union[str, HttpUrl],
+        audio_cache_file: Path,
+        transcript_cache_file: Path,
+    ) -> Optional[AudioDownloadResult]:
+        """
+        尝试使用平台字幕代替音频下载与转写。命中时同时写入音频与转写缓存，
+        后续 _transcribe_audio 会直接读取转写缓存。
+
+        :param downloader: Downloader 实例
+        :param video_url: 视频链接
+        :param audio_cache_file: 音频元信息缓存路径
+        :param transcript_cache_file: 转写结果缓存路径
+        :return: 命中字幕时返回 AudioDownloadResult，否则返回 None
+        """
+        try:
+            result = downloader.download_subtitles(str(video_url))
+        except Exception as e:
+            logger.warning(f"获取平台字幕失败，回退到音频转写：{e}")
+            return None
+        if not result:
+            return None
+
+        audio, transcript = result
+        transcript_cache_file.write_text(json.dumps(transcript.to_dict(compact=True), ensure_ascii=False), encoding="utf-8")
+        audio_cache_file.write_text(json.dumps(asdict(audio), ensure_ascii=False, indent=2), encoding="utf-8")
+        logger.info(f"使用平台字幕，跳过音频下载与转写 ({transcript_cache_file})")
+        return audio
 
     def _transcribe_audio(
         self,
@@ -467,8 +636,7 @@ class NoteGenerator:
             logger.info(f"检测到转写缓存 ({transcript_cache_file})，尝试读取")
             try:
                 data = json.loads(transcript_cache_file.read_text(encoding="utf-8"))
-                segments = [TranscriptSegment(**seg) for seg in data.get("segments", [])]
-                return TranscriptResult(language=data["language"], full_text=data["full_text"], segments=segments)
+                return TranscriptResult.from_dict(data)
             except Exception as e:
                 logger.warning(f"加载转写缓存失败，将重新转写：{e}")
 
@@ -476,7 +644,7 @@ class NoteGenerator:
         try:
             logger.info("开始转写音频")
             transcript = self.transcriber.transcript(file_path=audio_file)
-            transcript_cache_file.write_text(json.dumps(asdict(transcript), ensure_ascii=False, indent=2), encoding="utf-8")
+            transcript_cache_file.write_text(json.dumps(transcript.to_dict(compact=True), ensure_ascii=False), encoding="utf-8")
             logger.info(f"转写并缓存成功 ({transcript_cache_file})")
             return transcript
         except Exception as exc:
@@ -496,6 +664,8 @@ class NoteGenerator:
         style: Optional[str],
         extras: Optional[str],
             video_img_urls: List[str],
+        summary_mode: Optional[str] = None,
+        bypass_cache: bool = False,
     ) -> str | None:
         """
         调用 GPT 对转写结果进行总结，生成 Markdown 文本并缓存。
@@ -509,11 +679,132 @@ class NoteGenerator:
         :param formats: 包含 'link' 或 'screenshot' 的列表
         :param style: GPT 输出风格
         :param extras: GPT 额外参数
+        :param summary_mode: 总结方式 auto / single / map_reduce
+        :param bypass_cache: 跳过笔记缓存与 LLM 响应缓存，强制重新生成
         :return: 生成的 Markdown 字符串
         """
-        task_id = markdown_cache_file.stem
+        task_id = markdown_cache_file.stem.split("_")[0]
+        self._update_status(task_id, TaskStatus.SUMMARIZING)
+        try:
+            return self._generate_markdown(
+                audio_meta, transcript, gpt, markdown_cache_file, link, screenshot, formats,
+                style, extras, video_img_urls, summary_mode, bypass_cache,
+            )
+        except Exception as exc:
+            logger.error(f"GPT 总结失败：{exc}")
+            self._handle_exception(task_id, exc)
+            raise
+
+    def _summarize_variants(
+        self,
+        task_id: str,
+        variants: List[dict],
+        gpts: List[GPT],
+        **kwargs,
+    ) -> List[Optional[str]]:
+        """
+        基于同一份转写并发生成多个风格 / 模型的笔记，整个任务只有一个状态。
+        主版本写入 {task_id}_markdown.md，其余版本写入 {task_id}_markdown_v{序号}.md，各自缓存与续写。
+        部分版本失败时记录日志并返回 None，全部失败时任务失败。
+
+        :param task_id: 任务 ID
+        :param variants: [{"style", "model_name", "provider_id"}]
+        :param gpts: 与 variants 一一对应的 GPT 实例
+        :param kwargs: 传给 _generate_markdown 的公共参数
+        :return: 与 variants 一一对应的 Markdown，失败的版本为 None
+        """
         self._update_status(task_id, TaskStatus.SUMMARIZING)
+        logger.info(f"并发生成 {len(variants)} 个笔记版本 (task_id={task_id})")
+
+        def run(index: int) -> Optional[str]:
+            suffix = "" if index == 0 else f"_v{index}"
+            variant = variants[index]
+            try:
+                return self._generate_markdown(
+                    gpt=gpts[index],
+                    markdown_cache_file=NOTE_OUTPUT_DIR / f"{task_id}_markdown{suffix}.md",
+                    style=variant["style"],
+                    **kwargs,
+                )
+            except Exception as exc:
+                logger.error(f"笔记版本生成失败 (style={variant['style']}, model={variant['model_name']})：{exc}")
+                errors.append(exc)
+                return None
+
+        errors: List[Exception] = []
+        with ThreadPoolExecutor(max_workers=max(1, min(NOTE_VARIANT_CONCURRENCY, len(variants)))) as pool:
+            markdowns = list(pool.map(run, range(len(variants))))
+        if all(item is None for item in markdowns):
+            self._handle_exception(task_id, errors[0])
+            raise errors[0]
+        return markdowns
+
+    @staticmethod
+    def _build_variants(
+        style: Optional[str],
+        model_name: Optional[str],
+        provider_id: Optional[str],
+        styles: Optional[List[str]] = None,
+        models: Optional[List[dict]] = None,
+    ) -> List[dict]:
+        """
+        展开风格与模型的组合（风格 × 模型），去重并限制数量，第一个为主版本
 
+        :return: [{"style", "model_name", "provider_id"}]
+        """
+        style_list = list(styles or []) or [style]
+        model_list = [(m.get("model_name"), m.get("provider_id")) for m in models or []] or [(model_name, provider_id)]
+        variants, seen = [], set()
+        for model in model_list:
+            for item in style_list:
+                key = (item, *model)
+                if key in seen:
+                    continue
+                seen.add(key)
+                variants.append({"style": item, "model_name": model[0], "provider_id": model[1]})
+        if len(variants) > NOTE_MAX_VARIANTS:
+            logger.warning(f"笔记版本数 {len(variants)} 超过上限 {NOTE_MAX_VARIANTS}，只生成前 {NOTE_MAX_VARIANTS} 个")
+            variants = variants[:NOTE_MAX_VARIANTS]
+        return variants
+
+    def _save_usage_metrics(self, task_id: str, variants: List[dict], gpts: List[GPT],
+                            markdowns: List[Optional[str]]) -> None:
+        """记录 LLM 用量；多个版本时同时记录每个版本的用量与是否成功"""
+        usages = [getattr(gpt, "usage", None) for gpt in gpts]
+        if all(usage is None for usage in usages):
+            return
+        if len(variants) == 1:
+            self._save_metrics(task_id, llm_usage=usages[0].to_dict())
+            return
+        per_variant = [
+            {**variant, "success": markdown is not None, "llm_usage": usage.to_dict() if usage else None}
+            for variant, usage, markdown in zip(variants, usages, markdowns)
+        ]
+        total = {}
+        for item in per_variant:
+            for key, value in (item["llm_usage"] or {}).items():
+                total[key] = total.get(key, [] if isinstance(value, list) else 0) + value
+        self._save_metrics(task_id, llm_usage=total, variants=per_variant)
+
+    def _generate_markdown(
+        self,
+        audio_meta: AudioDownloadResult,
+        transcript: TranscriptResult,
+        gpt: GPT,
+        markdown_cache_file: Path,
+        link: bool,
+        screenshot: bool,
+        formats: List[str],
+        style: Optional[str],
+        extras: Optional[str],
+        video_img_urls: List[str],
+        summary_mode: Optional[str] = None,
+        bypass_cache: bool = False,
+    ) -> str:
+        """
+        生成一个版本的笔记：复用缓存 / 从中断处续写 / 调用 GPT，参数同 _summarize_text。
+        不更新任务状态，异常直接抛出由调用方处理。
+        """
         source = GPTSource(
             title=audio_meta.title,
             segment=transcript.segments,
@@ -524,17 +815,63 @@ class NoteGenerator:
             _format=formats,
             style=style,
             extras=extras,
+            summary_mode=summary_mode,
+            bypass_cache=bypass_cache,
         )
 
-        try:
+        # 同一 task_id 重试且生成参数未变时，直接复用已生成的笔记
+        fingerprint = self._summary_fingerprint(gpt, source, transcript)
+        key_file = markdown_cache_file.with_suffix(".key")
+        partial_file = markdown_cache_file.with_suffix(".partial")
+        same_request = key_file.exists() and key_file.read_text(encoding="utf-8") == fingerprint
+        if same_request and not bypass_cache and markdown_cache_file.exists():
+            logger.info(f"检测到笔记缓存 ({markdown_cache_file})，跳过 GPT 总结")
+            return markdown_cache_file.read_text(encoding="utf-8")
+
+        # 未完成的流式输出：任务重试时从中断处续写（参数变化或强制重新生成时丢弃）
+        if partial_file.exists():
+            if same_request and not bypass_cache:
+                source.partial_markdown = partial_file.read_text(encoding="utf-8")
+                logger.info(f"发现未完成的笔记（{len(source.partial_markdown)} 字），从中断处继续生成")
+            else:
+                partial_file.unlink()
+        key_file.write_text(fingerprint, encoding="utf-8")
+
+        with partial_file.open("a", encoding="utf-8") as fp:
+            if LLM_STREAM:
+                def on_delta(delta: str):
+                    fp.write(delta)
+                    fp.flush()
+
+                source.stream_callback = on_delta
             markdown = gpt.summarize(source)
-            markdown_cache_file.write_text(markdown, encoding="utf-8")
-            logger.info(f"GPT 总结并缓存成功 ({markdown_cache_file})")
-            return markdown
-        except Exception as exc:
-            logger.error(f"GPT 总结失败：{exc}")
-            self._handle_exception(task_id, exc)
-            raise
+        markdown_cache_file.write_text(markdown, encoding="utf-8")
+        partial_file.unlink(missing_ok=True)
+        logger.info(f"GPT 总结并缓存成功 ({markdown_cache_file})")
+        return markdown
+
+    @staticmethod
+    def _summary_fingerprint(gpt: GPT, source: GPTSource, transcript: TranscriptResult) -> str:
+        """
+        计算本次总结请求的指纹（模型、供应商、转写内容、格式/风格参数与截图摘要），
+        用于判断 {task_id}_markdown.md 是否可以直接复用
+        """
+        payload = json.dumps(
+            {
+                "model": getattr(gpt, "model", None),
+                "provider": getattr(gpt, "provider", None),
+                "title": source.title,
+                "transcript": hashlib.sha256(transcript.full_text.encode("utf-8")).hexdigest(),
+                "format": source._format,
+                "style": source.style,
+                "extras": source.extras,
+                "summary_mode": source.summary_mode,
+                "images": [hashlib.sha256(url.encode("utf-8")).hexdigest() for url in source.video_img_urls or []],
+            },
+            ensure_ascii=False,
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
 
     def _post_process_markdown(
         self,
@@ -543,52 +880,100 @@ class NoteGenerator:
         formats: List[str],
         audio_meta: AudioDownloadResult,
         platform: str,
+        transcript: Optional[TranscriptResult] = None,
     ) -> str:
         """
         对生成的 Markdown 做后期处理：插入截图和/或插入链接。
+        提供转写结果时，标记中的时间会先吸附到最近的句子 / 分段边界。
 
         :param markdown: 原始 Markdown 字符串
         :param video_path: 本地视频路径（可为 None）
         :param formats: 包含 'link' 或 'screenshot' 的列表
         :param audio_meta: AudioDownloadResult 元信息，用于链接替换
         :param platform: 平台标识，用于链接替换
+        :param transcript: 转写结果，用于构建时间边界索引
         :return: 处理后的 Markdown 字符串
         """
-        if "screenshot" in formats and video_path:
+        index = TimestampIndex(transcript) if transcript and transcript.segments else None
+
+        if "screenshot" in formats and (video_path or self.clip_source):
             try:
-                markdown = self._insert_screenshots(markdown, video_path)
+                markdown = self._insert_screenshots(markdown, video_path, index)
             except Exception as exc:
                 logger.warning("截图插入失败，跳过该步骤")
 
         if "link" in formats:
             try:
-                markdown = replace_content_markers(markdown, video_id=audio_meta.video_id, platform=platform)
+                markdown = replace_content_markers(
+                    markdown,
+                    video_id=audio_meta.video_id,
+                    platform=platform,
+                    snap=index.snap if index else None,
+                )
             except Exception as e:
                 logger.warning(f"链接插入失败，跳过该步骤：{e}")
 
         return markdown
 
-    def _insert_screenshots(self, markdown: str, video_path: Path) -> str | None | Any:
+    def _insert_screenshots(
+        self,
+        markdown: str,
+        video_path: Optional[Path],
+        index: Optional[TimestampIndex] = None,
+    ) -> str:
         """
         扫描 Markdown 文本中所有 Screenshot 标记，并替换为实际生成的截图链接。
 
         :param markdown: 含有 *Screenshot-mm:ss 或 Screenshot-[mm:ss] 标记的 Markdown 文本
-        :param video_path: 本地视频文件路径
+        :param video_path: 本地视频文件路径，为 None 时按 clip_source 下载片段截图
+        :param index: 时间边界索引，提供时截图时间吸附到最近的句子 / 分段开头
         :return: 替换后的 Markdown 字符串
         """
         matches: List[Tuple[str, int]] = self._extract_screenshot_timestamps(markdown)
-        for idx, (marker, ts) in enumerate(matches):
+        if not matches:
+            return markdown
+        times = [index.snap_screenshot(ts) if index else ts for _, ts in matches]
+        # 所有标记一次性批量截图（已缓存的直接复用），单个失败只去掉对应标记
+        shots = self._generate_screenshots(video_path, times)
+        for (marker, _), ts in zip(matches, times):
+            img_path = shots.get(max(0.0, float(ts)))
+            if not img_path:
+                logger.warning(f"截图缺失 (timestamp={ts})，移除标记 {marker}")
+                markdown = markdown.replace(marker, "", 1)
+                continue
+            # 构建前端可访问的 URL，例如 /static/screenshots/{filename}
+            img_url = f"{IMAGE_BASE_URL.rstrip('/')}/{Path(img_path).name}"
+            markdown = markdown.replace(marker, f"![]({img_url})", 1)
+        return markdown
+
+    def _generate_screenshots(self, video_path: Optional[Path], times: List[float]) -> dict:
+        """
+        有本地视频时直接截图；否则只下载时间点附近的片段截图，平台不支持片段下载或下载失败时
+        退回下载完整视频（只下载一次，后续笔记版本复用）。
+
+        :param video_path: 本地视频文件路径（可为 None）
+        :param times: 截图时间点（秒）
+        :return: {时间点: 截图路径}
+        """
+        if not video_path and self.clip_source:
+            downloader, video_url = self.clip_source
             try:
-                img_path = generate_screenshot(str(video_path), str(IMAGE_OUTPUT_DIR), ts, idx)
-                filename = Path(img_path).name
-                # 构建前端可访问的 URL，例如 /static/screenshots/{filename}
-                img_url = f"{IMAGE_BASE_URL.rstrip('/')}/{filename}"
-                markdown = markdown.replace(marker, f"![]({img_url})", 1)
+                shots = generate_clip_screenshots(
+                    video_url,
+                    lambda pending: downloader.download_clips(video_url, pending, self.workspace or get_data_dir()),
+                    str(IMAGE_OUTPUT_DIR),
+                    times,
+                    work_dir=self.workspace,
+                )
+                if shots is not None:
+                    return shots
+                logger.info("平台不支持按片段下载，改为下载完整视频截图")
             except Exception as exc:
-                logger.error(f"生成截图失败 (timestamp={ts})：{exc}")
-                # self._handle_exception(task_id, exc)
-                return None
-        return markdown
+                logger.warning(f"片段下载失败，改为下载完整视频截图：{exc}")
+            self.video_path = Path(downloader.download_video(video_url))
+            self.clip_source = None
+            video_path = self.video_path
+        return generate_screenshots(str(video_path), str(IMAGE_OUTPUT_DIR), times, work_dir=self.workspace)
 
     @staticmethod
     def _extract_screenshot_timestamps(markdown: str) -> List[Tuple[str, int]]:
@@ -713,6 +1098,11 @@ class NoteGenerator:
                         if 'markdown_versions' not in adapted_data:
                             adapted_data['markdown_versions'] = [markdown_version]
                     
+                    # 处理 transcript_segments：SegmentStore 直接展开为字典列表
+                    elif key == 'transcript_segments' and isinstance(value, SegmentStore):
+                        logger.info(f"处理 transcript_segments 字段: {len(value)} 个片段")
+                        adapted_data[key] = value.to_list()
+
                     # 处理 transcript_segments：确保格式正确
                     elif key == 'transcript_segments' and isinstance(value, list):
                         logger.info(f"处理 transcript_segments 字段: {len(value)} 个片段")
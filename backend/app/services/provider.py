@@ -1,6 +1,7 @@
 from fastapi.encoders import jsonable_encoder
 from kombu import uuid
 
+from app.db.model_catalog_dao import delete_catalog
 from app.db.models.providers import Provider
 from app.db.provider_dao import (
     insert_provider,
@@ -11,10 +12,13 @@ from app.db.provider_dao import (
     delete_provider, get_enabled_providers,
 )
 from app.gpt.gpt_factory import GPTFactory
+from app.gpt.provider import client_registry, rate_limiter
 from app.models.model_config import ModelConfig
 
 
 class ProviderService:
+    # 限流配置字段，更新时允许设为 None（清除限制，改用 LLM_DEFAULT_* 默认值）
+    LIMIT_FIELDS = ("rpm_limit", "tpm_limit", "max_concurrency")
 
     @staticmethod
     def serialize_provider(row: Provider) -> dict:
@@ -29,6 +33,9 @@ class ProviderService:
             "enabled": row.get("enabled"),
             "base_url": row.get("base_url"),
             "api_key": row.get("api_key"),
+            "rpm_limit": row.get("rpm_limit"),
+            "tpm_limit": row.get("tpm_limit"),
+            "max_concurrency": row.get("max_concurrency"),
             "created_at": jsonable_encoder(row.get("created_at")),
             # "name": row[1],
             # "logo": row[2],
@@ -52,6 +59,9 @@ class ProviderService:
             "enabled": row.get("enabled"),
             "base_url": row.get("base_url"),
             "api_key":  ProviderService.mask_key(row.get("api_key")),
+            "rpm_limit": row.get("rpm_limit"),
+            "tpm_limit": row.get("tpm_limit"),
+            "max_concurrency": row.get("max_concurrency"),
             "created_at": jsonable_encoder(row.get("created_at")),
 
             # "id": row[0],
@@ -69,11 +79,13 @@ class ProviderService:
             return '*' * len(key)
         return key[:4] + '*' * (len(key) - 8) + key[-4:]
     @staticmethod
-    def add_provider( name: str, api_key: str, base_url: str, logo: str, type_: str, enabled: int = 1):
+    def add_provider( name: str, api_key: str, base_url: str, logo: str, type_: str, enabled: int = 1,
+                      rpm_limit: int = None, tpm_limit: int = None, max_concurrency: int = None):
         try:
             id = uuid().lower()
             logo='custom'
-            return insert_provider(id, name, api_key, base_url, logo, type_, enabled)
+            return insert_provider(id, name, api_key, base_url, logo, type_, enabled,
+                                   rpm_limit=rpm_limit, tpm_limit=tpm_limit, max_concurrency=max_concurrency)
         except Exception as  e:
             print('创建模式失败',e)
     @staticmethod
@@ -86,6 +98,9 @@ class ProviderService:
             "api_key": p.api_key,
             "base_url": p.base_url,
             "enabled": p.enabled,
+            "rpm_limit": p.rpm_limit,
+            "tpm_limit": p.tpm_limit,
+            "max_concurrency": p.max_concurrency,
             "created_at": p.created_at,
         }
     @staticmethod
@@ -119,10 +134,17 @@ class ProviderService:
     @staticmethod
     def update_provider(id: str, data: dict)->str | None:
         try:
-        # 过滤掉空值
-            filtered_data = {k: v for k, v in data.items() if v is not None and k != 'id'}
+        # 过滤掉空值（限流字段为 None 时表示清除限制，保留）
+            filtered_data = {k: v for k, v in data.items()
+                             if k != 'id' and (v is not None or k in ProviderService.LIMIT_FIELDS)}
             print('更新模型供应商',filtered_data)
             update_provider(id, **filtered_data)
+            # 配置变化后旧的客户端连接池与限流器不再可用
+            client_registry.invalidate(id)
+            rate_limiter.invalidate(id)
+            if 'api_key' in filtered_data or 'base_url' in filtered_data:
+                # 换了地址或密钥后，缓存的模型列表可能已不再对应
+                delete_catalog(id)
             return id
 
         except Exception as e:
@@ -131,4 +153,7 @@ class ProviderService:
 
     @staticmethod
     def delete_provider(id: str):
+        client_registry.invalidate(id)
+        rate_limiter.invalidate(id)
+        delete_catalog(id)
         return delete_provider(id)
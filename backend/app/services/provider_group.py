@@ -0,0 +1,91 @@
+from fastapi.encoders import jsonable_encoder
+from kombu import uuid
+
+from app.db.provider_group_dao import (
+    insert_group,
+    get_group_by_id,
+    get_all_groups,
+    update_group,
+    delete_group,
+)
+from app.gpt.base import GPT
+from app.gpt.gpt_factory import GPTFactory
+from app.gpt.provider.balancer import STRATEGY_LATENCY_EWMA, STRATEGY_LEAST_OUTSTANDING, get_stats
+from app.models.model_config import ModelConfig
+from app.services.provider import ProviderService
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+STRATEGIES = (STRATEGY_LEAST_OUTSTANDING, STRATEGY_LATENCY_EWMA)
+
+
+class ProviderGroupService:
+
+    @staticmethod
+    def serialize_group(group: dict) -> dict | None:
+        if not group:
+            return None
+        return {
+            **group,
+            "created_at": jsonable_encoder(group.get("created_at")),
+            "members": [
+                {**member, "stats": get_stats(member["provider_id"]).to_dict()}
+                for member in group["members"]
+            ],
+        }
+
+    @staticmethod
+    def _check(strategy: str | None, members: list | None):
+        if strategy is not None and strategy not in STRATEGIES:
+            raise ValueError(f"不支持的路由策略: {strategy}")
+        for member in members or []:
+            if not ProviderService.get_provider_by_id(member["provider_id"]):
+                raise ValueError(f"供应商不存在: {member['provider_id']}")
+
+    @staticmethod
+    def add_group(name: str, members: list, strategy: str = STRATEGY_LEAST_OUTSTANDING) -> str | None:
+        ProviderGroupService._check(strategy, members)
+        return insert_group(uuid().lower(), name, strategy, members)
+
+    @staticmethod
+    def get_all_groups() -> list:
+        return [ProviderGroupService.serialize_group(group) for group in get_all_groups()]
+
+    @staticmethod
+    def get_group_by_id(id: str) -> dict | None:
+        return ProviderGroupService.serialize_group(get_group_by_id(id))
+
+    @staticmethod
+    def update_group(id: str, data: dict) -> str | None:
+        filtered_data = {k: v for k, v in data.items() if v is not None and k != 'id'}
+        ProviderGroupService._check(filtered_data.get("strategy"), filtered_data.get("members"))
+        return update_group(id, **filtered_data)
+
+    @staticmethod
+    def delete_group(id: str):
+        return delete_group(id)
+
+    @staticmethod
+    def build_gpt(group: dict) -> GPT:
+        """
+        为供应商组构建路由 GPT，跳过已删除或停用的成员供应商
+        """
+        configs = []
+        for member in group["members"]:
+            provider = ProviderService.get_provider_by_id(member["provider_id"])
+            if not provider or not provider.get("enabled"):
+                logger.warning(f"供应商组 {group['id']} 的成员 {member['provider_id']} 不存在或已停用，跳过")
+                continue
+            configs.append(ModelConfig(
+                api_key=provider["api_key"],
+                base_url=provider["base_url"],
+                model_name=member["model_name"],
+                provider=provider["type"],
+                name=provider["name"],
+                provider_id=provider["id"],
+                rpm_limit=provider.get("rpm_limit"),
+                tpm_limit=provider.get("tpm_limit"),
+                max_concurrency=provider.get("max_concurrency"),
+            ))
+        return GPTFactory.from_group(group, configs)
@@ -6,8 +6,9 @@ from typing import Optional, List, Dict, Union
 import requests
 
 from app.decorators.timeit import timeit
-from app.models.transcriber_model import TranscriptSegment, TranscriptResult
+from app.models.transcriber_model import SegmentStore, TranscriptResult
 from app.transcriber.base import Transcriber
+from app.utils.audio_helper import ensure_mp3
 from app.utils.logger import get_logger
 from events import transcription_finished
 
@@ -172,9 +173,9 @@ class BcutTranscriber(Transcriber):
         try:
             logger.info(f"开始处理文件: {file_path}")
             
-            # 上传文件
+            # 上传文件（接口声明为 mp3，非 mp3 的音频在此按需转码）
             logger.info("正在上传文件...")
-            self._upload(file_path)
+            self._upload(ensure_mp3(file_path))
             
             # 创建任务
             logger.info("提交转录任务...")
@@ -210,8 +211,7 @@ class BcutTranscriber(Transcriber):
             result_json = json.loads(task_resp["result"])
             
             # 提取分段数据
-            segments = []
-            full_text = ""
+            segments = SegmentStore()
             
             for u in result_json.get("utterances", []):
                 text = u.get("transcript", "").strip()
@@ -219,17 +219,12 @@ class BcutTranscriber(Transcriber):
                 start_time = float(u.get("start_time", 0)) / 1000.0
                 end_time = float(u.get("end_time", 0)) / 1000.0
                 
-                full_text += text + " "
-                segments.append(TranscriptSegment(
-                    start=start_time,
-                    end=end_time,
-                    text=text
-                ))
+                segments.append(start_time, end_time, text)
             
             # 创建结果对象
             result = TranscriptResult(
                 language=result_json.get("language", "zh"),
-                full_text=full_text.strip(),
+                full_text=segments.joined_text(),
                 segments=segments,
                 raw=result_json
             )
@@ -2,7 +2,7 @@ from abc import ABC
 import os
 
 from app.decorators.timeit import timeit
-from app.models.transcriber_model import TranscriptResult, TranscriptSegment
+from app.models.transcriber_model import SegmentStore, TranscriptResult
 from app.services.provider import ProviderService
 from app.transcriber.base import Transcriber
 from openai import OpenAI
@@ -47,21 +47,15 @@ class GroqTranscriber(Transcriber, ABC):
             )
             print(transcription.text)
         print(transcription)
-        segments = []
-        full_text = ""
+        segments = SegmentStore()
 
         for seg in transcription.segments:
             text = seg.text.strip()
-            full_text += text + " "
-            segments.append(TranscriptSegment(
-                start=seg.start,
-                end=seg.end,
-                text=text
-            ))
+            segments.append(seg.start, seg.end, text)
 
         result = TranscriptResult(
             language=transcription.language,
-            full_text=full_text.strip(),
+            full_text=segments.joined_text(),
             segments=segments,
             raw=transcription.to_dict()
         )
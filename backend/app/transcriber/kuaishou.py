@@ -4,8 +4,9 @@ import os
 from typing import Union, List, Dict, Optional
 
 from app.decorators.timeit import timeit
-from app.models.transcriber_model import TranscriptSegment, TranscriptResult
+from app.models.transcriber_model import SegmentStore, TranscriptResult
 from app.transcriber.base import Transcriber
+from app.utils.audio_helper import ensure_mp3
 from app.utils.logger import get_logger
 from events import transcription_finished
 
@@ -27,6 +28,8 @@ class KuaishouTranscriber(Transcriber):
     def _submit(self, file_path: str) -> dict:
         """提交识别请求"""
         try:
+            # 接口按 audio/mpeg 上传，非 mp3 的音频在此按需转码
+            file_path = ensure_mp3(file_path)
             file_binary = self._load_file(file_path)
             
             payload = {
@@ -73,8 +76,7 @@ class KuaishouTranscriber(Transcriber):
             logger.info("请求成功，处理结果...")
             
             # 提取分段数据
-            segments = []
-            full_text = ""
+            segments = SegmentStore()
             
             # 解析快手API返回的文本段
             texts = result_data.get('data', {}).get('text', [])
@@ -83,17 +85,12 @@ class KuaishouTranscriber(Transcriber):
                 start_time = float(u.get('start_time', 0))
                 end_time = float(u.get('end_time', 0))
                 
-                full_text += text + " "
-                segments.append(TranscriptSegment(
-                    start=start_time,
-                    end=end_time,
-                    text=text
-                ))
+                segments.append(start_time, end_time, text)
             
             # 创建结果对象
             result = TranscriptResult(
                 language="zh",  # 快手API可能不返回语言信息，默认为中文
-                full_text=full_text.strip(),
+                full_text=segments.joined_text(),
                 segments=segments,
                 raw=result_data
             )
@@ -5,7 +5,7 @@ import platform
 from huggingface_hub import snapshot_download
 
 from app.decorators.timeit import timeit
-from app.models.transcriber_model import TranscriptSegment, TranscriptResult
+from app.models.transcriber_model import SegmentStore, TranscriptResult
 from app.transcriber.base import Transcriber
 from app.utils.logger import get_logger
 from app.utils.path_helper import get_model_dir
@@ -55,21 +55,15 @@ class MLXWhisperTranscriber(Transcriber):
             )
             
             # 转换为标准格式
-            segments = []
-            full_text = ""
+            segments = SegmentStore()
             
             for segment in result["segments"]:
                 text = segment["text"].strip()
-                full_text += text + " "
-                segments.append(TranscriptSegment(
-                    start=segment["start"],
-                    end=segment["end"],
-                    text=text
-                ))
+                segments.append(segment["start"], segment["end"], text)
             
             transcript_result = TranscriptResult(
                 language=result.get("language", "unknown"),
-                full_text=full_text.strip(),
+                full_text=segments.joined_text(),
                 segments=segments,
                 raw=result
             )
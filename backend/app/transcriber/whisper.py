@@ -1,7 +1,7 @@
 from faster_whisper import WhisperModel
 
 from app.decorators.timeit import timeit
-from app.models.transcriber_model import TranscriptSegment, TranscriptResult
+from app.models.transcriber_model import SegmentStore, TranscriptResult
 from app.transcriber.base import Transcriber
 from app.utils.env_checker import is_cuda_available, is_torch_installed
 from app.utils.logger import get_logger
@@ -19,6 +19,9 @@ from modelscope import snapshot_download
 '''
 logger=get_logger(__name__)
 
+# 开启词级时间戳，用于把笔记中的时间标记对齐到句子 / 分段边界
+WORD_TIMESTAMPS = os.getenv("WHISPER_WORD_TIMESTAMPS", "true").lower() == "true"
+
 MODEL_MAP={
     "tiny": "pengzhendong/faster-whisper-tiny",
     'base':'pengzhendong/faster-whisper-base',
@@ -94,25 +97,23 @@ class WhisperTranscriber(Transcriber):
     def transcript(self, file_path: str) -> TranscriptResult:
         try:
 
-            segments_raw, info = self.model.transcribe(file_path)
+            segments_raw, info = self.model.transcribe(file_path, word_timestamps=WORD_TIMESTAMPS)
 
-            segments = []
-            full_text = ""
+            segments = SegmentStore()
+            words = SegmentStore() if WORD_TIMESTAMPS else None
 
             for seg in segments_raw:
                 text = seg.text.strip()
-                full_text += text + " "
-                segments.append(TranscriptSegment(
-                    start=seg.start,
-                    end=seg.end,
-                    text=text
-                ))
+                segments.append(seg.start, seg.end, text)
+                for word in seg.words or []:
+                    words.append(word.start, word.end, word.word)
 
             result= TranscriptResult(
                 language=info.language,
-                full_text=full_text.strip(),
+                full_text=segments.joined_text(),
                 segments=segments,
-                raw=info
+                raw=info,
+                words=words
             )
             # self.on_finish(file_path, result)
             return result
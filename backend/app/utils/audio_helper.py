@@ -0,0 +1,107 @@
+import os
+from typing import Optional, Tuple
+
+import av
+import ffmpeg
+
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 音频编码 → 流复制时使用的容器扩展名，未列出的编码放进 mka（Matroska 可容纳任意编码）
+_CODEC_EXTENSIONS = {
+    "aac": "m4a",
+    "alac": "m4a",
+    "mp3": "mp3",
+    "opus": "opus",
+    "vorbis": "ogg",
+    "flac": "flac",
+    "pcm_s16le": "wav",
+}
+
+
+def probe_audio_codec(path: str) -> Optional[str]:
+    """读取文件中第一条音频流的编码名，如 aac / opus / mp3；没有音频流或无法读取时返回 None"""
+    try:
+        with av.open(path) as container:
+            if not container.streams.audio:
+                return None
+            return _codec_name(container.streams.audio[0])
+    except Exception as e:
+        logger.warning(f"读取音频编码失败 ({path})：{e}")
+        return None
+
+
+def extract_audio_stream(input_path: str, output_dir: Optional[str] = None) -> Tuple[str, Optional[str]]:
+    """
+    从视频文件中取出音频流，只做流复制（解复用后原样写入新容器），不重新编码。
+    输入本身就是纯音频文件时直接返回。
+
+    :param input_path: 视频或音频文件路径
+    :param output_dir: 输出目录，默认与输入文件同目录
+    :return: (音频文件路径, 音频编码)
+    """
+    with av.open(input_path) as source:
+        if not source.streams.audio:
+            raise ValueError(f"文件中没有音频流: {input_path}")
+        audio = source.streams.audio[0]
+        codec = _codec_name(audio)
+        if not source.streams.video:
+            return input_path, codec
+
+        base = os.path.splitext(os.path.basename(input_path))[0]
+        output_path = os.path.join(output_dir or os.path.dirname(input_path),
+                                   f"{base}.{_CODEC_EXTENSIONS.get(codec, 'mka')}")
+        if os.path.exists(output_path) and os.path.getmtime(output_path) >= os.path.getmtime(input_path):
+            return output_path, codec
+
+        temp_path = f"{output_path}.part"
+        try:
+            with av.open(temp_path, "w", format=_muxer_for(output_path)) as target:
+                stream = target.add_stream_from_template(audio)
+                for packet in source.demux(audio):
+                    # 末尾的 flush 包没有时间戳，不能写入
+                    if packet.dts is None:
+                        continue
+                    packet.stream = stream
+                    target.mux(packet)
+            os.replace(temp_path, output_path)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+    logger.info(f"已提取音频流（{codec}，未转码）：{output_path}")
+    return output_path, codec
+
+
+def _codec_name(stream) -> str:
+    # codec_context.name 是解码器名（mp3 轨道为 mp3float），取编码的规范名
+    return stream.codec_context.codec.canonical_name
+
+
+def _muxer_for(path: str) -> str:
+    # 临时文件以 .part 结尾，PyAV 无法从文件名推断容器，必须显式指定
+    ext = os.path.splitext(path)[1].lstrip(".")
+    return {"m4a": "ipod", "opus": "ogg", "ogg": "ogg", "mka": "matroska",
+            "mp3": "mp3", "flac": "flac", "wav": "wav"}[ext]
+
+
+def ensure_mp3(path: str, bitrate: str = "64k") -> str:
+    """
+    供只接受 mp3 的下游（必剪、快手 ASR 等）使用：已是 mp3 时原样返回，否则转码一份并缓存在旁边
+
+    :param path: 音频文件路径
+    :param bitrate: 转码码率，语音识别 64k 足够
+    :return: mp3 文件路径
+    """
+    if path.lower().endswith(".mp3") or probe_audio_codec(path) == "mp3":
+        return path
+    output_path = f"{os.path.splitext(path)[0]}.mp3"
+    if os.path.exists(output_path) and os.path.getmtime(output_path) >= os.path.getmtime(path):
+        return output_path
+    logger.info(f"下游需要 mp3，开始转码：{path}")
+    temp_path = f"{output_path}.part.mp3"
+    ffmpeg.input(path).output(temp_path, vn=None, acodec="libmp3lame", audio_bitrate=bitrate) \
+        .run(quiet=True, overwrite_output=True)
+    os.replace(temp_path, output_path)
+    return output_path
@@ -0,0 +1,84 @@
+import hashlib
+import os
+from typing import Iterable, Iterator, Optional, Tuple
+
+import av
+import numpy as np
+
+# 距离下一个目标时间超过该秒数时直接 seek 到附近的关键帧，而不是逐帧解码过去
+SEEK_GAP = 15
+
+
+def video_fingerprint(video_path: str) -> str:
+    """视频文件指纹（路径 + 大小 + 修改时间），用作网格图、截图缓存的键"""
+    stat = os.stat(video_path)
+    parts = (os.path.abspath(video_path), stat.st_size, int(stat.st_mtime))
+    return hashlib.sha256(repr(parts).encode("utf-8")).hexdigest()
+
+
+def probe_duration(video_path: str) -> Optional[float]:
+    """读取视频时长（秒），无法获取时返回 None"""
+    with av.open(video_path) as container:
+        if container.duration:
+            return container.duration / av.time_base
+        stream = container.streams.video[0]
+        if stream.duration:
+            return float(stream.duration * stream.time_base)
+    return None
+
+
+def iter_frames_at(
+    video_path: str,
+    timestamps: Iterable[float],
+    width: Optional[int] = None,
+    height: Optional[int] = None,
+) -> Iterator[Tuple[float, np.ndarray]]:
+    """
+    一次解码取出多个时间点的帧：顺序解码，目标时间相距较远时 seek 到关键帧跳过中间部分。
+    同一帧覆盖多个目标时间时（时间重复、低帧率或静止片段）重复返回该帧。
+
+    :param video_path: 视频路径
+    :param timestamps: 升序的目标时间（秒，相对视频开头）
+    :param width: 解码时缩放到的宽度，不传时保持原尺寸
+    :param height: 解码时缩放到的高度
+    :return: (目标时间, RGB uint8 数组)，视频提前结束时剩余目标不返回
+    """
+    targets = iter(timestamps)
+    next_ts = next(targets, None)
+    if next_ts is None:
+        return
+
+    with av.open(video_path) as container:
+        stream = container.streams.video[0]
+        stream.thread_type = "AUTO"
+        time_base = float(stream.time_base)
+        start = stream.start_time * time_base if stream.start_time is not None else 0.0
+        # 帧时间落在目标前半帧以内也算命中，避免因时间戳取整漏帧
+        rate = stream.average_rate or stream.guessed_rate
+        tolerance = 0.5 / float(rate) if rate else 0.0
+
+        sought = None
+        while next_ts is not None:
+            seek_target = None
+            for frame in container.decode(stream):
+                if frame.time is None:
+                    continue
+                t = frame.time - start
+                if t + tolerance < next_ts:
+                    if next_ts - t > SEEK_GAP and sought != next_ts:
+                        seek_target = next_ts
+                        break
+                    continue
+                if width and height:
+                    image = frame.to_ndarray(width=width, height=height, format="rgb24", interpolation="AREA")
+                else:
+                    image = frame.to_ndarray(format="rgb24")
+                while next_ts is not None and t + tolerance >= next_ts:
+                    yield next_ts, image
+                    next_ts = next(targets, None)
+                if next_ts is None:
+                    return
+            if seek_target is None:
+                return
+            sought = seek_target
+            container.seek(int((seek_target + start) / time_base), stream=stream, backward=True)
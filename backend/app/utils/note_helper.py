@@ -4,10 +4,18 @@ import re
 import re
 
 import re
-
-def replace_content_markers(markdown: str, video_id: str, platform: str = 'bilibili') -> str:
+from typing import Callable, Optional
+
+def replace_content_markers(
+    markdown: str,
+    video_id: str,
+    platform: str = 'bilibili',
+    snap: Optional[Callable[[float], float]] = None,
+) -> str:
     """
     替换 *Content-04:16*、Content-04:16 或 Content-[04:16] 为超链接，跳转到对应平台视频的时间位置
+
+    :param snap: 可选的时间吸附函数（如 TimestampIndex.snap），把时间对齐到句子 / 分段开头
     """
     # 匹配三种形式：*Content-04:16*、Content-04:16、Content-[04:16]
     pattern = r"(?:\*?)Content-(?:\[(\d{2}):(\d{2})\]|(\d{2}):(\d{2}))"
@@ -16,6 +24,9 @@ def replace_content_markers(markdown: str, video_id: str, platform: str = 'bilib
         mm = match.group(1) or match.group(3)
         ss = match.group(2) or match.group(4)
         total_seconds = int(mm) * 60 + int(ss)
+        if snap:
+            total_seconds = int(snap(total_seconds))
+            mm, ss = f"{total_seconds // 60:02d}", f"{total_seconds % 60:02d}"
 
         if platform == 'bilibili':
             url = f"https://www.bilibili.com/video/{video_id}?t={total_seconds}"
@@ -0,0 +1,190 @@
+import json
+import os
+import re
+from typing import List, Optional, Tuple
+
+import yt_dlp
+from dotenv import load_dotenv
+
+from app.models.transcriber_model import SegmentStore, TranscriptResult, TranscriptSegment
+from app.utils.logger import get_logger
+
+load_dotenv()
+logger = get_logger(__name__)
+
+# 按优先级排列的字幕语言（B 站 AI 字幕为 ai-zh）
+SUBTITLE_LANGS = [
+    lang.strip() for lang in os.getenv("SUBTITLE_LANGS", "zh-Hans,zh-CN,zh,ai-zh,zh-Hant,en,en-US").split(",")
+    if lang.strip()
+]
+# 字幕覆盖时长占视频时长的最低比例，低于该值视为不可用
+SUBTITLE_MIN_COVERAGE = float(os.getenv("SUBTITLE_MIN_COVERAGE", "0.5"))
+
+# 字幕格式优先级：json3(YouTube) / json(B站) 时间轴最精确，其次 vtt / srt
+SUBTITLE_EXT_PRIORITY = ["json3", "json", "vtt", "srt"]
+
+_CUE_TIME_PATTERN = re.compile(
+    r"((?:\d+:)?\d{1,2}:\d{2}[.,]\d{3})\s*-->\s*((?:\d+:)?\d{1,2}:\d{2}[.,]\d{3})"
+)
+_TAG_PATTERN = re.compile(r"<[^>]+>")
+
+
+def _pick_format(tracks: Optional[list]) -> Optional[dict]:
+    if not tracks:
+        return None
+    for ext in SUBTITLE_EXT_PRIORITY:
+        for track in tracks:
+            if track.get("ext") == ext and (track.get("url") or track.get("data")):
+                return track
+    return None
+
+
+def select_subtitle_track(info: dict, langs: List[str]) -> Optional[Tuple[str, dict, bool]]:
+    """
+    从 yt-dlp 元信息中选择可用字幕轨道
+
+    :param info: yt-dlp extract_info 返回的字典
+    :param langs: 按优先级排列的语言列表
+    :return: (语言, 字幕格式条目, 是否为自动字幕)，无可用字幕时返回 None
+    """
+    manual = info.get("subtitles") or {}
+    for lang in langs:
+        track = _pick_format(manual.get(lang))
+        if track:
+            return lang, track, False
+
+    # 自动字幕只接受视频原语言轨道，机器翻译的轨道质量不如直接转写
+    automatic = info.get("automatic_captions") or {}
+    original = info.get("language")
+    candidates = [f"{original}-orig", original] if original else []
+    candidates += [lang for lang in automatic if lang.endswith("-orig")]
+    for lang in candidates:
+        track = _pick_format(automatic.get(lang))
+        if track:
+            return lang, track, True
+    return None
+
+
+def _parse_timestamp(value: str) -> float:
+    parts = value.replace(",", ".").split(":")
+    seconds = 0.0
+    for part in parts:
+        seconds = seconds * 60 + float(part)
+    return seconds
+
+
+def _parse_json3(content: str) -> List[TranscriptSegment]:
+    segments = []
+    for event in json.loads(content).get("events", []):
+        if "segs" not in event:
+            continue
+        text = "".join(seg.get("utf8", "") for seg in event["segs"]).strip()
+        if not text:
+            continue
+        start = event.get("tStartMs", 0) / 1000.0
+        end = start + event.get("dDurationMs", 0) / 1000.0
+        segments.append(TranscriptSegment(start=start, end=end, text=text))
+    return segments
+
+
+def _parse_bilibili_json(content: str) -> List[TranscriptSegment]:
+    return [
+        TranscriptSegment(start=float(item["from"]), end=float(item["to"]), text=item["content"].strip())
+        for item in json.loads(content).get("body", [])
+        if item.get("content", "").strip()
+    ]
+
+
+def _parse_cues(content: str) -> List[TranscriptSegment]:
+    """解析 vtt / srt 字幕，去掉自动字幕中滚动重复的行"""
+    segments: List[TranscriptSegment] = []
+    lines = content.splitlines()
+    i = 0
+    while i < len(lines):
+        match = _CUE_TIME_PATTERN.search(lines[i])
+        i += 1
+        if not match:
+            continue
+        text_lines = []
+        while i < len(lines) and lines[i].strip():
+            line = _TAG_PATTERN.sub("", lines[i]).strip()
+            if line and (not segments or line != segments[-1].text):
+                text_lines.append(line)
+            i += 1
+        text = " ".join(text_lines).strip()
+        if text:
+            segments.append(TranscriptSegment(
+                start=_parse_timestamp(match.group(1)),
+                end=_parse_timestamp(match.group(2)),
+                text=text,
+            ))
+    return segments
+
+
+def parse_subtitle(content: str, ext: str) -> List[TranscriptSegment]:
+    """
+    将字幕文本解析为 TranscriptSegment 列表
+
+    :param content: 字幕文件内容
+    :param ext: 字幕格式（json3 / json / vtt / srt）
+    """
+    if ext == "json3":
+        return _parse_json3(content)
+    if ext == "json":
+        return _parse_bilibili_json(content)
+    if ext in ("vtt", "srt"):
+        return _parse_cues(content)
+    return []
+
+
+def fetch_subtitle_transcript(
+    video_url: str,
+    langs: Optional[List[str]] = None,
+    ydl_opts: Optional[dict] = None,
+) -> Tuple[dict, Optional[TranscriptResult]]:
+    """
+    只抓取元信息（不下载媒体），若存在可用字幕则直接解析为 TranscriptResult
+
+    :param video_url: 视频链接
+    :param langs: 字幕语言优先级，默认读取 SUBTITLE_LANGS
+    :param ydl_opts: 额外的 yt-dlp 参数
+    :return: (yt-dlp 元信息, 转写结果或 None)
+    """
+    langs = langs or SUBTITLE_LANGS
+    opts = {
+        'skip_download': True,
+        'noplaylist': True,
+        'quiet': True,
+        **(ydl_opts or {}),
+    }
+    with yt_dlp.YoutubeDL(opts) as ydl:
+        info = ydl.extract_info(video_url, download=False)
+        selected = select_subtitle_track(info, langs)
+        if not selected:
+            logger.info(f"未找到可用字幕，回退到音频转写: {video_url}")
+            return info, None
+
+        lang, track, automatic = selected
+        content = track.get("data")
+        if content is None:
+            content = ydl.urlopen(track["url"]).read().decode("utf-8", errors="ignore")
+
+    segments = SegmentStore.from_segments(parse_subtitle(content, track["ext"]))
+    if not segments:
+        logger.info(f"字幕轨道为空 (lang={lang})，回退到音频转写")
+        return info, None
+
+    duration = info.get("duration") or 0
+    covered = segments.ends[-1]
+    if duration and covered < duration * SUBTITLE_MIN_COVERAGE:
+        logger.info(f"字幕仅覆盖 {covered:.0f}/{duration:.0f} 秒，回退到音频转写")
+        return info, None
+
+    logger.info(f"使用平台字幕 (lang={lang}, ext={track['ext']}, automatic={automatic})，共 {len(segments)} 段")
+    transcript = TranscriptResult(
+        language=lang.split("-")[0] if lang != "ai-zh" else "zh",
+        full_text=segments.joined_text(),
+        segments=segments,
+        raw={"source": "subtitle", "lang": lang, "ext": track["ext"], "automatic": automatic},
+    )
+    return info, transcript
@@ -0,0 +1,59 @@
+import os
+import re
+from array import array
+from bisect import bisect_left
+from typing import Optional
+
+from app.models.transcriber_model import TranscriptResult
+
+# 只在该窗口（秒）内寻找边界，超出则保留 LLM 给出的原始时间
+SNAP_WINDOW = float(os.getenv("TIMESTAMP_SNAP_WINDOW", "8"))
+# 截图在边界之后稍作偏移，避开切换/转场帧
+SCREENSHOT_OFFSET = float(os.getenv("SCREENSHOT_SNAP_OFFSET", "0.5"))
+
+_SENTENCE_END = re.compile(r"[。！？!?.…；;]\s*$")
+
+
+class TimestampIndex:
+    """
+    转写结果的时间边界索引：分段开始时间 + 词级时间戳中的句首时间。
+    用于把 LLM 写出的 mm:ss 标记吸附到最近的句子 / 分段边界。
+    """
+
+    def __init__(self, transcript: TranscriptResult, window: float = SNAP_WINDOW):
+        self.window = window
+        self.segments = transcript.segments
+        boundaries = set(self.segments.starts)
+
+        words = transcript.words
+        if words:
+            # 句末标点后的下一个词即为新句子的开始
+            for i in range(len(words) - 1):
+                if _SENTENCE_END.search(words.text_at(i)):
+                    boundaries.add(words.starts[i + 1])
+        self.boundaries = array("d", sorted(boundaries))
+
+    def nearest_boundary(self, seconds: float) -> Optional[float]:
+        if not self.boundaries:
+            return None
+        i = bisect_left(self.boundaries, seconds)
+        candidates = [self.boundaries[j] for j in (i - 1, i) if 0 <= j < len(self.boundaries)]
+        best = min(candidates, key=lambda b: abs(b - seconds))
+        return best if abs(best - seconds) <= self.window else None
+
+    def snap(self, seconds: float) -> float:
+        """吸附到最近的边界，用于原片跳转链接"""
+        boundary = self.nearest_boundary(seconds)
+        return seconds if boundary is None else boundary
+
+    def snap_screenshot(self, seconds: float) -> float:
+        """吸附到最近的边界后略微后移，但不超出该边界所在分段"""
+        boundary = self.nearest_boundary(seconds)
+        if boundary is None:
+            return seconds
+        shifted = boundary + SCREENSHOT_OFFSET
+        if self.segments:
+            seg_end = self.segments.ends[self.segments.index_at(boundary)]
+            if seg_end > boundary:
+                shifted = min(shifted, seg_end)
+        return shifted
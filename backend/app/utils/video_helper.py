@@ -5,40 +5,129 @@ from dotenv import load_dotenv
 import subprocess
 import os
 import uuid
+
+from PIL import Image
+
+from app.utils.frame_decoder import iter_frames_at, video_fingerprint
+from app.utils.logger import get_logger
+
+logger = get_logger(__name__)
 load_dotenv()
 api_path = os.getenv("API_BASE_URL", "http://localhost")
 BACKEND_PORT= os.getenv("BACKEND_PORT", 8483)
 
 BACKEND_BASE_URL = f"{api_path}:{BACKEND_PORT}"
 
-from typing import Optional
-def generate_screenshot(video_path: str, output_dir: str, timestamp: int, index: int) -> str:
+import hashlib
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+
+def _screenshot_path(output_dir: str, fingerprint: str, ts: float) -> str:
+    return os.path.join(output_dir, f"screenshot_{fingerprint}_{int(round(ts * 1000)):09d}.jpg")
+
+
+def _split_cached(output_dir: str, fingerprint: str, timestamps: Iterable[float]
+                  ) -> Tuple[Dict[float, str], List[float]]:
+    """时间点去重排序后分成已缓存的 {时间点: 截图路径} 与待生成的时间点"""
+    os.makedirs(output_dir, exist_ok=True)
+    results: Dict[float, str] = {}
+    pending = []
+    for ts in sorted(set(max(0.0, float(t)) for t in timestamps)):
+        path = _screenshot_path(output_dir, fingerprint, ts)
+        if os.path.exists(path):
+            results[ts] = path
+        else:
+            pending.append(ts)
+    return results, pending
+
+
+def _save_frame(frame, path: str, work_dir: Optional[str]) -> None:
+    # 先写临时文件再移入，避免对外提供写了一半的文件
+    temp_path = os.path.join(work_dir or os.path.dirname(path), f".{uuid.uuid4().hex}.jpg")
+    Image.fromarray(frame).save(temp_path, format="JPEG", quality=90)
+    shutil.move(temp_path, path)
+
+
+def _report_missing(pending: List[float], results: Dict[float, str]) -> None:
+    missing = [ts for ts in pending if ts not in results]
+    if missing:
+        logger.warning(f"{len(missing)} 个时间点截图失败：{missing}")
+
+
+def generate_screenshots(
+    video_path: str,
+    output_dir: str,
+    timestamps: Iterable[float],
+    work_dir: Optional[str] = None,
+) -> Dict[float, str]:
     """
-    使用 ffmpeg 生成截图，返回生成图片路径
+    批量生成截图：按 (视频指纹, 时间点) 缓存，已生成过的直接复用，
+    其余时间点去重排序后在一次解码中全部取出。单个时间点失败不影响其它时间点。
+
+    :param video_path: 视频路径
+    :param output_dir: 截图输出目录
+    :param timestamps: 截图时间点（秒）
+    :param work_dir: 临时目录，截图写完后再移入 output_dir，避免对外提供写了一半的文件
+    :return: {时间点: 截图路径}，失败的时间点不在其中
     """
-    output_dir = Path(output_dir)
-    output_dir.mkdir(parents=True, exist_ok=True)
+    fingerprint = video_fingerprint(video_path)[:16]
+    results, pending = _split_cached(output_dir, fingerprint, timestamps)
+    if not pending:
+        return results
 
-    filename = f"screenshot_{index:03}_{uuid.uuid4()}.jpg"
-    output_path = output_dir / filename
+    try:
+        for ts, frame in iter_frames_at(video_path, pending):
+            path = _screenshot_path(output_dir, fingerprint, ts)
+            _save_frame(frame, path, work_dir)
+            results[ts] = path
+    except Exception as e:
+        logger.error(f"截图生成中断：{e}")
+    _report_missing(pending, results)
+    return results
 
-    command = [
-        "ffmpeg",
-        "-ss", str(timestamp),
-        "-i", str(video_path),
-        "-frames:v", "1",
-        "-q:v", "2",
-        str(output_path),
-        "-y"
-    ]
 
-    print("Running command:", command)
-    result = subprocess.run(command, capture_output=True, text=True)
+def generate_clip_screenshots(
+    video_url: str,
+    fetch_clips: Callable[[List[float]], Optional[Dict[float, Tuple[str, float]]]],
+    output_dir: str,
+    timestamps: Iterable[float],
+    work_dir: Optional[str] = None,
+) -> Optional[Dict[float, str]]:
+    """
+    不下载完整视频的批量截图：缓存以视频链接为键，未缓存的时间点交给 fetch_clips
+    只下载附近的短片段，再从每个片段中取出对应偏移处的帧。
 
-    if result.returncode != 0:
-        print("ffmpeg failed:", result.stderr)
+    :param video_url: 视频链接，用作截图缓存的键
+    :param fetch_clips: 下载片段的回调，传入待截图的时间点，返回 {时间点: (片段路径, 片段内偏移)}；
+                        返回 None 表示平台不支持按片段下载
+    :param output_dir: 截图输出目录
+    :param timestamps: 截图时间点（秒）
+    :param work_dir: 临时目录
+    :return: {时间点: 截图路径}，失败的时间点不在其中；fetch_clips 返回 None 时返回 None
+    """
+    fingerprint = hashlib.sha256(f"url:{video_url}".encode("utf-8")).hexdigest()[:16]
+    results, pending = _split_cached(output_dir, fingerprint, timestamps)
+    if not pending:
+        return results
 
-    return str(output_path)
+    clips = fetch_clips(pending)
+    if clips is None:
+        return None
+    # 同一片段内的多个时间点按偏移升序一次解码
+    by_clip: Dict[str, Dict[float, float]] = {}
+    for ts, (clip_path, offset) in clips.items():
+        by_clip.setdefault(clip_path, {})[max(0.0, offset)] = ts
+    for clip_path, offsets in by_clip.items():
+        try:
+            for offset, frame in iter_frames_at(clip_path, sorted(offsets)):
+                ts = offsets[offset]
+                path = _screenshot_path(output_dir, fingerprint, ts)
+                _save_frame(frame, path, work_dir)
+                results[ts] = path
+        except Exception as e:
+            logger.error(f"片段截图失败 ({clip_path})：{e}")
+    _report_missing(pending, results)
+    return results
 
 
 
@@ -1,14 +1,129 @@
 import base64
+import errno
+import hashlib
+import io
+import multiprocessing
 import os
 import re
-import subprocess
-import ffmpeg
+import shutil
+import tempfile
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Iterator, Optional, Tuple
+
+import numpy as np
 from PIL import Image, ImageDraw, ImageFont
 
+from app.utils.frame_decoder import iter_frames_at, probe_duration, video_fingerprint
 from app.utils.logger import get_logger
-from app.utils.path_helper import get_app_dir
 
 logger = get_logger(__name__)
+
+# 网格图缓存目录（位于 static 下，URL 模式时由后端直接对外提供）及其大小上限（MB）
+VIDEO_GRID_DIR = os.getenv("VIDEO_GRID_DIR", "static/grids")
+VIDEO_GRID_CACHE_MAX_MB = int(os.getenv("VIDEO_GRID_CACHE_MAX_MB", "500"))
+# 超出单次请求图片字节上限时，依次尝试的降级质量
+_FALLBACK_QUALITIES = (65, 50)
+_MIME_TYPES = {"jpeg": "image/jpeg", "webp": "image/webp"}
+
+# 自适应采样：候选帧间隔（秒）、判定为新画面的感知哈希差异比例，以及每分钟保留帧数的下限 / 上限
+VIDEO_SCENE_SAMPLE_INTERVAL = float(os.getenv("VIDEO_SCENE_SAMPLE_INTERVAL", "1"))
+VIDEO_SCENE_THRESHOLD = float(os.getenv("VIDEO_SCENE_THRESHOLD", "0.1"))
+VIDEO_SCENE_MIN_FPM = float(os.getenv("VIDEO_SCENE_MIN_FPM", "2"))
+VIDEO_SCENE_MAX_FPM = float(os.getenv("VIDEO_SCENE_MAX_FPM", "20"))
+SAMPLING_FIXED = "fixed"
+SAMPLING_ADAPTIVE = "adaptive"
+# 网格图标注与编码的进程数，0 / 1 表示在当前线程内完成
+VIDEO_GRID_WORKERS = int(os.getenv("VIDEO_GRID_WORKERS") or min(4, os.cpu_count() or 1))
+
+_grid_pool: Optional[ProcessPoolExecutor] = None
+_grid_pool_lock = threading.Lock()
+
+
+def _get_grid_pool() -> Optional[ProcessPoolExecutor]:
+    """
+    所有任务共用的进程池，首次使用时创建。
+    创建时进程内已有多个线程（uvicorn、任务线程），fork 出的子进程可能继承被其它线程持有的锁
+    （logging、数据库连接池等）而死锁，因此使用 spawn 启动子进程
+    """
+    global _grid_pool
+    if VIDEO_GRID_WORKERS <= 1:
+        return None
+    with _grid_pool_lock:
+        if _grid_pool is None:
+            _grid_pool = ProcessPoolExecutor(max_workers=VIDEO_GRID_WORKERS,
+                                             mp_context=multiprocessing.get_context("spawn"))
+        return _grid_pool
+
+
+def _reset_grid_pool() -> None:
+    global _grid_pool
+    with _grid_pool_lock:
+        if _grid_pool is not None:
+            _grid_pool.shutdown(wait=False, cancel_futures=True)
+        _grid_pool = None
+
+
+def shutdown_grid_pool() -> None:
+    """应用退出时关闭进程池"""
+    _reset_grid_pool()
+
+
+def format_time(seconds: float) -> str:
+    mm = int(seconds // 60)
+    ss = int(seconds % 60)
+    return f"{mm:02d}:{ss:02d}"
+
+
+def encode_image(img: Image.Image, image_format: str, quality: int) -> bytes:
+    buffer = io.BytesIO()
+    if image_format == "webp":
+        img.save(buffer, format="WEBP", quality=quality, method=4)
+    else:
+        img.save(buffer, format="JPEG", quality=quality, optimize=True)
+    return buffer.getvalue()
+
+
+def render_grid(
+    canvas: np.ndarray,
+    times: list[int],
+    cols: int,
+    unit_width: int,
+    unit_height: int,
+    font_path: str,
+    image_format: str,
+    quality: int,
+) -> bytes:
+    """
+    在拼好的网格画布上标注各单元格的时间点并编码。只依赖参数，可在进程池中执行。
+    字号随单元格高度缩放。
+    """
+    img = Image.fromarray(canvas)
+    size = max(16, unit_height // 11)
+    font = ImageFont.truetype(font_path, size) if os.path.exists(font_path) else ImageFont.load_default()
+    draw = ImageDraw.Draw(img)
+    for i, ts in enumerate(times):
+        x = (i % cols) * unit_width + 10
+        y = (i // cols) * unit_height + 10
+        draw.text((x, y), format_time(ts), fill="yellow", font=font, stroke_width=1, stroke_fill="black")
+    return encode_image(img, image_format, quality)
+
+
+def frame_hash(frame: np.ndarray, size: int = 16) -> np.ndarray:
+    """
+    差值哈希（dHash）：灰度图按块平均缩到 size × (size + 1)，比较水平相邻像素的明暗，
+    得到 size² 位的布尔数组。对缩放、压缩噪声和整体亮度变化不敏感。
+    """
+    gray = frame.mean(axis=2) if frame.ndim == 3 else frame.astype(np.float32)
+    size = max(1, min(size, gray.shape[0], gray.shape[1] - 1))
+    rows, cols = size, size + 1
+    h, w = gray.shape[0] // rows * rows, gray.shape[1] // cols * cols
+    small = gray[:h, :w].reshape(rows, h // rows, cols, w // cols).mean(axis=(1, 3))
+    return small[:, 1:] > small[:, :-1]
+
+
 class VideoReader:
     def __init__(self,
                  video_path: str,
@@ -18,125 +133,315 @@ class VideoReader:
                  unit_height=540,
                  save_quality=90,
                  font_path="fonts/arial.ttf",
-                 frame_dir=None,
-                 grid_dir=None):
+                 grid_dir=None,
+                 work_dir: Optional[str] = None,
+                 sampling: str = SAMPLING_FIXED,
+                 min_frames_per_minute: float = VIDEO_SCENE_MIN_FPM,
+                 max_frames_per_minute: float = VIDEO_SCENE_MAX_FPM,
+                 image_format: str = "jpeg",
+                 max_total_bytes: int = 0,
+                 image_base_url: Optional[str] = None):
+        """
+        :param work_dir: 任务工作目录，网格图先在其中生成再发布到缓存目录；不传时在缓存目录内生成
+        :param sampling: fixed 按 frame_interval 等间隔取帧；adaptive 只保留画面有明显变化的帧
+        :param min_frames_per_minute: adaptive 模式下画面长时间不变时，每分钟至少保留的帧数
+        :param max_frames_per_minute: adaptive 模式下画面频繁切换时，每分钟最多保留的帧数
+        :param image_format: 网格图编码格式 jpeg / webp
+        :param max_total_bytes: 单次请求所有图片的总字节上限（base64 模式按编码后长度计），0 表示不限制
+        :param image_base_url: 设置后返回 {image_base_url}/{缓存目录}/{文件名} 形式的 URL，而不是 base64
+        """
         self.video_path = video_path
         self.grid_size = grid_size
         self.frame_interval = frame_interval
+        self.sampling = sampling if sampling in (SAMPLING_FIXED, SAMPLING_ADAPTIVE) else SAMPLING_FIXED
+        self.min_frames_per_minute = min_frames_per_minute
+        self.max_frames_per_minute = max_frames_per_minute
         self.unit_width = unit_width
         self.unit_height = unit_height
         self.save_quality = save_quality
-        self.frame_dir = frame_dir or get_app_dir("output_frames")
-        self.grid_dir = grid_dir or get_app_dir("grid_output")
-        print(f"视频路径：{video_path}",self.frame_dir,self.grid_dir)
+        self.image_format = image_format if image_format in _MIME_TYPES else "jpeg"
+        self.max_total_bytes = max_total_bytes
+        self.image_base_url = image_base_url.rstrip("/") if image_base_url else None
+        self.grid_dir = grid_dir or VIDEO_GRID_DIR
+        self.work_dir = work_dir
+        logger.info(f"视频路径：{video_path}，网格图目录：{self.grid_dir}")
         self.font_path = font_path
+        # 本次生成的网格图编码结果，base64 模式直接使用，不再从磁盘读回
+        self._encoded: dict[str, bytes] = {}
 
     def format_time(self, seconds: float) -> str:
-        mm = int(seconds // 60)
-        ss = int(seconds % 60)
-        return f"{mm:02d}_{ss:02d}"
-
-    def extract_time_from_filename(self, filename: str) -> float:
-        match = re.search(r"frame_(\d{2})_(\d{2})\.jpg", filename)
-        if match:
-            mm, ss = map(int, match.groups())
-            return mm * 60 + ss
-        return float('inf')
+        return format_time(seconds)
 
-    def extract_frames(self, max_frames=1000) -> list[str]:
+    def iter_frames(self, max_frames=1000) -> Iterator[Tuple[int, np.ndarray]]:
+        """
+        单次解码取帧：顺序解码视频，在 0、interval、2×interval…… 处各取一帧，
+        解码时直接缩放到单元格尺寸（RGB 数组），不再为每个时间点启动一次 ffmpeg。
+        采样点间隔较大时 seek 到关键帧跳过中间部分。
 
-        try:
-            os.makedirs(self.frame_dir, exist_ok=True)
-            duration = float(ffmpeg.probe(self.video_path)["format"]["duration"])
-            timestamps = [i for i in range(0, int(duration), self.frame_interval)][:max_frames]
-
-            image_paths = []
-            for ts in timestamps:
-                time_label = self.format_time(ts)
-                output_path = os.path.join(self.frame_dir, f"frame_{time_label}.jpg")
-                cmd = ["ffmpeg", "-ss", str(ts), "-i", self.video_path, "-frames:v", "1", "-q:v", "2", "-y", output_path,
-                       "-hide_banner", "-loglevel", "error"]
-                subprocess.run(cmd, check=True)
-                image_paths.append(output_path)
-            return image_paths
-        except Exception as e:
-            logger.error(f"分割帧发生错误：{str(e)}")
-            raise ValueError("视频处理失败")
+        :param max_frames: 最多取帧数
+        :return: (时间点秒数, 形状为 (unit_height, unit_width, 3) 的 uint8 数组)
+        """
+        interval = max(int(self.frame_interval or 0), 1)
+        duration = probe_duration(self.video_path)
+        # 与逐个时间点截帧保持一致：只取 [0, int(duration)) 内的时间点
+        end = min(int(duration), interval * max_frames) if duration else interval * max_frames
+        yield from iter_frames_at(self.video_path, range(0, end, interval), self.unit_width, self.unit_height)
 
-    def group_images(self) -> list[list[str]]:
-        image_files = [os.path.join(self.frame_dir, f) for f in os.listdir(self.frame_dir) if
-                       f.startswith("frame_") and f.endswith(".jpg")]
-        image_files.sort(key=lambda f: self.extract_time_from_filename(os.path.basename(f)))
-        group_size = self.grid_size[0] * self.grid_size[1]
-        return [image_files[i:i + group_size] for i in range(0, len(image_files), group_size)]
+    def iter_distinct_frames(self, max_frames=1000) -> Iterator[Tuple[int, np.ndarray]]:
+        """
+        自适应取帧：按 VIDEO_SCENE_SAMPLE_INTERVAL 密集解码候选帧，与上一张保留帧的感知哈希差异
+        超过 VIDEO_SCENE_THRESHOLD 时才保留。两张保留帧至少间隔 60 / max_frames_per_minute 秒，
+        画面一直不变时每隔 60 / min_frames_per_minute 秒仍保留一张。
+        """
+        min_gap = 60 / self.max_frames_per_minute if self.max_frames_per_minute > 0 else 0
+        max_gap = 60 / self.min_frames_per_minute if self.min_frames_per_minute > 0 else float("inf")
+        duration = probe_duration(self.video_path)
+        step = max(VIDEO_SCENE_SAMPLE_INTERVAL, 0.1)
+        count = int(duration / step) if duration else int(max_frames * max(max_gap, min_gap, 1) / step)
+        candidates = (i * step for i in range(count))
 
-    def concat_images(self, image_paths: list[str], name: str) -> str:
-        os.makedirs(self.grid_dir, exist_ok=True)
-        font = ImageFont.truetype(self.font_path, 48) if os.path.exists(self.font_path) else ImageFont.load_default()
-        images = []
+        last_ts, last_hash, kept, seen = None, None, 0, 0
+        for ts, frame in iter_frames_at(self.video_path, candidates, self.unit_width, self.unit_height):
+            seen += 1
+            current = frame_hash(frame)
+            if last_ts is not None:
+                elapsed = ts - last_ts
+                if elapsed < min_gap:
+                    continue
+                changed = np.count_nonzero(current != last_hash) / current.size >= VIDEO_SCENE_THRESHOLD
+                if not changed and elapsed < max_gap:
+                    continue
+            last_ts, last_hash = ts, current
+            kept += 1
+            yield int(ts), frame
+            if kept >= max_frames:
+                break
+        logger.info(f"自适应取帧：{seen} 个候选帧中保留 {kept} 帧")
 
-        for path in image_paths:
-            img = Image.open(path).convert("RGB").resize((self.unit_width, self.unit_height), Image.Resampling.LANCZOS)
-            timestamp = re.search(r"frame_(\d{2})_(\d{2})\.jpg", os.path.basename(path))
-            time_text = f"{timestamp.group(1)}:{timestamp.group(2)}" if timestamp else ""
-            draw = ImageDraw.Draw(img)
-            draw.text((10, 10), time_text, fill="yellow", font=font, stroke_width=1, stroke_fill="black")
-            images.append(img)
+    def iter_grids(self) -> Iterator[Tuple[np.ndarray, list[int]]]:
+        """
+        把解码出的帧直接写入内存中的网格画布，每凑满一格返回一次（画布会被复用）。
+        不足一整格的尾部帧被丢弃。
 
+        :return: (网格画布, 各单元格的时间点)
+        """
         cols, rows = self.grid_size
-        grid_img = Image.new("RGB", (self.unit_width * cols, self.unit_height * rows), (255, 255, 255))
+        group_size = cols * rows
+        canvas = np.empty((self.unit_height * rows, self.unit_width * cols, 3), dtype=np.uint8)
+        times: list[int] = []
+        frames = self.iter_distinct_frames() if self.sampling == SAMPLING_ADAPTIVE else self.iter_frames()
+        for ts, frame in frames:
+            i = len(times)
+            y, x = (i // cols) * self.unit_height, (i % cols) * self.unit_width
+            canvas[y:y + self.unit_height, x:x + self.unit_width] = frame
+            times.append(ts)
+            if len(times) == group_size:
+                yield canvas, times
+                times = []
+        if times:
+            logger.warning(f"⚠️ 跳过最后一组，图片不足 {group_size} 张")
 
-        for i, img in enumerate(images):
-            x = (i % cols) * self.unit_width
-            y = (i // cols) * self.unit_height
-            grid_img.paste(img, (x, y))
+    def _render_args(self) -> tuple:
+        return (self.grid_size[0], self.unit_width, self.unit_height, self.font_path,
+                self.image_format, self.save_quality)
 
-        save_path = os.path.join(self.grid_dir, f"{name}.jpg")
-        grid_img.save(save_path, quality=self.save_quality)
-        return save_path
+    def iter_rendered_grids(self) -> Iterator[bytes]:
+        """
+        按顺序返回编码好的网格图。解码与拼接在当前线程顺序进行，各网格的标注与编码互不依赖，
+        交给进程池并行；在途网格数有上限，避免画布堆积占用内存。
+        """
+        pool = _get_grid_pool()
+        if pool is None:
+            for canvas, times in self.iter_grids():
+                yield render_grid(canvas, times, *self._render_args())
+            return
+
+        pending = deque()
+        for canvas, times in self.iter_grids():
+            # 画布会被复用，提交时复制一份
+            pending.append(pool.submit(render_grid, canvas.copy(), list(times), *self._render_args()))
+            while len(pending) > VIDEO_GRID_WORKERS * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+    @property
+    def _extension(self) -> str:
+        return "jpg" if self.image_format == "jpeg" else self.image_format
+
+    def _encode_image(self, img: Image.Image, quality: int) -> bytes:
+        return encode_image(img, self.image_format, quality)
+
+    def _write_image(self, path: str, data: bytes) -> None:
+        with open(path, "wb") as f:
+            f.write(data)
+        self._encoded[path] = data
+
+    def _read_image(self, path: str) -> bytes:
+        data = self._encoded.get(path)
+        if data is None:
+            with open(path, "rb") as f:
+                data = f.read()
+        return data
 
     def encode_images_to_base64(self, image_paths: list[str]) -> list[str]:
         base64_images = []
         for path in image_paths:
-            with open(path, "rb") as img_file:
-                encoded_string = base64.b64encode(img_file.read()).decode("utf-8")
-                base64_images.append(f"data:image/jpeg;base64,{encoded_string}")
+            mime = _MIME_TYPES["webp"] if path.endswith(".webp") else _MIME_TYPES["jpeg"]
+            encoded_string = base64.b64encode(self._read_image(path)).decode("utf-8")
+            base64_images.append(f"data:{mime};base64,{encoded_string}")
         return base64_images
 
+    def _cache_key(self) -> str:
+        """视频文件 + 所有影响网格图内容的参数，决定缓存目录名"""
+        parts = [
+            video_fingerprint(self.video_path), tuple(self.grid_size), self.frame_interval,
+            self.unit_width, self.unit_height, self.image_format, self.save_quality,
+        ]
+        if self.sampling == SAMPLING_ADAPTIVE:
+            parts += [self.sampling, self.min_frames_per_minute, self.max_frames_per_minute,
+                      VIDEO_SCENE_SAMPLE_INTERVAL, VIDEO_SCENE_THRESHOLD]
+        return hashlib.sha256(repr(parts).encode("utf-8")).hexdigest()[:24]
+
+    def _cached_grids(self, cache_dir: str) -> list[str]:
+        if not os.path.isdir(cache_dir):
+            return []
+        names = [f for f in os.listdir(cache_dir) if re.fullmatch(rf"grid_\d+\.{self._extension}", f)]
+        names.sort(key=lambda f: int(re.search(r"\d+", f).group()))
+        return [os.path.join(cache_dir, f) for f in names]
+
+    def _build_grids(self, cache_dir: str) -> list[str]:
+        # 每次生成使用独立的临时目录，完成后整体发布，并发任务互不干扰，也不会读到写了一半的缓存
+        temp_dir = tempfile.mkdtemp(prefix="grids_", suffix=".tmp", dir=self.work_dir or self.grid_dir)
+
+        logger.info("开始截帧并拼接网格图...")
+        encoded = []
+        try:
+            try:
+                for data in self.iter_rendered_grids():
+                    encoded.append(data)
+            except BrokenProcessPool:
+                # 进程池不可用（子进程被杀、打包环境限制等）时退回单线程重新生成
+                logger.warning("网格图进程池不可用，改为单线程生成")
+                _reset_grid_pool()
+                encoded = [render_grid(canvas, times, *self._render_args()) for canvas, times in self.iter_grids()]
+            for idx, data in enumerate(encoded, start=1):
+                with open(os.path.join(temp_dir, f"grid_{idx}.{self._extension}"), "wb") as f:
+                    f.write(data)
+        except Exception as e:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            logger.error(f"分割帧发生错误：{str(e)}")
+            raise
+
+        if not self._publish(temp_dir, cache_dir):
+            return self._cached_grids(cache_dir)
+        paths = self._cached_grids(cache_dir)
+        self._encoded.update(zip(paths, encoded))
+        return paths
+
+    def _publish(self, temp_dir: str, cache_dir: str) -> bool:
+        """
+        把生成好的临时目录改名为缓存目录
+
+        :return: False 表示其它任务已先写好同一份缓存，本次结果被丢弃
+        """
+        try:
+            os.replace(temp_dir, cache_dir)
+            return True
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                shutil.rmtree(temp_dir, ignore_errors=True)
+                return False
+        # 工作目录与缓存目录不在同一文件系统：先复制到缓存目录旁，再改名
+        local_dir = tempfile.mkdtemp(prefix="grids_", suffix=".tmp", dir=self.grid_dir)
+        try:
+            shutil.copytree(temp_dir, local_dir, dirs_exist_ok=True)
+            os.replace(local_dir, cache_dir)
+            return True
+        except OSError:
+            shutil.rmtree(local_dir, ignore_errors=True)
+            return False
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    def _payload_size(self, path: str) -> int:
+        size = os.path.getsize(path)
+        # base64 编码后体积约为原来的 4/3
+        return size if self.image_base_url else (size + 2) // 3 * 4
+
+    def _fit_budget(self, image_paths: list[str]) -> list[str]:
+        """
+        控制单次请求的图片总字节数：先逐级降低质量重新编码（结果同样缓存），
+        仍然超出时在时间轴上均匀抽取网格图，保证覆盖整段视频。
+        """
+        if not self.max_total_bytes or not image_paths:
+            return image_paths
+        if sum(self._payload_size(p) for p in image_paths) <= self.max_total_bytes:
+            return image_paths
+
+        candidates = image_paths
+        for quality in _FALLBACK_QUALITIES:
+            if quality >= self.save_quality:
+                continue
+            candidates = []
+            for path in image_paths:
+                target = path.replace(f".{self._extension}", f".q{quality}.{self._extension}")
+                if not os.path.exists(target):
+                    with Image.open(io.BytesIO(self._read_image(path))) as img:
+                        self._write_image(target, self._encode_image(img.convert("RGB"), quality))
+                candidates.append(target)
+            if sum(self._payload_size(p) for p in candidates) <= self.max_total_bytes:
+                logger.info(f"网格图超出字节上限，已降低质量至 {quality}")
+                return candidates
+
+        per_image = max(self._payload_size(p) for p in candidates)
+        keep = max(1, self.max_total_bytes // per_image)
+        step = len(candidates) / keep
+        selected = [candidates[int(i * step)] for i in range(keep)]
+        logger.warning(f"网格图超出字节上限 {self.max_total_bytes}，从 {len(candidates)} 张中均匀保留 {len(selected)} 张")
+        return selected
+
+    def _evict_cache(self) -> None:
+        """按最近使用时间淘汰网格图缓存，直到总大小低于 VIDEO_GRID_CACHE_MAX_MB"""
+        entries, total = [], 0
+        for name in os.listdir(self.grid_dir):
+            path = os.path.join(self.grid_dir, name)
+            if not os.path.isdir(path) or name.endswith(".tmp"):
+                continue
+            size = sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+            entries.append((os.path.getmtime(path), size, path))
+            total += size
+        limit = VIDEO_GRID_CACHE_MAX_MB * 1024 * 1024
+        for _, size, path in sorted(entries):
+            if total <= limit:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+
     def run(self)->list[str]:
+        """
+        生成网格图并返回图片 URL 列表（base64 data URL，或设置 image_base_url 时的静态地址）。
+        网格图按视频与参数缓存，同一视频重新总结时直接复用，不再重复截帧和编码。
+        """
         logger.info("开始提取视频帧...")
         try:
-            # 确保目录存在
-            print(self.frame_dir,self.grid_dir)
-            os.makedirs(self.frame_dir, exist_ok=True)
             os.makedirs(self.grid_dir, exist_ok=True)
-            #清空帧文件夹
-            for file in os.listdir(self.frame_dir):
-                if file.startswith("frame_"):
-                    os.remove(os.path.join(self.frame_dir, file))
-            print(self.frame_dir,self.grid_dir)
-            #清空网格文件夹
-            for file in os.listdir(self.grid_dir):
-                if file.startswith("grid_"):
-                    os.remove(os.path.join(self.grid_dir, file))
-            print(self.frame_dir,self.grid_dir)
-            self.extract_frames()
-            print("2#3",self.frame_dir,self.grid_dir)
-            logger.info("开始拼接网格图...")
-            image_paths = []
-            groups = self.group_images()
-            for idx, group in enumerate(groups, start=1):
-                if len(group) < self.grid_size[0] * self.grid_size[1]:
-                    logger.warning(f"⚠️ 跳过第 {idx} 组，图片不足 {self.grid_size[0] * self.grid_size[1]} 张")
-                    continue
-                out_path = self.concat_images(group, f"grid_{idx}")
-                image_paths.append(out_path)
+            key = self._cache_key()
+            cache_dir = os.path.join(self.grid_dir, key)
+            image_paths = self._cached_grids(cache_dir)
+            if image_paths:
+                logger.info(f"命中网格图缓存：{cache_dir}（{len(image_paths)} 张）")
+                os.utime(cache_dir)
+            else:
+                image_paths = self._build_grids(cache_dir)
+                self._evict_cache()
+
+            image_paths = self._fit_budget(image_paths)
+            if self.image_base_url:
+                return [f"{self.image_base_url}/{key}/{os.path.basename(p)}" for p in image_paths]
 
             logger.info("📤 开始编码图像...")
-            urls = self.encode_images_to_base64(image_paths)
-            return urls
+            return self.encode_images_to_base64(image_paths)
         except Exception as e:
             logger.error(f"发生错误：{str(e)}")
             raise ValueError("视频处理失败")
-
-
@@ -0,0 +1,57 @@
+import os
+import shutil
+import tempfile
+import time
+from typing import Optional
+
+from app.utils.logger import get_logger
+from app.utils.path_helper import get_app_dir
+
+logger = get_logger(__name__)
+
+# 任务工作目录的根目录：截帧、拼图、截图等中间文件按任务隔离，任务结束后删除
+TASK_WORKSPACE_DIR = os.getenv("TASK_WORKSPACE_DIR", "") or get_app_dir("workspaces")
+# 调试用：保留任务结束后的工作目录
+TASK_WORKSPACE_KEEP = os.getenv("TASK_WORKSPACE_KEEP", "false").lower() == "true"
+# 启动时清理超过该时长（小时）的残留工作目录（进程崩溃时未能删除）
+TASK_WORKSPACE_MAX_AGE_HOURS = float(os.getenv("TASK_WORKSPACE_MAX_AGE_HOURS", "24"))
+
+
+def create_workspace(task_id: Optional[str] = None) -> str:
+    """
+    为任务创建独立的工作目录，同一任务重试或并发执行时目录也互不相同
+
+    :param task_id: 任务 ID，用作目录名前缀便于排查
+    :return: 工作目录路径
+    """
+    os.makedirs(TASK_WORKSPACE_DIR, exist_ok=True)
+    return tempfile.mkdtemp(prefix=f"{task_id or 'task'}_", dir=TASK_WORKSPACE_DIR)
+
+
+def remove_workspace(path: Optional[str]) -> None:
+    if not path or TASK_WORKSPACE_KEEP:
+        return
+    shutil.rmtree(path, ignore_errors=True)
+
+
+def cleanup_stale_workspaces(max_age_hours: float = TASK_WORKSPACE_MAX_AGE_HOURS) -> int:
+    """
+    删除超过 max_age_hours 未修改的工作目录
+
+    :return: 删除的目录数量
+    """
+    if not os.path.isdir(TASK_WORKSPACE_DIR):
+        return 0
+    deadline = time.time() - max_age_hours * 3600
+    removed = 0
+    for name in os.listdir(TASK_WORKSPACE_DIR):
+        path = os.path.join(TASK_WORKSPACE_DIR, name)
+        try:
+            if os.path.isdir(path) and os.path.getmtime(path) < deadline:
+                shutil.rmtree(path, ignore_errors=True)
+                removed += 1
+        except OSError:
+            continue
+    if removed:
+        logger.info(f"已清理 {removed} 个残留的任务工作目录")
+    return removed
@@ -0,0 +1,97 @@
+"""
+截帧基准：对比逐个时间点启动 ffmpeg（旧实现）与 VideoReader 单次解码取帧。
+
+用法（在 backend 目录下）：
+    python benchmarks/frame_extraction.py --duration 600 --interval 2
+
+会先用 PyAV 生成一段合成测试视频；系统中没有 ffmpeg 命令时跳过旧实现。
+"""
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import av
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.utils.video_reader import VideoReader  # noqa: E402
+
+
+def make_video(path: str, duration: int, width: int, height: int, fps: int) -> None:
+    """生成带移动色块的 H.264 视频（关键帧间隔为默认的 250 帧）"""
+    with av.open(path, "w") as container:
+        codec = "libx264" if "libx264" in av.codecs_available else "mpeg4"
+        stream = container.add_stream(codec, rate=fps)
+        stream.width, stream.height, stream.pix_fmt = width, height, "yuv420p"
+        if codec == "libx264":
+            stream.options = {"preset": "ultrafast"}
+        canvas = np.zeros((height, width, 3), dtype=np.uint8)
+        for i in range(duration * fps):
+            canvas[:] = (i * 3 % 256, 64, 128)
+            x = i * 8 % (width - 64)
+            canvas[height // 2 - 32:height // 2 + 32, x:x + 64] = 255
+            frame = av.VideoFrame.from_ndarray(canvas, format="rgb24")
+            for packet in stream.encode(frame):
+                container.mux(packet)
+        for packet in stream.encode():
+            container.mux(packet)
+
+
+def per_timestamp(video_path: str, duration: int, interval: int, out_dir: str) -> int:
+    """旧实现：每个时间点一次 ffmpeg -ss 截帧"""
+    count = 0
+    for ts in range(0, duration, interval):
+        output_path = os.path.join(out_dir, f"frame_{ts}.jpg")
+        cmd = ["ffmpeg", "-ss", str(ts), "-i", video_path, "-frames:v", "1", "-q:v", "2", "-y", output_path,
+               "-hide_banner", "-loglevel", "error"]
+        subprocess.run(cmd, check=True)
+        count += 1
+    return count
+
+
+def single_pass(video_path: str, interval: int, unit_width: int, unit_height: int) -> int:
+    reader = VideoReader(video_path, frame_interval=interval, unit_width=unit_width, unit_height=unit_height)
+    return sum(1 for _ in reader.iter_frames())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=int, default=300, help="测试视频时长（秒）")
+    parser.add_argument("--interval", type=int, default=2, help="截帧间隔（秒）")
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--fps", type=int, default=25)
+    parser.add_argument("--cell", default="455x255", help="单元格尺寸，宽x高")
+    args = parser.parse_args()
+    unit_width, unit_height = map(int, args.cell.split("x"))
+
+    work_dir = tempfile.mkdtemp(prefix="bench_frames_")
+    try:
+        video_path = os.path.join(work_dir, "synthetic.mp4")
+        started = time.perf_counter()
+        make_video(video_path, args.duration, args.width, args.height, args.fps)
+        print(f"生成测试视频 {args.duration}s {args.width}x{args.height}@{args.fps}：{time.perf_counter() - started:.1f}s")
+
+        started = time.perf_counter()
+        count = single_pass(video_path, args.interval, unit_width, unit_height)
+        print(f"单次解码（PyAV）：{count} 帧，{time.perf_counter() - started:.2f}s")
+
+        if shutil.which("ffmpeg"):
+            frames_dir = os.path.join(work_dir, "frames")
+            os.makedirs(frames_dir)
+            started = time.perf_counter()
+            count = per_timestamp(video_path, args.duration, args.interval, frames_dir)
+            print(f"逐时间点 ffmpeg：{count} 帧，{time.perf_counter() - started:.2f}s")
+        else:
+            print("未找到 ffmpeg 命令，跳过逐时间点截帧的对比")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+网格图拼接基准：对比旧的逐张 PIL 拼接（打开、LANCZOS 缩放、绘制、粘贴）
+与 NumPy 平铺 + 进程池标注编码。
+
+用法（在 backend 目录下）：
+    python benchmarks/grid_composition.py --grids 40 --workers 4
+
+帧以内存中的合成图像代替，不依赖视频文件与 ffmpeg。
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from app.utils.video_reader import encode_image, format_time, render_grid  # noqa: E402
+
+
+def make_frames(count: int, width: int, height: int) -> list[np.ndarray]:
+    """渐变背景加噪声，编码开销接近真实画面"""
+    rng = np.random.default_rng(0)
+    x = np.linspace(0, 255, width, dtype=np.float32)
+    y = np.linspace(0, 255, height, dtype=np.float32)[:, None]
+    frames = []
+    for i in range(count):
+        base = np.stack([(x + i * 7) % 256 + y * 0, (y + i * 3) % 256 + x * 0, np.full((height, width), i % 256)], axis=2)
+        noise = rng.integers(0, 24, (height, width, 3))
+        frames.append(np.clip(base + noise, 0, 255).astype(np.uint8))
+    return frames
+
+
+def legacy_grid(frames, times, cols, rows, unit_width, unit_height, font_path) -> bytes:
+    """旧实现：每张帧单独转成 PIL 图像、LANCZOS 缩放、绘制时间，再逐张粘贴"""
+    font = ImageFont.truetype(font_path, 48) if os.path.exists(font_path) else ImageFont.load_default()
+    grid = Image.new("RGB", (unit_width * cols, unit_height * rows), (255, 255, 255))
+    for i, (frame, ts) in enumerate(zip(frames, times)):
+        img = Image.fromarray(frame).convert("RGB").resize((unit_width, unit_height), Image.Resampling.LANCZOS)
+        ImageDraw.Draw(img).text((10, 10), format_time(ts), fill="yellow", font=font, stroke_width=1,
+                                 stroke_fill="black")
+        grid.paste(img, ((i % cols) * unit_width, (i // cols) * unit_height))
+    return encode_image(grid, "jpeg", 80)
+
+
+def tile(frames, cols, rows, unit_width, unit_height) -> np.ndarray:
+    canvas = np.empty((unit_height * rows, unit_width * cols, 3), dtype=np.uint8)
+    for i, frame in enumerate(frames):
+        y, x = (i // cols) * unit_height, (i % cols) * unit_width
+        canvas[y:y + unit_height, x:x + unit_width] = frame
+    return canvas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--grids", type=int, default=20, help="网格图数量")
+    parser.add_argument("--grid", default="3x3", help="列x行")
+    parser.add_argument("--source", default="1280x720", help="原始帧尺寸（旧实现的输入）")
+    parser.add_argument("--cell", default="455x255", help="单元格尺寸（新实现由解码器直接缩放到该尺寸）")
+    parser.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1))
+    parser.add_argument("--font", default="fonts/arial.ttf")
+    args = parser.parse_args()
+    cols, rows = map(int, args.grid.split("x"))
+    source_w, source_h = map(int, args.source.split("x"))
+    unit_w, unit_h = map(int, args.cell.split("x"))
+    per_grid = cols * rows
+
+    source = make_frames(per_grid, source_w, source_h)
+    scaled = [np.asarray(Image.fromarray(f).resize((unit_w, unit_h), Image.Resampling.BOX)) for f in source]
+    times = list(range(0, per_grid * 2, 2))
+
+    started = time.perf_counter()
+    for _ in range(args.grids):
+        legacy_grid(source, times, cols, rows, unit_w, unit_h, args.font)
+    legacy = time.perf_counter() - started
+    print(f"旧实现（PIL 逐张缩放粘贴，单线程）：{legacy:.2f}s，{legacy / args.grids * 1000:.1f} ms/张")
+
+    render_args = (cols, unit_w, unit_h, args.font, "jpeg", 80)
+    started = time.perf_counter()
+    for _ in range(args.grids):
+        render_grid(tile(scaled, cols, rows, unit_w, unit_h), times, *render_args)
+    serial = time.perf_counter() - started
+    print(f"NumPy 平铺（单线程）：{serial:.2f}s，{serial / args.grids * 1000:.1f} ms/张")
+
+    if args.workers > 1:
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            # 预热，排除进程启动时间
+            list(pool.map(render_grid, [tile(scaled, cols, rows, unit_w, unit_h)] * args.workers,
+                          [times] * args.workers, *[[a] * args.workers for a in render_args]))
+            started = time.perf_counter()
+            futures = [pool.submit(render_grid, tile(scaled, cols, rows, unit_w, unit_h), times, *render_args)
+                       for _ in range(args.grids)]
+            for future in futures:
+                future.result()
+            parallel = time.perf_counter() - started
+        print(f"NumPy 平铺 + {args.workers} 进程：{parallel:.2f}s，{parallel / args.grids * 1000:.1f} ms/张")
+
+
+if __name__ == "__main__":
+    main()
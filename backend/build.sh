@@ -34,6 +34,7 @@ pyinstaller \
   --hidden-import fastapi \
   --hidden-import starlette \
   --add-data "app/db/builtin_providers.json:." \
+  --add-data "app/gpt/model_capabilities.json:." \
   --add-data ".env:." \
   "$(pwd)/backend/main.py"
 
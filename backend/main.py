@@ -1,3 +1,4 @@
+import multiprocessing
 import os
 from contextlib import asynccontextmanager
 import time
@@ -19,6 +20,8 @@ from app.exceptions.exception_handlers import register_exception_handlers
 # from app.db.model_dao import init_model_table
 # from app.db.provider_dao import init_provider_table
 from app.utils.logger import get_logger
+from app.utils.video_reader import shutdown_grid_pool
+from app.utils.workspace import cleanup_stale_workspaces
 from app import create_app
 from app.transcriber.transcriber_provider import get_transcriber
 from events import register_handler
@@ -146,7 +149,9 @@ async def lifespan(app: FastAPI):
     init_db()
     get_transcriber(transcriber_type=os.getenv("TRANSCRIBER_TYPE", "fast-whisper"))
     seed_default_providers()
+    cleanup_stale_workspaces()
     yield
+    shutdown_grid_pool()
 
 app = create_app(lifespan=lifespan)
 
@@ -179,6 +184,8 @@ app.mount("/uploads", StaticFiles(directory=uploads_dir), name="uploads")
 
 
 if __name__ == "__main__":
+    # 打包后的可执行文件启动网格图进程池时需要
+    multiprocessing.freeze_support()
     port = int(os.getenv("BACKEND_PORT", 8483))
     host = os.getenv("BACKEND_HOST", "0.0.0.0")
     logger.info(f"Starting server on {host}:{port}")